@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+BENCHMARKS (en loopback, 127.0.0.1):
+- crc -> MB/s del CRC16-CCITT (vía rápida y tabla) para payloads de 16 B a 64 KB
+- protocolo -> costo por paquete de construir y parsear paquetes y respuestas (formato binario y texto)
+- extremo -> mensajes/s y latencia p50/p99 de punta a punta (client.py contra server.py) para cada
+  combinación de PROBABILIDAD_DE_ERROR y tamaño de ventana
+- servidor -> paquetes por segundo del servidor con el bucle simple vs. el bucle por lotes
+- compresion -> bytes ahorrados por paquete vs. CPU gastada en comprimir (cliente) y descomprimir (servidor), por
+  tipo de contenido, tamaño y nivel de zlib
+- escalado -> paquetes por segundo con 1, 2, ... N procesos trabajadores (supervisor.py, SO_REUSEPORT) y varios clientes
+- todo -> crc + protocolo + extremo
+
+Los resultados se pueden guardar en JSON (--json) para comparar entre commits.
+
+Uso:
+    python benchmark.py crc
+    python benchmark.py extremo --errores 0 0.1 0.3 --ventanas 1 8 64 --mensajes 2000
+    python benchmark.py escalado --trabajadores 1 2 4 --clientes 8
+    python benchmark.py compresion --tamanos 512 1400 --niveles 1 6 9
+    python benchmark.py --json resultados.json todo
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import client
+import protocolo
+from crc import crc16_ccitt, crc16_ccitt_tabla
+
+
+# ===================== CONFIGURACIÓN =====================
+HOST = "127.0.0.1" # Los benchmarks se ejecutan en loopback
+PORT_BENCHMARK = 5400 # Puerto base para los servidores del benchmark
+ESPERA_ARRANQUE = 0.5 # Segundos que se espera a que el servidor esté escuchando
+TAMANOS_CRC = [16, 64, 256, 1024, 4096, 16384, 65536] # (bytes) Tamaños de payload del benchmark de CRC
+TIEMPO_MEDICION = 0.2 # (segundos) Duración aproximada de cada repetición de un micro-benchmark
+REPETICIONES = 5 # Repeticiones de cada micro-benchmark -> se informa la más rápida (la de menos ruido)
+SEMILLA = 1 # Semilla del canal con fallas del servidor -> los mismos errores en cada ejecución
+ESPERA_PERDIDA = 0.05 # (segundos) Sin respuestas durante este tiempo -> el generador de carga da por perdidos los paquetes en vuelo
+PALABRAS_COMPRESION = "el servidor recibe un mensaje con su secuencia y responde ACK o NACK según el CRC del paquete".split() # Vocabulario del contenido "texto"
+# ==========================================================
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def iniciar_servidor(port, trabajadores=None, **configuracion):
+    """
+    Inicia server.py en un subproceso con la configuración indicada (sin errores simulados, sin mensajes y sin puerto de métricas)
+
+    - Parámetros:
+        - port (int) -> puerto de escucha
+        - trabajadores (int) -> si se indica, el servidor se ejecuta con supervisor.py en esa cantidad de procesos
+        - configuracion -> constantes de server.py a reemplazar (por ej. RECEPCION_POR_LOTES=False)
+    - Return -> subprocess.Popen
+    """
+
+    configuracion.setdefault("PROBABILIDAD_DE_ERROR", 0.0)
+    configuracion.setdefault("NIVEL_LOG", "WARNING") # Sin un mensaje por paquete entregado -> se mide el protocolo
+    configuracion.setdefault("PORT_METRICAS", None) # Varios servidores seguidos no compiten por el puerto de métricas
+    asignaciones = "".join(f"server.{nombre} = {valor!r}; " for nombre, valor in configuracion.items())
+    inicio = "server.main()" if trabajadores is None else f"import supervisor; supervisor.supervisar({trabajadores})"
+    codigo = f"import server; server.PORT = {port}; {asignaciones}{inicio}"
+
+    proceso = subprocess.Popen(
+        [sys.executable, "-c", codigo],
+        cwd=DIRECTORIO,
+        stdout=subprocess.DEVNULL,
+    )
+    time.sleep(ESPERA_ARRANQUE)
+    return proceso
+
+
+def generar_carga(port, paquetes, en_vuelo, tamano_payload=32):
+    """
+    Generador de carga de lazo cerrado -> mantiene 'en_vuelo' paquetes sin confirmar hasta enviar 'paquetes'
+        - Solo cuentan los paquetes confirmados con su ACK -> los que no se confirman en ESPERA_PERDIDA se dan por
+          perdidos: liberan su lugar en vuelo pero no suman a la tasa (un servidor que descarta no sale más rápido)
+
+    - Return -> dict: confirmados, perdidos, segundos y paquetes_por_segundo (confirmados / segundos)
+    """
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(ESPERA_PERDIDA)
+    direccion = (HOST, port)
+    payload = b"x" * tamano_payload
+
+    # Los paquetes se construyen antes de medir -> solo se mide el servidor
+    datagramas = [protocolo.construir_paquete(secuencia, payload) for secuencia in range(paquetes)]
+
+    pendientes = set()  # secuencias enviadas sin ACK
+    enviados = 0
+    confirmados = 0
+    perdidos = 0
+    inicio = time.perf_counter()
+
+    try:
+        while enviados < paquetes or pendientes:
+            while enviados < paquetes and len(pendientes) < en_vuelo:
+                sock.sendto(datagramas[enviados], direccion)
+                pendientes.add(enviados)
+                enviados += 1
+
+            try:
+                respuesta, origen = sock.recvfrom(2048)
+            except socket.timeout:
+                # Se perdió algo (buffer del socket lleno) -> los paquetes en vuelo se cuentan como perdidos
+                perdidos += len(pendientes)
+                pendientes.clear()
+                continue
+
+            try:
+                tipo, secuencia, mapa = protocolo.leer_respuesta(respuesta)
+            except protocolo.ErrorFormato:
+                continue
+
+            # Un ACK tardío de un paquete ya dado por perdido no se cuenta dos veces
+            if tipo == "ACK" and secuencia in pendientes:
+                pendientes.discard(secuencia)
+                confirmados += 1
+    finally:
+        sock.close()
+
+    segundos = time.perf_counter() - inicio
+    return {"confirmados": confirmados, "perdidos": perdidos, "segundos": segundos, "paquetes_por_segundo": confirmados / segundos}
+
+
+def medir(funcion, *parametros):
+    """
+    Mide el tiempo de UNA llamada a funcion(*parametros)
+        - Primero calcula cuántas llamadas entran en TIEMPO_MEDICION
+        - Luego repite la medición REPETICIONES veces y se queda con la más rápida
+
+    - Return -> float: segundos por llamada
+    """
+
+    # Calibración -> se duplica la cantidad de llamadas hasta que la medición dure lo suficiente
+    llamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for i in range(llamadas):
+            funcion(*parametros)
+        duracion = time.perf_counter() - inicio
+
+        if duracion >= TIEMPO_MEDICION / 10:
+            break
+        llamadas *= 2
+
+    llamadas = max(1, int(llamadas * TIEMPO_MEDICION / duracion))
+    mejor = float("inf")
+
+    for repeticion in range(REPETICIONES):
+        inicio = time.perf_counter()
+        for i in range(llamadas):
+            funcion(*parametros)
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    return mejor / llamadas
+
+
+def benchmark_crc(argumentos):
+    """
+    MB/s del CRC16-CCITT para cada tamaño de TAMANOS_CRC
+        - rapido -> crc16_ccitt() (binascii.crc_hqx, en C)
+        - tabla -> crc16_ccitt_tabla() (Python puro, la implementación de respaldo)
+    """
+
+    resultados = []
+
+    for tamano in TAMANOS_CRC:
+        datos = os.urandom(tamano)
+        fila = {"tamano": tamano}
+
+        for nombre, funcion in (("rapido", crc16_ccitt), ("tabla", crc16_ccitt_tabla)):
+            segundos = medir(funcion, datos)
+            fila[nombre] = {"ns_por_llamada": segundos * 1e9, "mb_por_segundo": tamano / segundos / 1e6}
+
+        resultados.append(fila)
+        print(
+            f"[Benchmark] CRC {tamano:>6} B: rápido {fila['rapido']['mb_por_segundo']:>9,.1f} MB/s | "
+            f"tabla {fila['tabla']['mb_por_segundo']:>7,.2f} MB/s"
+        )
+
+    return resultados
+
+
+def benchmark_protocolo(argumentos):
+    """
+    Costo por paquete (en ns) de cada operación del protocolo, con un payload de argumentos.tamano bytes
+        - construir -> construir_paquete() (incluye el CRC)
+        - parsear -> leer_paquete() + verificación del CRC (lo que hace el servidor con cada datagrama)
+        - respuesta -> construir_respuesta() + leer_respuesta() (ACK de ida y vuelta)
+        - texto -> lo mismo en el formato de texto legado
+    """
+
+    payload = b"x" * argumentos.tamano
+    mensaje = payload.decode("ascii")
+    paquete = protocolo.construir_paquete(7, payload)
+    paquete_texto = protocolo.construir_paquete_texto(7, mensaje)
+
+    def parsear(datos):
+        leido = protocolo.leer_paquete(datos)
+        return protocolo.calcular_crc(memoryview(datos)[:protocolo.FIN_CABECERA_CRC], leido.payload) == leido.crc_recibido
+
+    def parsear_texto(datos):
+        secuencia, contenido, crc = datos.decode("utf-8").split("|")
+        return crc16_ccitt(contenido) == int(crc, 16)
+
+    def respuesta(formato):
+        return protocolo.leer_respuesta(protocolo.construir_respuesta(formato, "ACK", 7))
+
+    operaciones = {
+        "construir_binario": (protocolo.construir_paquete, 7, payload),
+        "parsear_binario": (parsear, paquete),
+        "respuesta_binario": (respuesta, protocolo.FORMATO_BINARIO),
+        "construir_texto": (protocolo.construir_paquete_texto, 7, mensaje),
+        "parsear_texto": (parsear_texto, paquete_texto),
+        "respuesta_texto": (respuesta, protocolo.FORMATO_TEXTO),
+    }
+
+    resultados = {"tamano": argumentos.tamano}
+
+    for nombre, (funcion, *parametros) in operaciones.items():
+        resultados[nombre] = medir(funcion, *parametros) * 1e9
+        print(f"[Benchmark] {nombre:<18} {resultados[nombre]:>9,.0f} ns/paquete")
+
+    return resultados
+
+
+def contenido_compresion(tipo, tamano):
+    """
+    Payload de prueba para el benchmark de compresión (siempre el mismo para cada tipo y tamaño)
+        - texto -> palabras de un vocabulario chico (como mensajes de chat o registros)
+        - json -> registros JSON con claves repetidas (como telemetría)
+        - aleatorio -> bytes al azar (como datos ya comprimidos o cifrados: no se achican)
+
+    - Return -> bytes de 'tamano' bytes
+    """
+
+    generador = random.Random(SEMILLA)
+
+    if tipo == "aleatorio":
+        return generador.randbytes(tamano)
+
+    partes = []
+    largo = 0
+
+    while largo < tamano:
+        if tipo == "json":
+            parte = json.dumps({"sensor": generador.randrange(100), "temperatura": round(generador.uniform(-10, 40), 2), "estado": generador.choice(["ok", "alerta"])})
+        else:
+            parte = " ".join(generador.choice(PALABRAS_COMPRESION) for i in range(8))
+
+        partes.append(parte)
+        largo += len(parte) + 1
+
+    return "\n".join(partes).encode("utf-8")[:tamano]
+
+
+def benchmark_compresion(argumentos):
+    """
+    Compresión del payload (FLAG_COMPRIMIDO) para cada tipo de contenido, tamaño y nivel de zlib
+        - ahorro -> bytes menos por paquete (0 si comprimido no se achica: el cliente lo envía sin comprimir)
+        - comprimir_us / descomprimir_us -> CPU por paquete en el cliente y en el servidor
+        - bytes_por_us -> bytes ahorrados por cada microsegundo de CPU (comprimir + descomprimir)
+    """
+
+    resultados = []
+
+    for tipo in argumentos.tipos:
+        for tamano in argumentos.tamanos:
+            payload = contenido_compresion(tipo, tamano)
+
+            for nivel in argumentos.niveles:
+                comprimido = protocolo.comprimir(payload, nivel)
+                comprimir_us = medir(protocolo.comprimir, payload, nivel) * 1e6
+
+                if comprimido is None:
+                    ahorro = 0
+                    descomprimir_us = 0.0
+                else:
+                    ahorro = len(payload) - len(comprimido)
+                    descomprimir_us = medir(protocolo.descomprimir, comprimido) * 1e6
+
+                fila = {
+                    "tipo": tipo,
+                    "tamano": tamano,
+                    "nivel": nivel,
+                    "ahorro": ahorro,
+                    "porcentaje": 100 * ahorro / tamano,
+                    "comprimir_us": comprimir_us,
+                    "descomprimir_us": descomprimir_us,
+                    "bytes_por_us": ahorro / (comprimir_us + descomprimir_us),
+                }
+                resultados.append(fila)
+
+                print(
+                    f"[Benchmark] {tipo:<9} {tamano:>6} B nivel {nivel}: ahorra {ahorro:>6} B ({fila['porcentaje']:>4.1f}%) | "
+                    f"comprimir {comprimir_us:>7.2f} us | descomprimir {descomprimir_us:>6.2f} us | "
+                    f"{fila['bytes_por_us']:>6.1f} B ahorrados/us"
+                )
+
+    return resultados
+
+
+def medir_extremo(port, mensajes, tamano, tamano_ventana):
+    """
+    Envía 'mensajes' mensajes sintéticos con el cliente (en este proceso) y mide el resultado
+
+    - Return -> dict con mensajes/s, entregados, retransmisiones y latencias p50/p99/máxima (ms)
+    """
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    estadisticas = client.EstadisticasEnvio()
+    inicio = time.perf_counter()
+
+    try:
+        # La salida del cliente (retransmisiones) no se muestra -> solo interesa el resumen
+        with open(os.devnull, "w") as salida, contextlib.redirect_stdout(salida):
+            client.enviar_mensajes_ventana(
+                sock, (HOST, port), 0,
+                client.generar_mensajes(mensajes, tamano),
+                tamano_ventana,
+                estadisticas=estadisticas,
+            )
+    finally:
+        duracion = time.perf_counter() - inicio
+        sock.close()
+
+    return {
+        "mensajes_por_segundo": estadisticas.entregados / duracion,
+        "entregados": estadisticas.entregados,
+        "fallidos": mensajes - estadisticas.entregados,
+        "retransmisiones": estadisticas.retransmisiones,
+        "p50_ms": estadisticas.percentil(50) * 1000,
+        "p99_ms": estadisticas.percentil(99) * 1000,
+        "max_ms": max(estadisticas.latencias, default=0.0) * 1000,
+    }
+
+
+def benchmark_extremo(argumentos):
+    """
+    Barrido de punta a punta -> un server.py (subproceso) por cada combinación de probabilidad de error y ventana
+        - El canal del servidor usa siempre la misma SEMILLA -> los errores son repetibles entre commits
+        - El cliente tiene argumentos.intentos intentos por paquete para que los errores no corten la medición
+    """
+
+    client.MAX_INTENTOS = argumentos.intentos
+    client.MAX_TIEMPO_DE_ESPERA = argumentos.timeout
+    resultados = []
+    port = PORT_BENCHMARK + 10
+
+    for probabilidad in argumentos.errores:
+        for tamano_ventana in argumentos.ventanas:
+            # Un puerto distinto por medición -> el cliente empieza con un estimador de RTT nuevo
+            port += 1
+            proceso = iniciar_servidor(
+                port,
+                PROBABILIDAD_DE_ERROR=probabilidad,
+                SEMILLA_CANAL=SEMILLA,
+                TAMANO_VENTANA=tamano_ventana,
+            )
+
+            try:
+                fila = {"probabilidad_de_error": probabilidad, "ventana": tamano_ventana}
+                fila.update(medir_extremo(port, argumentos.mensajes, argumentos.tamano, tamano_ventana))
+            finally:
+                proceso.terminate()
+                proceso.wait()
+
+            resultados.append(fila)
+            print(
+                f"[Benchmark] error {probabilidad:<4} ventana {tamano_ventana:>3}: "
+                f"{fila['mensajes_por_segundo']:>8,.0f} mensajes/s | p50 {fila['p50_ms']:.3f} ms | "
+                f"p99 {fila['p99_ms']:.3f} ms | retransmisiones {fila['retransmisiones']} | fallidos {fila['fallidos']}"
+            )
+
+    return resultados
+
+
+def benchmark_todo(argumentos):
+    """Ejecuta crc, protocolo y extremo -> un resultado por benchmark"""
+
+    return {
+        "crc": benchmark_crc(argumentos),
+        "protocolo": benchmark_protocolo(argumentos),
+        "extremo": benchmark_extremo(argumentos),
+    }
+
+
+def entorno():
+    """Return -> dict: datos de la máquina y del commit, para poder comparar resultados guardados"""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=DIRECTORIO, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def benchmark_servidor(argumentos):
+    """
+    Compara el bucle simple (recvfrom/sendto por datagrama) con el bucle por lotes (recvfrom_into + respuestas agrupadas)
+        - Los dos servidores quedan en marcha: una ronda de calentamiento (no se cuenta) y luego argumentos.repeticiones
+          mediciones alternando el orden -> el ruido de la máquina afecta a los dos por igual
+        - Se informa la mediana y el rango (mínimo - máximo) de cada uno, los paquetes perdidos y en cuántas
+          repeticiones ganó el bucle por lotes: si no gana (o pierde) en todas, la diferencia está dentro del ruido
+    """
+
+    modos = {"simple": False, "lotes": True}
+    puertos = {nombre: PORT_BENCHMARK + indice for indice, nombre in enumerate(modos)}
+    procesos = [iniciar_servidor(puertos[nombre], RECEPCION_POR_LOTES=por_lotes, TAMANO_VENTANA=argumentos.paquetes) for nombre, por_lotes in modos.items()]
+    mediciones = {nombre: [] for nombre in modos}
+
+    try:
+        for repeticion in range(argumentos.repeticiones + 1):
+            orden = list(modos) if repeticion % 2 == 0 else list(reversed(modos))
+
+            for nombre in orden:
+                carga = generar_carga(puertos[nombre], argumentos.paquetes, argumentos.en_vuelo)
+
+                # Repetición 0 -> calentamiento (caches, buffers del socket, estimadores del servidor)
+                if repeticion > 0:
+                    mediciones[nombre].append(carga)
+    finally:
+        for proceso in procesos:
+            proceso.terminate()
+            proceso.wait()
+
+    resultados = {}
+
+    for nombre, cargas in mediciones.items():
+        tasas = [carga["paquetes_por_segundo"] for carga in cargas]
+        resultados[nombre] = {
+            "mediana": statistics.median(tasas),
+            "minimo": min(tasas),
+            "maximo": max(tasas),
+            "perdidos": sum(carga["perdidos"] for carga in cargas),
+            "paquetes_por_segundo": tasas,
+        }
+        print(
+            f"[Benchmark] Servidor {nombre:<6}: mediana {resultados[nombre]['mediana']:>9,.0f} paquetes/s "
+            f"(rango {resultados[nombre]['minimo']:,.0f} - {resultados[nombre]['maximo']:,.0f}) | perdidos {resultados[nombre]['perdidos']}"
+        )
+
+    victorias = sum(lotes > simple for simple, lotes in zip(resultados["simple"]["paquetes_por_segundo"], resultados["lotes"]["paquetes_por_segundo"]))
+    resultados["mejora"] = resultados["lotes"]["mediana"] / resultados["simple"]["mediana"]
+    resultados["victorias_lotes"] = victorias
+
+    print(f"[Benchmark] Lotes vs. simple: {resultados['mejora']:.2f}x (medianas) | lotes más rápido en {victorias} de {argumentos.repeticiones} repeticiones")
+
+    if 0 < victorias < argumentos.repeticiones:
+        print("[Benchmark] Sin diferencia consistente -> la mejora (o la pérdida) está dentro del ruido de la medición")
+
+    return resultados
+
+
+def _carga_cliente(port, paquetes, en_vuelo):
+    """Un cliente del benchmark de escalado (en su propio proceso) -> Return: (inicio, fin, resultado de generar_carga())"""
+
+    inicio = time.monotonic()
+    carga = generar_carga(port, paquetes, en_vuelo)
+    return inicio, time.monotonic(), carga
+
+
+def benchmark_escalado(argumentos):
+    """
+    Paquetes por segundo del servidor con distintas cantidades de procesos trabajadores (supervisor.py)
+        - argumentos.clientes procesos cliente envían a la vez -> cada uno tiene su puerto de origen, así el kernel
+          los reparte entre los trabajadores (SO_REUSEPORT)
+        - Tasa = paquetes confirmados de todos los clientes / tiempo desde que empieza el primero hasta que termina el
+          último (los perdidos no cuentan, ver generar_carga())
+        - Siempre se mide 1 trabajador -> la aceleración de cada fila es contra ese valor y se compara con la ideal
+          (min(trabajadores, núcleos): con más trabajadores que núcleos no hay dónde ejecutarlos en paralelo)
+        - Los clientes también usan CPU -> en una máquina con pocos núcleos compiten con los trabajadores
+    """
+
+    resultados = []
+    contexto = multiprocessing.get_context("fork")
+    nucleos = os.cpu_count() or 1
+
+    for indice, trabajadores in enumerate(sorted(set(argumentos.trabajadores) | {1})):
+        port = PORT_BENCHMARK + 100 + indice
+        proceso = iniciar_servidor(port, trabajadores=trabajadores, TAMANO_VENTANA=argumentos.paquetes)
+
+        try:
+            with contexto.Pool(argumentos.clientes) as clientes:
+                tiempos = clientes.starmap(
+                    _carga_cliente,
+                    [(port, argumentos.paquetes, argumentos.en_vuelo)] * argumentos.clientes,
+                )
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+        duracion = max(fin for inicio, fin, carga in tiempos) - min(inicio for inicio, fin, carga in tiempos)
+        fila = {
+            "trabajadores": trabajadores,
+            "paquetes_por_segundo": sum(carga["confirmados"] for inicio, fin, carga in tiempos) / duracion,
+            "perdidos": sum(carga["perdidos"] for inicio, fin, carga in tiempos),
+        }
+        fila["aceleracion"] = fila["paquetes_por_segundo"] / resultados[0]["paquetes_por_segundo"] if resultados else 1.0
+        fila["ideal"] = min(trabajadores, nucleos)
+        fila["eficiencia"] = fila["aceleracion"] / trabajadores
+        resultados.append(fila)
+
+        print(f"[Benchmark] {trabajadores:>2} trabajadores: {fila['paquetes_por_segundo']:>9,.0f} paquetes/s | perdidos {fila['perdidos']}")
+
+    # Comparación final contra 1 trabajador
+    print(f"[Benchmark] Escalado vs. 1 trabajador ({nucleos} núcleos, {argumentos.clientes} clientes):")
+    print("[Benchmark]   trabajadores   paquetes/s   aceleración   ideal   eficiencia")
+
+    for fila in resultados:
+        print(
+            f"[Benchmark]   {fila['trabajadores']:>12} {fila['paquetes_por_segundo']:>12,.0f} {fila['aceleracion']:>12.2f}x "
+            f"{fila['ideal']:>6}x {fila['eficiencia'] * 100:>11.0f}%"
+        )
+
+    if max(fila["trabajadores"] for fila in resultados) > nucleos:
+        print(f"[Benchmark] Más trabajadores que núcleos ({nucleos}) -> no se espera aceleración por encima de {nucleos}x")
+
+    return resultados
+
+
+def agregar_opciones_extremo(subcomando):
+    """Opciones del barrido de punta a punta (las usan 'extremo' y 'todo')"""
+
+    subcomando.add_argument("--errores", type=float, nargs="+", default=[0.0, 0.1, 0.3], help="valores de PROBABILIDAD_DE_ERROR")
+    subcomando.add_argument("--ventanas", type=int, nargs="+", default=[1, 8, 64], help="tamaños de ventana")
+    subcomando.add_argument("--mensajes", type=int, default=2000, help="mensajes por medición")
+    subcomando.add_argument("--intentos", type=int, default=20, help="intentos por paquete del cliente")
+    subcomando.add_argument("--timeout", type=float, default=0.05, help="RTO inicial del cliente en segundos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del protocolo UDP con CRC en loopback")
+    parser.add_argument("--json", metavar="ARCHIVO", help="guardar los resultados en JSON ('-' = stdout)")
+    subcomandos = parser.add_subparsers(dest="benchmark", required=True)
+
+    crc = subcomandos.add_parser("crc", help="MB/s del CRC16-CCITT de 16 B a 64 KB")
+    crc.set_defaults(funcion=benchmark_crc)
+
+    operaciones = subcomandos.add_parser("protocolo", help="costo por paquete de construir/parsear")
+    operaciones.add_argument("--tamano", type=int, default=64, help="bytes de payload")
+    operaciones.set_defaults(funcion=benchmark_protocolo)
+
+    compresion = subcomandos.add_parser("compresion", help="bytes ahorrados vs. CPU de comprimir/descomprimir el payload")
+    compresion.add_argument("--tipos", nargs="+", choices=("texto", "json", "aleatorio"), default=["texto", "json", "aleatorio"], help="tipos de contenido")
+    compresion.add_argument("--tamanos", type=int, nargs="+", default=[128, 512, 1400], help="bytes de payload")
+    compresion.add_argument("--niveles", type=int, nargs="+", choices=range(1, 10), default=[1, 6, 9], help="niveles de zlib")
+    compresion.set_defaults(funcion=benchmark_compresion)
+
+    escalado = subcomandos.add_parser("escalado", help="paquetes/s con 1..N procesos trabajadores (SO_REUSEPORT)")
+    escalado.add_argument("--trabajadores", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}), help="cantidades de trabajadores a medir")
+    escalado.add_argument("--clientes", type=int, default=8, help="procesos cliente enviando a la vez")
+    escalado.add_argument("--paquetes", type=int, default=10000, help="paquetes por cliente")
+    escalado.add_argument("--en-vuelo", type=int, default=64, help="paquetes sin confirmar por cliente")
+    escalado.set_defaults(funcion=benchmark_escalado)
+
+    extremo = subcomandos.add_parser("extremo", help="mensajes/s y latencias de punta a punta por error y ventana")
+    extremo.add_argument("--tamano", type=int, default=64, help="bytes de cada mensaje")
+    agregar_opciones_extremo(extremo)
+    extremo.set_defaults(funcion=benchmark_extremo)
+
+    todo = subcomandos.add_parser("todo", help="crc + protocolo + extremo")
+    todo.add_argument("--tamano", type=int, default=64, help="bytes de payload y de cada mensaje")
+    agregar_opciones_extremo(todo)
+    todo.set_defaults(funcion=benchmark_todo)
+
+    servidor = subcomandos.add_parser("servidor", help="paquetes/s del servidor: bucle simple vs. por lotes")
+    servidor.add_argument("--paquetes", type=int, default=20000, help="paquetes a enviar por medición")
+    servidor.add_argument("--en-vuelo", type=int, default=256, help="paquetes sin confirmar al mismo tiempo")
+    servidor.add_argument("--repeticiones", type=int, default=5, help="mediciones de cada bucle (además del calentamiento)")
+    servidor.set_defaults(funcion=benchmark_servidor)
+
+    argumentos = parser.parse_args()
+
+    # JSON en stdout -> el progreso va a stderr, así la salida se puede pasar directamente a otro programa
+    progreso = sys.stderr if argumentos.json == "-" else sys.stdout
+    with contextlib.redirect_stdout(progreso):
+        resultados = argumentos.funcion(argumentos)
+
+    if argumentos.json is None:
+        return
+
+    # Las opciones usadas se guardan junto a los resultados -> dos archivos solo se comparan si midieron lo mismo
+    opciones = {nombre: valor for nombre, valor in vars(argumentos).items() if nombre not in ("funcion", "json")}
+    documento = {"entorno": entorno(), "opciones": opciones, "resultados": resultados}
+
+    if argumentos.json == "-":
+        json.dump(documento, sys.stdout, indent=2)
+        print()
+    else:
+        with open(argumentos.json, "w", encoding="utf-8") as archivo:
+            json.dump(documento, archivo, indent=2)
+        print(f"[Benchmark] Resultados guardados en {argumentos.json}")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
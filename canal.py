@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO CANAL (simulación de un canal con fallas, separada del servidor):
+- Errores por byte, por bit y en ráfagas (modelo de Gilbert-Elliott)
+- Pérdida, duplicación, reordenamiento y retardo de datagramas
+- Generador aleatorio propio con semilla -> las pruebas se pueden repetir exactamente
+- Trabaja sobre bytes/memoryview: solo copia el datagrama cuando realmente lo corrompe
+- Por defecto corrompe el datagrama completo (cabecera incluida, como una red real); con solo_payload=True los
+  errores caen solo en el mensaje -> siempre terminan en NACK (es lo que hacía la antigua simular_error)
+- Se usa de dos formas:
+    - Filtro dentro del servidor (FiltroCanal) -> si no hay canal configurado, el servidor no paga nada
+    - Proxy UDP entre cliente y servidor:
+        python canal.py --escuchar 5001 --servidor 127.0.0.1:5000 --perdida 0.05 --error-byte 0.001 --semilla 42
+"""
+
+import argparse
+import asyncio
+import heapq
+import math
+import random
+import time
+from collections import OrderedDict
+
+import protocolo
+
+
+# ===================== CONFIGURACIÓN =====================
+HOST_PROXY = "127.0.0.1" # IP donde escucha el proxy
+PORT_PROXY = 5001 # Puerto del proxy -> el cliente le envía acá en vez de al servidor
+SERVIDOR = "127.0.0.1:5000" # IP:puerto del servidor al que se reenvía
+INTERVALO_RESUMEN = 5.0 # Cada cuántos segundos el proxy muestra sus contadores
+SALIDA_TTL = 60.0 # Segundos sin datagramas de un cliente antes de cerrar su socket hacia el servidor
+MAX_SALIDAS = 1024 # Sockets hacia el servidor abiertos como máximo (uno por cliente) -> si se llena, se cierra el usado hace más tiempo
+# ==========================================================
+
+
+class GilbertElliott:
+    """
+    Modelo de errores en ráfagas de Gilbert-Elliott
+        - Dos estados: BUENO (pocos errores) y MALO (muchos errores)
+        - Antes de cada datagrama el canal puede cambiar de estado -> los errores llegan agrupados
+    """
+
+    def __init__(self, p_bueno_a_malo, p_malo_a_bueno, tasa_bueno=0.0, tasa_malo=0.01):
+        self.p_bueno_a_malo = p_bueno_a_malo
+        self.p_malo_a_bueno = p_malo_a_bueno
+        self.tasa_bueno = tasa_bueno # Probabilidad de error por byte en estado BUENO
+        self.tasa_malo = tasa_malo # Probabilidad de error por byte en estado MALO
+        self.malo = False
+
+    def avanzar(self, aleatorio):
+        """Cambia (o no) de estado y devuelve la tasa de error por byte del estado actual"""
+
+        if self.malo:
+            if aleatorio.random() < self.p_malo_a_bueno:
+                self.malo = False
+        elif aleatorio.random() < self.p_bueno_a_malo:
+            self.malo = True
+
+        return self.tasa_malo if self.malo else self.tasa_bueno
+
+
+class Canal:
+    """
+    Canal con fallas configurable
+        - aplicar(datos) -> lista de (retardo en segundos, datagrama) que "salen" del canal
+            - [] si se perdió; 2 elementos si se duplicó; el datagrama puede estar corrompido
+        - solo_payload -> False: los errores pueden caer en cualquier byte (un error en la cabecera suele terminar en
+          formato inválido y timeout, no en NACK); True: solo en el payload (binario: después de la cabecera;
+          texto: entre el primer y el último '|')
+    """
+
+    def __init__(
+        self,
+        semilla=None,
+        probabilidad_paquete=0.0,
+        error_byte=0.0,
+        error_bit=0.0,
+        rafagas=None,
+        perdida=0.0,
+        duplicacion=0.0,
+        reordenamiento=0.0,
+        retardo=0.0,
+        jitter=0.0,
+        solo_payload=False,
+    ):
+        self.aleatorio = random.Random(semilla)
+        self.probabilidad_paquete = probabilidad_paquete # Probabilidad de corromper UN byte del datagrama (modo original)
+        self.error_byte = error_byte # Probabilidad de error de cada byte
+        self.error_bit = error_bit # Probabilidad de inversión de cada bit
+        self.rafagas = rafagas # GilbertElliott o None
+        self.perdida = perdida # Probabilidad de perder el datagrama
+        self.duplicacion = duplicacion # Probabilidad de entregar una copia extra
+        self.reordenamiento = reordenamiento # Probabilidad de demorar el datagrama para que lo pasen los siguientes
+        self.retardo = retardo # Retardo fijo (segundos)
+        self.jitter = jitter # Retardo aleatorio adicional, entre 0 y jitter (segundos)
+        self.solo_payload = solo_payload # True -> la cabecera (y la secuencia/CRC del formato texto) nunca se corrompe
+
+        # Contadores -> qué le hizo el canal a los datagramas
+        self.procesados = 0
+        self.perdidos = 0
+        self.corrompidos = 0
+        self.duplicados = 0
+        self.reordenados = 0
+
+    def _posiciones(self, cantidad, probabilidad):
+        """
+        Elige las posiciones con error entre 'cantidad' elementos, cada uno con la misma probabilidad
+            - Salta directamente de un error al siguiente (distribución geométrica) -> costo proporcional a la
+              cantidad de errores, no al tamaño del datagrama
+        """
+
+        if probabilidad <= 0 or cantidad == 0:
+            return
+
+        if probabilidad >= 1:
+            yield from range(cantidad)
+            return
+
+        logaritmo = math.log(1 - probabilidad)
+        posicion = -1
+
+        while True:
+            posicion += 1 + int(math.log(1 - self.aleatorio.random()) / logaritmo)
+            if posicion >= cantidad:
+                return
+            yield posicion
+
+    def corromper(self, datos):
+        """
+        Aplica los errores de bit/byte/ráfaga a un datagrama
+
+        - Parámetro -> datos (bytes, bytearray o memoryview)
+        - Return -> el mismo objeto si no hubo errores, o un bytearray corrompido
+        """
+
+        aleatorio = self.aleatorio
+        corrupto = None
+        inicio, fin = self._zona(datos) if self.solo_payload else (0, len(datos))
+        tamano = fin - inicio
+
+        def copia():
+            # Se copia una sola vez, recién con el primer error
+            return corrupto if corrupto is not None else bytearray(datos)
+
+        # Error de UN byte por datagrama (comportamiento original de simular_error)
+        if self.probabilidad_paquete and tamano and aleatorio.random() < self.probabilidad_paquete:
+            corrupto = copia()
+            corrupto[inicio + aleatorio.randrange(tamano)] ^= aleatorio.randrange(1, 256)
+
+        # Errores independientes por byte (más la tasa del estado actual de Gilbert-Elliott)
+        tasa_byte = self.error_byte
+        if self.rafagas is not None:
+            tasa_byte = min(1.0, tasa_byte + self.rafagas.avanzar(aleatorio))
+
+        for posicion in self._posiciones(tamano, tasa_byte):
+            corrupto = copia()
+            corrupto[inicio + posicion] ^= aleatorio.randrange(1, 256)
+
+        # Inversión de bits individuales
+        for posicion in self._posiciones(tamano * 8, self.error_bit):
+            corrupto = copia()
+            corrupto[inicio + (posicion >> 3)] ^= 0x80 >> (posicion & 7)
+
+        if corrupto is None:
+            return datos
+
+        self.corrompidos += 1
+        return corrupto
+
+    @staticmethod
+    def _zona(datos):
+        """
+        Bytes del datagrama que corresponden al payload (modo solo_payload)
+
+        - Parámetro -> datos (bytes, bytearray o memoryview)
+        - Return -> tuple(inicio, fin); vacía si el datagrama no tiene payload reconocible
+        """
+
+        if protocolo.es_binario(datos):
+            return min(protocolo.TAMANO_CABECERA, len(datos)), len(datos)
+
+        # Formato texto "secuencia|mensaje|CRC" -> solo el mensaje (los paquetes de texto son chicos, copiar no pesa)
+        texto = bytes(datos)
+        inicio = texto.find(b"|") + 1
+        fin = texto.rfind(b"|")
+
+        if inicio == 0 or fin < inicio:
+            return 0, 0
+
+        return inicio, fin
+
+    def aplicar(self, datos):
+        """
+        Hace pasar un datagrama por el canal
+
+        - Parámetro -> datos (bytes, bytearray o memoryview)
+        - Return -> lista de (retardo, datagrama)
+        """
+
+        aleatorio = self.aleatorio
+        self.procesados += 1
+
+        if self.perdida and aleatorio.random() < self.perdida:
+            self.perdidos += 1
+            return []
+
+        salidas = [(self._retardo(), self.corromper(datos))]
+
+        if self.duplicacion and aleatorio.random() < self.duplicacion:
+            self.duplicados += 1
+            salidas.append((self._retardo(), self.corromper(datos)))
+
+        return salidas
+
+    def _retardo(self):
+        """Retardo de un datagrama -> fijo + jitter; si se reordena, se demora lo suficiente para que lo pasen"""
+
+        retardo = self.retardo
+        if self.jitter:
+            retardo += self.aleatorio.uniform(0, self.jitter)
+
+        if self.reordenamiento and self.aleatorio.random() < self.reordenamiento:
+            self.reordenados += 1
+            retardo += self.retardo + self.jitter + 0.001
+
+        return retardo
+
+    def resumen(self):
+        """Return -> str: contadores del canal"""
+        return (
+            f"procesados {self.procesados} | perdidos {self.perdidos} | corrompidos {self.corrompidos} | "
+            f"duplicados {self.duplicados} | reordenados {self.reordenados}"
+        )
+
+
+class FiltroCanal:
+    """
+    Canal usado como filtro dentro de un proceso (por ej. el servidor)
+        - entrada(datos, direccion, ahora) -> hace pasar un datagrama por el canal
+        - listos(ahora) -> datagramas que ya "llegaron" (los que no tienen retardo salen de inmediato)
+        - proximo() -> momento en que vence el próximo datagrama demorado (o None)
+    """
+
+    def __init__(self, canal):
+        self.canal = canal
+        self.demorados = [] # heap de (momento, orden, datos, direccion)
+        self._orden = 0
+        self._inmediatos = []
+
+    def entrada(self, datos, direccion, ahora):
+        """
+        Hace pasar un datagrama recibido por el canal
+
+        - Parámetros:
+            - datos (bytes, bytearray o memoryview) -> datagrama recibido
+            - direccion -> tupla (IP, puerto) del que lo envió
+            - ahora (float) -> time.monotonic()
+        """
+
+        for retardo, salida in self.canal.aplicar(datos):
+            if retardo <= 0:
+                self._inmediatos.append((salida, direccion))
+            else:
+                # Se copia solo lo que queda demorado -> el buffer original puede reutilizarse
+                self._orden += 1
+                heapq.heappush(self.demorados, (ahora + retardo, self._orden, bytes(salida), direccion))
+
+    def listos(self, ahora):
+        """Generador de (datos, direccion) que ya salieron del canal (inmediatos y demorados vencidos)"""
+
+        inmediatos, self._inmediatos = self._inmediatos, []
+        yield from inmediatos
+
+        while self.demorados and self.demorados[0][0] <= ahora:
+            momento, orden, datos, direccion = heapq.heappop(self.demorados)
+            yield datos, direccion
+
+    def proximo(self):
+        """Return -> float: momento (time.monotonic) del próximo datagrama demorado, o None si no hay"""
+        return self.demorados[0][0] if self.demorados else None
+
+
+# ===================== PROXY UDP =====================
+# El cliente le envía al proxy; el proxy reenvía al servidor (y las respuestas al cliente) pasando por el canal
+
+class _ProtocoloSalida(asyncio.DatagramProtocol):
+    """Socket hacia el servidor para UN cliente -> el servidor ve un puerto distinto por cliente"""
+
+    def __init__(self, proxy, direccion_cliente):
+        self.proxy = proxy
+        self.direccion_cliente = direccion_cliente
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, datos, direccion):
+        # Respuesta del servidor -> vuelve al cliente pasando por el canal
+        self.proxy.reenviar(self.proxy.canal_vuelta, datos, self.proxy.transport, self.direccion_cliente)
+
+
+class ProxyCanal(asyncio.DatagramProtocol):
+    """
+    Proxy UDP con canal con fallas (en ambos sentidos, salvo que canal_vuelta sea None)
+        - salidas -> direccion_cliente -> (creación del socket hacia el servidor, último uso), ordenado por último uso
+          como la tabla de sesiones del servidor: se cierran los sockets sin uso durante ttl segundos y, si hay más
+          de max_salidas, los usados hace más tiempo
+    """
+
+    def __init__(self, servidor, canal_ida, canal_vuelta, ttl=SALIDA_TTL, max_salidas=MAX_SALIDAS):
+        self.servidor = servidor
+        self.canal_ida = canal_ida
+        self.canal_vuelta = canal_vuelta
+        self.ttl = ttl
+        self.max_salidas = max_salidas
+        self.transport = None
+        self.salidas = OrderedDict()
+        self.cerradas = 0 # Contador de sockets hacia el servidor cerrados (por TTL o por capacidad)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, datos, direccion_cliente):
+        asyncio.ensure_future(self._reenviar_al_servidor(datos, direccion_cliente))
+
+    async def _reenviar_al_servidor(self, datos, direccion_cliente):
+        # El socket hacia el servidor se crea con el primer datagrama del cliente -> se guarda la tarea para que
+        # los datagramas que llegan mientras se crea esperen al mismo socket
+        ahora = time.monotonic()
+        entrada = self.salidas.get(direccion_cliente)
+
+        if entrada is None:
+            loop = asyncio.get_running_loop()
+            creacion = asyncio.ensure_future(loop.create_datagram_endpoint(
+                lambda: _ProtocoloSalida(self, direccion_cliente),
+                remote_addr=self.servidor,
+            ))
+        else:
+            creacion = entrada[0]
+            self.salidas.move_to_end(direccion_cliente)
+
+        self.salidas[direccion_cliente] = (creacion, ahora)
+        self.expirar(ahora)
+
+        try:
+            transport, salida = await creacion
+        except OSError:
+            # No se pudo abrir el socket hacia el servidor -> se descarta el datagrama; el próximo lo vuelve a intentar
+            self.salidas.pop(direccion_cliente, None)
+            return
+
+        self.reenviar(self.canal_ida, datos, transport, None)
+
+    def expirar(self, ahora=None):
+        """
+        Cierra los sockets hacia el servidor sin uso durante más de ttl segundos (y los que sobran de max_salidas)
+
+        - Parámetro -> ahora (float): time.monotonic()
+        - Return -> int: cantidad de sockets cerrados
+        """
+
+        if ahora is None:
+            ahora = time.monotonic()
+
+        limite = ahora - self.ttl
+        cerradas = 0
+
+        # Los usados hace más tiempo están al principio -> se corta en el primero que sigue activo
+        while self.salidas:
+            direccion_cliente, (creacion, ultimo_uso) = next(iter(self.salidas.items()))
+            if ultimo_uso > limite and len(self.salidas) <= self.max_salidas:
+                break
+
+            del self.salidas[direccion_cliente]
+            creacion.add_done_callback(_cerrar_salida)
+            cerradas += 1
+
+        self.cerradas += cerradas
+        return cerradas
+
+    def reenviar(self, canal, datos, transport, direccion):
+        """Envía un datagrama por transport pasándolo antes por el canal (los demorados se programan con call_later)"""
+
+        if canal is None:
+            transport.sendto(datos, direccion)
+            return
+
+        loop = asyncio.get_running_loop()
+        for retardo, salida in canal.aplicar(datos):
+            if retardo <= 0:
+                transport.sendto(salida, direccion)
+            else:
+                loop.call_later(retardo, transport.sendto, bytes(salida), direccion)
+
+
+def _cerrar_salida(creacion):
+    """Cierra el socket hacia el servidor de una salida eliminada (apenas termine de crearse, si todavía no terminó)"""
+
+    if not creacion.cancelled() and creacion.exception() is None:
+        transport, salida = creacion.result()
+        transport.close()
+
+
+async def _proxy(argumentos):
+    """Arranca el proxy y muestra los contadores de cada sentido cada argumentos.intervalo segundos"""
+
+    def crear_canal(semilla):
+        rafagas = None
+        if argumentos.rafagas:
+            p_bueno_a_malo, p_malo_a_bueno, tasa_malo = argumentos.rafagas
+            rafagas = GilbertElliott(p_bueno_a_malo, p_malo_a_bueno, 0.0, tasa_malo)
+
+        return Canal(
+            semilla=semilla,
+            probabilidad_paquete=argumentos.error_paquete,
+            error_byte=argumentos.error_byte,
+            error_bit=argumentos.error_bit,
+            rafagas=rafagas,
+            perdida=argumentos.perdida,
+            duplicacion=argumentos.duplicacion,
+            reordenamiento=argumentos.reordenamiento,
+            retardo=argumentos.retardo,
+            jitter=argumentos.jitter,
+            solo_payload=argumentos.solo_payload,
+        )
+
+    # Cada sentido tiene su propio generador (semilla y semilla + 1) -> resultados repetibles
+    canal_ida = crear_canal(argumentos.semilla)
+    semilla_vuelta = None if argumentos.semilla is None else argumentos.semilla + 1
+    canal_vuelta = None if argumentos.solo_ida else crear_canal(semilla_vuelta)
+
+    host, port = argumentos.servidor.rsplit(":", 1)
+    loop = asyncio.get_running_loop()
+    transport, proxy = await loop.create_datagram_endpoint(
+        lambda: ProxyCanal((host, int(port)), canal_ida, canal_vuelta),
+        local_addr=(argumentos.host, argumentos.escuchar),
+    )
+
+    print(f"[Canal] Proxy {argumentos.host}:{argumentos.escuchar} -> {argumentos.servidor}")
+
+    try:
+        while True:
+            await asyncio.sleep(argumentos.intervalo)
+            proxy.expirar()
+            print(f"[Canal] Ida: {canal_ida.resumen()} | clientes {len(proxy.salidas)}")
+            if canal_vuelta is not None:
+                print(f"[Canal] Vuelta: {canal_vuelta.resumen()}")
+    finally:
+        transport.close()
+
+
+def main(argv=None):
+    """Punto de entrada del proxy -> lee las opciones de la línea de comandos"""
+
+    parser = argparse.ArgumentParser(description="Proxy UDP que simula un canal con fallas")
+    parser.add_argument("--host", default=HOST_PROXY, help="IP donde escucha el proxy")
+    parser.add_argument("--escuchar", type=int, default=PORT_PROXY, help="puerto donde escucha el proxy (el cliente le envía acá)")
+    parser.add_argument("--servidor", default=SERVIDOR, help="IP:puerto del servidor")
+    parser.add_argument("--semilla", type=int, help="semilla del generador aleatorio (resultados repetibles)")
+    parser.add_argument("--error-paquete", type=float, default=0.0, help="probabilidad de corromper un byte de cada datagrama")
+    parser.add_argument("--error-byte", type=float, default=0.0, help="probabilidad de error por byte")
+    parser.add_argument("--error-bit", type=float, default=0.0, help="probabilidad de inversión por bit")
+    parser.add_argument("--rafagas", type=float, nargs=3, metavar=("P_BM", "P_MB", "TASA_MALO"), help="Gilbert-Elliott: P(bueno->malo), P(malo->bueno), error por byte en estado malo")
+    parser.add_argument("--perdida", type=float, default=0.0, help="probabilidad de perder un datagrama")
+    parser.add_argument("--duplicacion", type=float, default=0.0, help="probabilidad de duplicar un datagrama")
+    parser.add_argument("--reordenamiento", type=float, default=0.0, help="probabilidad de demorar un datagrama para que lo pasen")
+    parser.add_argument("--retardo", type=float, default=0.0, help="retardo fijo en segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="retardo aleatorio adicional máximo en segundos")
+    parser.add_argument("--solo-payload", action="store_true", help="corromper solo el payload (nunca la cabecera)")
+    parser.add_argument("--solo-ida", action="store_true", help="no aplicar fallas a las respuestas del servidor")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_RESUMEN, help="cada cuántos segundos mostrar los contadores")
+    argumentos = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_proxy(argumentos))
+    except KeyboardInterrupt:
+        print("[Canal] Proxy detenido")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -15,59 +15,125 @@ EL CLIENTE DEBE:
 - Si luego de varios intentos no funciona -> informa el error
 """
 
+import argparse
+import functools
+import itertools
+import logging
+import mmap
+import os
+import random
 import socket
+import sys
 import time
+import zlib
+
+# Aritmética de números de secuencia para el modo ventana (Repetición Selectiva)
+from ventana import distancia, espacio_secuencia
+# Formato de los paquetes (binario con cabecera struct, o texto legado)
+import protocolo
+# Estimación de RTT y RTO adaptativo por servidor (Jacobson/Karels + backoff exponencial)
+from rtt import obtener_estimador
+# Control de congestión (AIMD) y ritmo de envío (token bucket) por servidor
+import congestion
+# Mensajes con niveles (logging) y métricas en memoria -> el detalle de cada intento solo se muestra con nivel DEBUG
+import registro
+from metricas import Metricas
+# Tiempos por etapa (armar, sendto, espera) -> opcionales, ver perfilado.py
+import perfilado
 
 
 # =============================================== CONFIGURACIÓN ====================================================
 HOST_SERVIDOR = "127.0.0.1" # IP del servidor en localhost -> se cambia la IP por la IP de la otra máquina para transmisión
 PORT_SERVIDOR = 5000 # Puerto del servidor
-MAX_TIEMPO_DE_ESPERA = 1.0 # (segundos)
+MAX_TIEMPO_DE_ESPERA = 1.0 # (segundos) RTO inicial -> luego se adapta al RTT medido de cada servidor
 MAX_INTENTOS = 5 # Cantidad máxima de reintentos -> luego de 5 intentos, abandona y reporta el error
+FORMATO = protocolo.FORMATO_BINARIO # Formato de los paquetes -> "binario" (cabecera struct) | "texto" (secuencia|mensaje|CRC, legado)
+MTU = 1472 # (bytes) Máximo de datos UDP que entran en una trama Ethernet (1500 - 20 IP - 8 UDP) -> tamaño máximo de cada paquete
+TAMANO_VENTANA = 1 # Paquetes en vuelo sin confirmar -> 1 = stop-and-wait (bit alternante); > 1 = Repetición Selectiva (debe coincidir con el servidor)
+ACK_SELECTIVO = True # Ventana > 1 en formato binario -> pide ACK acumulados + SACK (FLAG_SACK): una respuesta confirma muchos paquetes
+REENVIO_RAPIDO = 3 # Un paquete sin confirmar se reenvía sin esperar su temporizador si el SACK confirma esta cantidad de paquetes enviados después
+CONTROL_CONGESTION = True # Ventana > 1 -> los paquetes nuevos respetan la ventana de congestión y el ritmo del servidor (ver congestion.py)
+MARGEN_REORDENAMIENTO = 0.25 # ... y además pasó más de SRTT * (1 + este margen) desde su envío (si no, puede estar solo desordenado)
+COMPRIMIR_DESDE = 512 # (bytes) Formato binario -> los payloads de este tamaño o más se comprimen (FLAG_COMPRIMIDO) si así se achican; None = nunca
+NIVEL_COMPRESION = 1 # Nivel de zlib (1 = el más rápido ... 9 = el más chico) -> ver python benchmark.py compresion
+COMPRIMIR_HASTA = 64 * 1024 * 1024 # (bytes) Mensajes fragmentados más grandes van sin comprimir -> comprimir exige el mensaje completo en memoria (los archivos no se comprimen: se leen con mmap)
+NIVEL_LOG = registro.NIVEL # "INFO" muestra el resultado de cada mensaje; "DEBUG" además cada intento, timeout y respuesta
 # ==================================================================================================================
 
 
-# Función para calcular CRC -> se utiliza el mismo algoritmo que en server.py para que funcione la verificación
-def crc16_ccitt(data):
+# Bytes de datos por fragmento -> lo que queda del MTU después de la cabecera y la subcabecera de fragmento
+TAMANO_DATOS_FRAGMENTO = MTU - protocolo.TAMANO_CABECERA - protocolo.TAMANO_FRAGMENTO
+
+# Comando del modo interactivo para enviar un archivo
+COMANDO_ARCHIVO = "/archivo"
+
+# Identificadores de mensajes fragmentados -> empiezan en un valor aleatorio para no repetirse entre ejecuciones
+_ids_mensaje = itertools.count(random.getrandbits(32))
+
+# Logger y métricas del cliente -> enviados, ACK, NACK, timeouts, retransmisiones y RTT medido
+log = registro.obtener("Cliente")
+metricas = Metricas("cliente")
+
+
+# FUNCIÓN: comprimir el payload de un paquete binario -> solo si es grande y si comprimido ocupa menos
+def comprimir_payload(payload, flags, maximo=protocolo.MAX_DESCOMPRIMIDO):
     """
-    Calcula el CRC16-CCITT del mensaje a enviar
-        - CRC (Verificación de Redundancia Cíclica) -> es un código matemático que identifica el mensaje de forma única
-            - Si cambia un bit del mensaje, el código cambia por completo
-        - Detecta errores de transmisión
-        - Verifica la integridad del mensaje
+    Comprime el payload si tiene COMPRIMIR_DESDE bytes o más y el resultado es más chico
+        - Un payload chico (o ya comprimido, o aleatorio) no se achica: comprimirlo solo gastaría CPU en los dos extremos
+        - Un payload de más de 'maximo' bytes no se comprime -> el servidor no descomprime más que
+          protocolo.MAX_DESCOMPRIMIDO por paquete: un mensaje así se tiene que enviar fragmentado (ver enviar_datos())
 
-    - Parámetros -> data: str o bytes >>> el mensaje del que se calcuralá el CRC
-    - Return -> int, número de 16 bits que representa el CRC
+    - Parámetros:
+        payload -> bytes, bytearray o memoryview a enviar
+        flags -> flags de la cabecera binaria
+        maximo -> largo máximo sin comprimir que se comprime (por defecto, lo que el servidor descomprime en un paquete)
 
+    - Return -> tuple(payload, flags): el payload comprimido con FLAG_COMPRIMIDO agregado, o los mismos valores
     """
 
-    # Convierte el mensaje a bytes -> la computadora trabaja con números, no con letras
-    if type(data) == str:
-        data = data.encode("utf-8")
+    if COMPRIMIR_DESDE is None or len(payload) < COMPRIMIR_DESDE or len(payload) > maximo:
+        return payload, flags
 
-    # Se inicializa el CRC -> valor inicial estándar para CRC16-CCITT: 0xFFFF en hexa
-    crc = 0xFFFF
+    comprimido = protocolo.comprimir(payload, NIVEL_COMPRESION)
 
-    # Se procesa cada byte del mensaje -> cada byte modifica el crc de forma matemática
-    for byte in data:
-        crc = crc ^ (byte << 8)
+    if comprimido is None:
+        metricas.sumar("sin_comprimir")
+        return payload, flags
 
-        # Se procesa cada bit del byte usando el polinomio 0x1021
-        for i in range(8):
-            # Verificar si el el primer bit es 1
-            if crc & 0x8000:
-                # Si es 1 -> desplaza crc un bit a la izquierda (empuja todos los bits hacia izquierda. Por ej: 1011 << 1 = 0110)
-                crc = (crc << 1) ^ 0x1021
-            else:
-                # Si es 0 -> desplaza un bit a izquierda
-                crc = crc << 1
+    metricas.sumar("comprimidos")
+    metricas.sumar("bytes_ahorrados", len(payload) - len(comprimido))
+    return comprimido, flags | protocolo.FLAG_COMPRIMIDO
 
-            # Se mantienen solo 16 bits (en caso de generar más números con desplazamiento)
-            crc = crc & 0xFFFF
-    
-    # Se retorna la "huella" del mensaje
-    return crc
 
+# FUNCIÓN: construir el paquete en el formato configurado
+def armar_paquete(secuencia, mensaje, formato=None, flags=0):
+    """
+    Construye el paquete a enviar en el formato configurado (FORMATO)
+        - binario -> cabecera struct (magia, versión, flags, secuencia, longitud, CRC) + payload en bytes crudos
+          (comprimido si corresponde, ver comprimir_payload())
+        - texto -> "secuencia|mensaje|CRC" (el mensaje no puede contener "|")
+
+    - Parámetros:
+        secuencia -> número de secuencia del mensaje
+        mensaje -> str o bytes a enviar
+        formato -> FORMATO_BINARIO | FORMATO_TEXTO (por defecto, FORMATO)
+        flags -> flags de la cabecera binaria (por ej. protocolo.FLAG_SACK); el formato texto no tiene flags
+
+    - Return -> bytes listos para sendto()
+    """
+
+    if formato is None:
+        formato = FORMATO
+
+    if formato == protocolo.FORMATO_TEXTO:
+        if not isinstance(mensaje, str):
+            mensaje = mensaje.decode("utf-8")
+        return protocolo.construir_paquete_texto(secuencia, mensaje)
+
+    if isinstance(mensaje, str):
+        mensaje = mensaje.encode("utf-8")
+
+    return protocolo.construir_paquete(secuencia, *comprimir_payload(mensaje, flags))
 
 
 # FUNCIÓN: enviar mensaje con retransmisión automática -> implementa la lógica de transmisión confiable
@@ -81,25 +147,42 @@ def enviar_mensaje(sock, direccion_servidor, secuencia, mensaje):
         3. Envia el paquete al servidor
         4. Espera respuesta -> ACK|NACK
             - ACK -> éxito
-            - NACK -> reintenta
+            - NACK -> reintenta inmediatamente
+            - Timeout -> duplica el tiempo de espera (backoff exponencial con jitter) y reintenta
         5. Repite hasta MAX_INTENTOS veces
+
+    - El tiempo de espera (RTO) se calcula a partir del RTT medido del servidor -> ver rtt.py
     
     - Parámetros:
         sock -> el socket UDP para enviar/recibir datos
         direccion_servidor -> tupla(IP, puerto) del servidor
         secuencia -> número de secuencia del mensaje (0 - 1)
-        mensaje -> el texto a enviar
+        mensaje -> el texto (str) o los bytes a enviar
     
     - Return -> bool; True si el envío fue OK, False si falló después de todos los intentos
 
     """
     
-    # Se calcula el CRC del mensaje -> este código será usado por el servidor para verificar la integridad del mensaje
-    crc = crc16_ccitt(mensaje)
+    # Construcción del paquete completo (binario o secuencia|mensaje|crc) -> incluye el CRC que el servidor usará para verificar la integridad
+    inicio = time.perf_counter() if perfilado.etapas else 0.0
+    paquete = armar_paquete(secuencia, mensaje)
+
+    if perfilado.etapas:
+        metricas.registrar("etapa_armar_us", (time.perf_counter() - inicio) * 1e6)
 
-    # Construcción del paquete completo: secuencia|mensaje|crc
-    # Conversión CRC a hexadecimal -> formato: 04x = 4 dígitos hex
-    paquete = f"{str(secuencia)}|{mensaje}|{format(crc, "04X")}"
+    # Estimador de RTT del servidor -> define cuánto esperar cada respuesta
+    estimador = obtener_estimador(direccion_servidor, MAX_TIEMPO_DE_ESPERA)
+    timeout_original = sock.gettimeout()
+
+    try:
+        return _reintentar(sock, direccion_servidor, secuencia, mensaje, paquete, estimador)
+    finally:
+        # Se restaura el timeout que tenía el socket
+        sock.settimeout(timeout_original)
+
+
+def _reintentar(sock, direccion_servidor, secuencia, mensaje, paquete, estimador):
+    """Bucle de reintentos de enviar_mensaje() -> Return: bool (True si se recibió el ACK)"""
 
     # Se inicializa el contador de intentos
     intentos = 0
@@ -110,89 +193,834 @@ def enviar_mensaje(sock, direccion_servidor, secuencia, mensaje):
         # Incrementar contador de intentos
         intentos += 1
 
-        # Se informa al usuario sobre el envío
-        print(f"\n[Cliente] Enviando... (intento {intentos} de {MAX_INTENTOS})")
-        print(f"\tSecuencia: {secuencia}")
-        print(f"\tMensaje: {mensaje}")
-        print(f"\tCRC: {format(crc, "04X")}")
+        # Se informa el envío (nivel DEBUG) -> el resumen del estimador solo se arma si se va a mostrar
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Enviando... (intento %d de %d) | secuencia %d | formato %s | %s", intentos, MAX_INTENTOS, secuencia, FORMATO, estimador.resumen())
+            log.debug("Mensaje: %s", mensaje)
+
+        metricas.sumar("enviados" if intentos == 1 else "retransmisiones")
 
         # Envio del paquete al servidor -> sendto() envía datos por UDP a una dirección especifica
-        # paquete.encode(...) -> convierte str a bytes
+        # paquete -> ya está en bytes
         # direccion_servidor -> tupla (IP, puerto) del destino
-        sock.sendto(paquete.encode("utf-8"), direccion_servidor)
+        etapas = perfilado.etapas
+        inicio = time.perf_counter() if etapas else 0.0
+        sock.sendto(paquete, direccion_servidor)
+        enviado = time.monotonic()
 
-        print("[Cliente] Esperando respuesta...")
+        if etapas:
+            metricas.registrar("etapa_sendto_us", (time.perf_counter() - inicio) * 1e6)
+            inicio = time.perf_counter()
+
+        # El tiempo de espera se adapta al RTT del servidor (+ jitter aleatorio)
+        sock.settimeout(estimador.espera())
 
         # Intentar hasta recibir respuesta del servidor
         # Se usa try-except para manejar la respuesta recibida (y procesarla) y el timeout (para reintentar)
         try:
             # Se reciben datos del servidor -> recvfrom() espera hasta recibir datos o hasta timeout (si pasa el tiempo sin respuesta, lanza excepción)
-            respuesta, direccion = sock.recvfrom(1024)
-
-            # Se decodifican bytes a texto
-            respuesta_texto = respuesta.decode("utf-8")
-            
-            print(f"[Cliente] Respuesta recibida: {respuesta_texto}")
+            try:
+                respuesta, direccion = sock.recvfrom(1024)
+            finally:
+                # La espera se mide también si termina en timeout
+                if etapas:
+                    metricas.registrar("etapa_espera_us", (time.perf_counter() - inicio) * 1e6)
 
-            # Parsear la respuesta -> formato esperado: "ACK 0" | "NACK 1"
-            partes_respuesta = respuesta_texto.split()
+            # Parsear la respuesta -> "ACK 0" | "NACK 1" (texto) o cabecera con flag ACK/NACK (binario)
+            try:
+                tipo, seq_respuesta, mapa = protocolo.leer_respuesta(respuesta)
+            except protocolo.ErrorFormato:
+                # Respuesta inválida o corrupta -> se descarta y se reintenta
+                metricas.sumar("respuestas_invalidas")
+                log.debug("Respuesta inválida recibida")
+                tipo = None
 
-            # Se valida que tenga exactamente 2 partes (por formato esperado)
-            if len(partes_respuesta) == 2:
-
-                # Se extraen el tipo de respuesta y la secuencia
-                tipo = partes_respuesta[0]  # ACK | NACK
-                seq_respuesta = int(partes_respuesta[1]) # 0 | 1
+            if tipo is not None:
+                log.debug("Respuesta recibida: %s %d", tipo, seq_respuesta)
 
                 # ACK recibido -> el mensaje se recibió correctamente
                 if tipo == "ACK" and seq_respuesta == secuencia:
                     # ACK con secuencia correcta -> transmisión de datos exitosa
-                    print("[Cliente] ACK recibido - Mensaje entregado exitosamente")
+                    # Algoritmo de Karn -> el RTT solo se mide si el paquete se envió una vez
+                    if intentos == 1:
+                        rtt = time.monotonic() - enviado
+                        estimador.muestra(rtt)
+                        metricas.registrar("rtt_us", rtt * 1e6)
+
+                    metricas.sumar("ack")
+                    log.info("ACK recibido - Mensaje entregado exitosamente")
                     return True  # Salir de la función, la transmisión del mensaje fue OK
                 
                 # NACK recibido -> el mensaje se recibió pero estaba corrupto (error de transmisión o CRC no coincide)
                 elif tipo == "NACK":
-                    print("[Cliente] NACK recibido - Error detectado, reintentando...")
-                    
-                    # Se espera 1s antes de reintentar la transmisión
-                    time.sleep(1.0)
+                    # El servidor respondió -> el enlace funciona, se reintenta inmediatamente (sin backoff)
+                    metricas.sumar("nack")
+                    log.debug("NACK recibido - Error detectado, reintentando...")
                     # El loop continua y reintenta...
 
         # Manejo del timeout -> recvfrom() no recibió nada en el tiempo límite, se lanzó la excepción
         except socket.timeout:
             # Si el servidor no respondió a tiempo y pasó el tiempo de respuesta -> reintenta
-            print("[Cliente] Timeout - No hubo respuesta del servidor")
-            print("[Cliente] Reintentando...")
-            time.sleep(1.0)
+            # Se duplica el tiempo de espera (backoff exponencial) -> no se satura un servidor o enlace congestionado
+            estimador.timeout()
+            metricas.sumar("timeouts")
+
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Timeout - No hubo respuesta del servidor. Reintentando... (%s)", estimador.resumen())
             # El loop continua y reintenta
 
         
     # Si se llegó hasta acá, no hay más intentos -> No se pudo entregar el mensaje
-    print(f"[Cliente] ERROR: No se pudo entregar el mensaje luego de {MAX_INTENTOS} intentos")
+    metricas.sumar("fallidos")
+    log.error("ERROR: No se pudo entregar el mensaje luego de %d intentos", MAX_INTENTOS)
     return False  # Se indica el fracaso de la transmisión
     
 
+# FUNCIÓN: enviar varios mensajes con ventana deslizante -> Repetición Selectiva (Selective Repeat)
+def enviar_mensajes_ventana(sock, direccion_servidor, secuencia_inicial, mensajes, tamano_ventana=None, armar=None, estadisticas=None):
+    """
+    Envía una secuencia de mensajes manteniendo hasta tamano_ventana paquetes en vuelo (sin esperar cada ACK)
+        - Cada paquete se construye al enviarse por primera vez y se libera al confirmarse
+          -> en memoria hay como máximo tamano_ventana paquetes, aunque 'mensajes' sea un generador enorme
+
+    - Funcionamiento:
+        1. Envía paquetes mientras haya lugar en la ventana
+        2. Cada paquete tiene su propio temporizador de retransmisión
+        3. ACK n -> confirma SOLO el paquete n; la ventana avanza cuando se confirma el más antiguo
+        4. NACK n -> retransmite SOLO el paquete n, inmediatamente
+        5. Timeout de un paquete -> retransmite SOLO ese paquete y duplica el RTO (backoff exponencial)
+        6. Si un paquete supera MAX_INTENTOS, se abandona la transmisión
+        7. Con CONTROL_CONGESTION, los paquetes en vuelo no superan la ventana de congestión y los nuevos salen al ritmo
+           del servidor (token bucket); ACK agrandan la ventana, NACK / pérdidas la reducen a la mitad y los timeouts al mínimo
+        8. Con ACK_SELECTIVO (formato binario) los paquetes llevan FLAG_SACK y el servidor responde con ACK acumulados:
+            - SACK base + mapa -> confirma todos los anteriores a base y los marcados en el mapa de bits
+            - Un hueco con REENVIO_RAPIDO paquetes posteriores ya confirmados se retransmite sin esperar su temporizador
+
+    - Parámetros:
+        sock -> el socket UDP para enviar/recibir datos
+        direccion_servidor -> tupla(IP, puerto) del servidor
+        secuencia_inicial -> número de secuencia del primer mensaje
+        mensajes -> lista o generador de mensajes a enviar (en orden)
+        tamano_ventana -> cantidad máxima de paquetes sin confirmar (None = TAMANO_VENTANA al momento de la llamada,
+            así también vale el valor de --ventana)
+        armar -> función (secuencia, mensaje, flags=0) -> bytes que construye cada paquete (por defecto, armar_paquete)
+        estadisticas -> EstadisticasEnvio opcional donde se acumulan mensajes, bytes, retransmisiones y latencias
+
+    - Return -> int; cantidad de mensajes entregados en orden (== cantidad de mensajes si todo salió bien)
+    """
+
+    # La configuración se lee ahora y no al definir la función -> main() la cambia con las opciones
+    if tamano_ventana is None:
+        tamano_ventana = TAMANO_VENTANA
+
+    espacio = espacio_secuencia(tamano_ventana)
+
+    if armar is None:
+        armar = armar_paquete
+
+    # ACK acumulado + SACK -> solo en modo ventana (en stop-and-wait cada paquete ya se confirma solo) y formato binario
+    selectivo = ACK_SELECTIVO and tamano_ventana > 1 and FORMATO == protocolo.FORMATO_BINARIO
+
+    # Los mensajes se toman de a uno -> recién se construye el paquete cuando hay lugar en la ventana
+    pendientes = iter(mensajes)
+    agotados = False
+
+    # Paquetes en vuelo (con su CRC) -> índice del mensaje -> paquete
+    paquetes = {}
+
+    # Estado de la ventana de envío
+    base = 0                # índice del mensaje más antiguo sin confirmar
+    siguiente = 0           # índice del próximo mensaje a enviar por primera vez
+    confirmados = set()     # índices confirmados con ACK (pueden llegar fuera de orden)
+    vencimientos = {}       # índice -> momento en que vence su temporizador
+    intentos = {}           # índice -> cantidad de envíos realizados (solo paquetes en vuelo)
+    envios = {}             # índice -> momento del último envío (para medir el RTT); se borra cuando la base lo pasa
+                            # -> los confirmados fuera de orden lo conservan para el reenvío rápido por SACK
+
+    # Estimador de RTT del servidor -> define el temporizador de cada paquete
+    estimador = obtener_estimador(direccion_servidor, MAX_TIEMPO_DE_ESPERA)
+
+    # Control de congestión del servidor -> limita los paquetes en vuelo y el ritmo de los nuevos (None = sin límite)
+    control = congestion.obtener_control(direccion_servidor, MAX_TIEMPO_DE_ESPERA) if CONTROL_CONGESTION and tamano_ventana > 1 else None
+
+    def transmitir(indice):
+        # Envía (o reenvía) un paquete y reinicia su temporizador
+        intentos[indice] = intentos.get(indice, 0) + 1
+
+        if perfilado.etapas:
+            inicio = time.perf_counter()
+            sock.sendto(paquetes[indice], direccion_servidor)
+            metricas.registrar("etapa_sendto_us", (time.perf_counter() - inicio) * 1e6)
+        else:
+            sock.sendto(paquetes[indice], direccion_servidor)
+
+        envios[indice] = time.monotonic()
+        vencimientos[indice] = envios[indice] + estimador.espera()
+
+        metricas.sumar("enviados" if intentos[indice] == 1 else "retransmisiones")
+
+        if estadisticas is not None:
+            if intentos[indice] == 1:
+                estadisticas.enviado(indice, len(paquetes[indice]), envios[indice])
+            else:
+                estadisticas.retransmisiones += 1
+
+    def confirmar(indice):
+        # Confirma un paquete en vuelo y lo libera (la ventana avanza después, hasta el primero sin confirmar)
+        del vencimientos[indice]
+        del paquetes[indice]
+        del intentos[indice]
+
+        if estadisticas is not None:
+            estadisticas.confirmado(indice, time.monotonic())
+        confirmados.add(indice)
+
+    def procesar_sack(seq_base, mapa):
+        # ACK acumulado -> índice (relativo a la transmisión) de la próxima secuencia que espera el servidor
+        base_servidor = base + distancia((secuencia_inicial + base) % espacio, seq_base, espacio)
+
+        # Base fuera de lo enviado -> respuesta de otra transmisión (o corrupta con CRC válido), se ignora
+        if base_servidor > siguiente:
+            return
+
+        metricas.sumar("sack")
+        ahora = time.monotonic()
+
+        # Paquetes recibidos fuera de orden según el mapa de bits (de menor a mayor)
+        selectivos = [base_servidor + 1 + posicion for posicion in protocolo.recibidos_sack(mapa)]
+        selectivos = [indice for indice in selectivos if base <= indice < siguiente]
+
+        # Confirmados por esta respuesta: todos los anteriores a la base del servidor + los marcados en el mapa
+        nuevos = [indice for indice in range(base, base_servidor) if indice in vencimientos]
+        nuevos += [indice for indice in selectivos if indice in vencimientos]
+
+        # Algoritmo de Karn -> solo paquetes enviados una vez; el más reciente es el que menos esperó la respuesta demorada
+        muestras = [ahora - envios[indice] for indice in nuevos if intentos[indice] == 1]
+        if muestras:
+            rtt = min(muestras)
+            estimador.muestra(rtt)
+            metricas.registrar("rtt_us", rtt * 1e6)
+
+        metricas.sumar("ack", len(nuevos))
+        en_vuelo = len(vencimientos)
+        for indice in nuevos:
+            confirmar(indice)
+
+        if control is not None and nuevos:
+            control.confirmados(len(nuevos), en_vuelo)
+
+        # Huecos -> un paquete sin confirmar se da por perdido si llegaron REENVIO_RAPIDO paquetes enviados después de él
+        # y ya tendría que haber llegado (SRTT + margen); si solo viene desordenado, todavía puede llegar
+        espera_perdida = estimador.srtt * (1 + MARGEN_REORDENAMIENTO) if estimador.srtt is not None else 0.0
+
+        for indice in range(base_servidor, selectivos[-1] if selectivos else base_servidor):
+            if indice not in vencimientos or intentos[indice] >= MAX_INTENTOS or ahora - envios[indice] < espera_perdida:
+                continue
+
+            posteriores = sum(1 for otro in selectivos if envios[otro] > envios[indice])
+            if posteriores >= REENVIO_RAPIDO:
+                metricas.sumar("reenvios_rapidos")
+                log.debug("SACK - reenvío rápido de la secuencia %d", (secuencia_inicial + indice) % espacio)
+
+                # Paquete perdido -> disminución multiplicativa (varios huecos del mismo RTT cuentan como una sola pérdida)
+                if control is not None:
+                    control.perdida(ahora)
+                transmitir(indice)
+
+    timeout_original = sock.gettimeout()
+
+    try:
+        while True:
+
+            # Se llena la ventana con paquetes nuevos
+            while not agotados and siguiente - base < tamano_ventana:
+                # Ventana de congestión llena o todavía no es el turno del próximo paquete (ritmo) -> se espera
+                if control is not None and (len(vencimientos) >= control.limite() or control.espera() > 0):
+                    break
+
+                mensaje = next(pendientes, None)
+                if mensaje is None:
+                    agotados = True
+                    break
+
+                etapas = perfilado.etapas
+                inicio = time.perf_counter() if etapas else 0.0
+
+                if selectivo:
+                    flags = protocolo.FLAG_SACK
+
+                    # Este paquete llena la ventana de congestión -> el servidor no debe demorar el ACK (no llegará nada más)
+                    if control is not None and len(vencimientos) + 1 >= control.limite():
+                        flags |= protocolo.FLAG_ACK_INMEDIATO
+
+                    paquetes[siguiente] = armar((secuencia_inicial + siguiente) % espacio, mensaje, flags=flags)
+                else:
+                    paquetes[siguiente] = armar((secuencia_inicial + siguiente) % espacio, mensaje)
+
+                if etapas:
+                    metricas.registrar("etapa_armar_us", (time.perf_counter() - inicio) * 1e6)
+
+                transmitir(siguiente)
+                siguiente += 1
+
+                if control is not None:
+                    control.enviado()
+
+            # Todos los mensajes enviados y confirmados -> terminó la transmisión
+            if agotados and base == siguiente:
+                break
+
+            # Se retransmiten los paquetes cuyo temporizador venció
+            ahora = time.monotonic()
+            vencidos = [indice for indice, vencimiento in vencimientos.items() if vencimiento <= ahora]
+
+            # Un solo backoff por ronda de timeouts -> varios paquetes vencidos a la vez son el mismo evento
+            if vencidos:
+                estimador.timeout()
+                metricas.sumar("timeouts", len(vencidos))
+
+                if control is not None:
+                    control.timeout()
+
+            for indice in vencidos:
+                if intentos[indice] >= MAX_INTENTOS:
+                    metricas.sumar("fallidos")
+                    log.error("ERROR: No se pudo entregar la secuencia %d luego de %d intentos", (secuencia_inicial + indice) % espacio, MAX_INTENTOS)
+                    return base
+
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Timeout - retransmitiendo secuencia %d (%s)", (secuencia_inicial + indice) % espacio, estimador.resumen())
+                transmitir(indice)
+
+            # Se espera una respuesta hasta que venza el temporizador más próximo
+            espera = min(vencimientos.values()) - time.monotonic() if vencimientos else None
+
+            # ... o hasta el turno del próximo paquete nuevo, si solo el ritmo impide enviarlo
+            if control is not None and not agotados and siguiente - base < tamano_ventana and len(vencimientos) < control.limite():
+                ritmo = control.espera()
+                espera = ritmo if espera is None else min(espera, ritmo)
+
+            sock.settimeout(max(espera or 0, 0.001))
+            etapas = perfilado.etapas
+            inicio = time.perf_counter() if etapas else 0.0
+
+            try:
+                respuesta, direccion = sock.recvfrom(1024)
+            except socket.timeout:
+                continue  # El próximo ciclo retransmite el paquete vencido
+            finally:
+                if etapas:
+                    metricas.registrar("etapa_espera_us", (time.perf_counter() - inicio) * 1e6)
+
+            # Parsear la respuesta -> ACK n | NACK n (en cualquiera de los dos formatos) | SACK base + mapa
+            try:
+                tipo, seq_respuesta, mapa = protocolo.leer_respuesta(respuesta)
+            except protocolo.ErrorFormato:
+                continue
+
+            if tipo == "SACK":
+                procesar_sack(seq_respuesta, mapa)
+
+                while base in confirmados:
+                    confirmados.discard(base)
+                    del envios[base]
+                    base += 1
+
+                continue
+
+            # Índice del mensaje confirmado -> relativo a la base de la ventana (con ventana 1 la secuencia es solo 0-1)
+            indice = base + distancia((secuencia_inicial + base) % espacio, seq_respuesta, espacio)
+
+            # Respuestas de paquetes que no están en vuelo (viejas o duplicadas) -> se ignoran
+            if indice not in vencimientos:
+                continue
+
+            if tipo == "ACK":
+                # Algoritmo de Karn -> el RTT solo se mide si el paquete se envió una vez
+                if intentos[indice] == 1:
+                    rtt = time.monotonic() - envios[indice]
+                    estimador.muestra(rtt)
+                    metricas.registrar("rtt_us", rtt * 1e6)
+
+                metricas.sumar("ack")
+
+                # Se confirma solo ese paquete (y se libera); la ventana avanza hasta el primer paquete sin confirmar
+                confirmar(indice)
+
+                if control is not None:
+                    control.confirmados(1, len(vencimientos) + 1)
+
+                while base in confirmados:
+                    confirmados.discard(base)
+                    del envios[base]
+                    base += 1
+
+            elif tipo == "NACK":
+                # Paquete corrupto -> se retransmite solo ese, sin esperar su temporizador
+                metricas.sumar("nack")
+
+                if control is not None:
+                    control.perdida(nack=True)
+
+                if intentos[indice] >= MAX_INTENTOS:
+                    metricas.sumar("fallidos")
+                    log.error("ERROR: No se pudo entregar la secuencia %d luego de %d intentos", seq_respuesta, MAX_INTENTOS)
+                    return base
+
+                transmitir(indice)
+
+    finally:
+        # Se restaura el timeout que tenía el socket
+        sock.settimeout(timeout_original)
+
+    return base
+
+
+# FUNCIÓN: dividir datos en fragmentos -> generador (no copia los datos)
+def fragmentar(datos, tamano=None):
+    """
+    Divide los datos en fragmentos de hasta 'tamano' bytes
+        - Cada fragmento es un memoryview sobre 'datos' -> no se copia nada hasta construir el paquete
+        - Todos los fragmentos llevan el id del mensaje, su índice, el total y el CRC-32 del mensaje completo
+
+    - Parámetros:
+        datos -> bytes, bytearray, memoryview o mmap con el mensaje completo
+        tamano -> bytes de datos por fragmento (por defecto, lo que entra en un paquete de MTU bytes)
+
+    - Return -> generador de protocolo.Fragmento
+    """
+
+    if tamano is None:
+        tamano = TAMANO_DATOS_FRAGMENTO
+
+    vista = memoryview(datos)
+    id_mensaje = next(_ids_mensaje) & 0xFFFFFFFF
+
+    # CRC-32 del mensaje completo -> el servidor lo verifica al terminar de reensamblar
+    crc_mensaje = zlib.crc32(vista)
+
+    # Un mensaje vacío se envía igual, como un único fragmento sin datos
+    total = max(1, -(-len(vista) // tamano))
+
+    for indice in range(total):
+        yield protocolo.Fragmento(id_mensaje, indice, total, crc_mensaje, vista[indice * tamano:(indice + 1) * tamano])
+
+
+def armar_fragmento(secuencia, fragmento, flags=0, comprimido=False):
+    """
+    Construye el paquete binario de un fragmento (función 'armar' para enviar_mensajes_ventana)
+        - comprimido -> el mensaje completo va comprimido (ver comprimir_mensaje()): el primer fragmento lleva FLAG_COMPRIMIDO
+    """
+
+    id_mensaje, indice, total, crc_mensaje, datos = fragmento
+
+    if comprimido and indice == 0:
+        flags |= protocolo.FLAG_COMPRIMIDO
+
+    return protocolo.construir_fragmento(secuencia, id_mensaje, indice, total, crc_mensaje, datos, flags=flags)
+
+
+# FUNCIÓN: comprimir un mensaje grande -> una sola vez, ANTES de fragmentarlo
+def comprimir_mensaje(datos):
+    """
+    Comprime el mensaje completo si corresponde (ver comprimir_payload()) y no supera COMPRIMIR_HASTA
+        - Comprimir antes de dividir -> hay menos fragmentos (comprimir cada fragmento por separado no los reduce)
+        - El resultado empieza con el largo sin comprimir (protocolo.LARGO_ORIGINAL), que viaja en el primer fragmento
+
+    - Parámetro -> datos: bytes, bytearray, memoryview o mmap con el mensaje completo
+    - Return -> tuple(datos a fragmentar, comprimido (bool))
+    """
+
+    if FORMATO != protocolo.FORMATO_BINARIO:
+        return datos, False
+
+    comprimido, flags = comprimir_payload(datos, 0, COMPRIMIR_HASTA)
+
+    if not flags & protocolo.FLAG_COMPRIMIDO:
+        return datos, False
+
+    return protocolo.LARGO_ORIGINAL.pack(len(datos)) + comprimido, True
+
+
+# FUNCIÓN: enviar datos grandes -> fragmentación + ventana deslizante
+def enviar_datos(sock, direccion_servidor, secuencia_inicial, datos, tamano_ventana=None, comprimir=True):
+    """
+    Envía datos de cualquier tamaño divididos en fragmentos (uno por paquete)
+        - Cada fragmento tiene su propio número de secuencia y su propio CRC16
+        - Se usa la ventana deslizante (con ventana 1 -> stop-and-wait)
+        - Con 'comprimir', si se achican, los datos se comprimen completos antes de dividirlos (comprimir_mensaje())
+        - Requiere el formato binario
+
+    - Parámetros:
+        sock -> el socket UDP para enviar/recibir datos
+        direccion_servidor -> tupla(IP, puerto) del servidor
+        secuencia_inicial -> número de secuencia del primer fragmento
+        datos -> bytes, bytearray, memoryview o mmap
+        tamano_ventana -> cantidad máxima de fragmentos sin confirmar (None = TAMANO_VENTANA)
+        comprimir -> False para enviar los datos tal cual (por ej. un mmap: comprimirlo lo leería completo)
+
+    - Return -> tuple(entregados, total) con la cantidad de fragmentos
+    """
+
+    if FORMATO != protocolo.FORMATO_BINARIO:
+        raise ValueError("La fragmentación requiere el formato binario")
+
+    enviados, comprimido = comprimir_mensaje(datos) if comprimir else (datos, False)
+    fragmentos = fragmentar(enviados)
+    total = max(1, -(-len(enviados) // TAMANO_DATOS_FRAGMENTO))
+    armar = functools.partial(armar_fragmento, comprimido=True) if comprimido else armar_fragmento
+
+    if comprimido:
+        log.info("Enviando %d bytes (%d comprimidos) en %d fragmentos...", len(datos), len(enviados), total)
+    else:
+        log.info("Enviando %d bytes en %d fragmentos...", len(datos), total)
+
+    try:
+        entregados = enviar_mensajes_ventana(sock, direccion_servidor, secuencia_inicial, fragmentos, tamano_ventana, armar)
+    finally:
+        # Se cierra el generador -> libera su memoryview sobre los datos (necesario para poder cerrar un mmap)
+        fragmentos.close()
+
+    return entregados, total
+
+
+# FUNCIÓN: enviar un archivo -> se lee a través de un mmap, sin cargarlo completo en memoria
+def enviar_archivo(sock, direccion_servidor, secuencia_inicial, ruta, tamano_ventana=None):
+    """
+    Envía un archivo del disco fragmentado
+        - El archivo se mapea en memoria (mmap) -> el sistema operativo lee del disco solo las páginas que se envían
+        - Cada fragmento se copia recién al construir su paquete
+        - No se comprime -> comprimir el mensaje completo obligaría a leer el archivo entero y a guardar otra copia en memoria
+
+    - Parámetros:
+        ruta -> ruta del archivo a enviar
+        (el resto igual que enviar_datos)
+
+    - Return -> tuple(entregados, total) con la cantidad de fragmentos
+    """
+
+    with open(ruta, "rb") as archivo:
+        # Un archivo vacío no se puede mapear -> se envía como mensaje vacío
+        if os.fstat(archivo.fileno()).st_size == 0:
+            return enviar_datos(sock, direccion_servidor, secuencia_inicial, b"", tamano_ventana)
+
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            return enviar_datos(sock, direccion_servidor, secuencia_inicial, mapa, tamano_ventana, comprimir=False)
+
+
+# Estadísticas del modo no interactivo -> se muestran como resumen al final
+class EstadisticasEnvio:
+    """
+    Estadísticas de un envío masivo (modo no interactivo)
+        - mensajes, bytes -> mensajes distintos enviados y bytes de sus paquetes (sin contar retransmisiones)
+        - entregados, retransmisiones -> mensajes confirmados con ACK y paquetes reenviados
+        - sin_enviar -> mensajes que nunca se enviaron (rechazados, o pendientes cuando se abandonó la transmisión)
+        - latencias -> segundos desde el primer envío de cada mensaje hasta su ACK
+    """
+
+    def __init__(self):
+        self.mensajes = 0
+        self.bytes = 0
+        self.entregados = 0
+        self.retransmisiones = 0
+        self.sin_enviar = 0
+        self.latencias = []
+        self._primer_envio = {}
+
+    @property
+    def fallidos(self):
+        """Mensajes no entregados -> enviados sin ACK + nunca enviados"""
+        return self.mensajes - self.entregados + self.sin_enviar
+
+    def enviado(self, indice, tamano, momento):
+        """Registra el primer envío de un mensaje"""
+        self.mensajes += 1
+        self.bytes += tamano
+        self._primer_envio[indice] = momento
+
+    def confirmado(self, indice, momento):
+        """Registra el ACK de un mensaje -> su latencia de entrega"""
+        self.entregados += 1
+        self.latencias.append(momento - self._primer_envio.pop(indice))
+
+    def fragmentado(self, tamano, entregado, latencia):
+        """Registra un mensaje enviado fragmentado (enviar_datos()) -> cuenta como UN mensaje"""
+        self.mensajes += 1
+        self.bytes += tamano
+
+        if entregado:
+            self.entregados += 1
+            self.latencias.append(latencia)
+
+    def percentil(self, p):
+        """Return -> float: percentil p (0 - 100) de las latencias, en segundos (0 si no hay)"""
+
+        if not self.latencias:
+            return 0.0
+
+        ordenadas = sorted(self.latencias)
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+    def resumen(self, duracion):
+        """Return -> str: resumen para mostrar al final del envío"""
+
+        duracion = max(duracion, 1e-9)
+        return "\n".join([
+            f"[Cliente] Mensajes: {self.entregados} entregados de {self.mensajes + self.sin_enviar} ({self.fallidos} fallidos"
+            + (f", {self.sin_enviar} sin enviar)" if self.sin_enviar else ")"),
+            f"[Cliente] Duración: {duracion:.3f}s",
+            f"[Cliente] Tasa: {self.entregados / duracion:,.0f} mensajes/s | {self.bytes / duracion:,.0f} bytes/s",
+            f"[Cliente] Retransmisiones: {self.retransmisiones}",
+            f"[Cliente] Latencia de entrega: p50 {self.percentil(50) * 1000:.3f} ms | p99 {self.percentil(99) * 1000:.3f} ms",
+        ])
+
+
+# FUNCIÓN: mensajes de un archivo o de stdin -> generador (no lee toda la entrada de una vez)
+def leer_mensajes(entrada):
+    """
+    Lee mensajes separados por salto de línea (las líneas vacías se ignoran)
+
+    - Parámetro -> entrada: archivo de texto abierto (o sys.stdin)
+    - Return -> generador de str
+    """
+
+    for linea in entrada:
+        linea = linea.rstrip("\r\n")
+        if linea:
+            yield linea
+
+
+# FUNCIÓN: mensajes sintéticos -> para generar carga
+def generar_mensajes(cantidad, tamano, tasa=None):
+    """
+    Genera mensajes sintéticos de 'tamano' bytes (cada uno empieza con su número, para distinguirlos)
+
+    - Parámetros:
+        cantidad -> cantidad de mensajes a generar
+        tamano -> bytes de cada mensaje
+        tasa -> mensajes por segundo como máximo (None = lo más rápido posible)
+
+    - Return -> generador de bytes
+    """
+
+    relleno = b"x" * tamano
+    inicio = time.monotonic()
+
+    for numero in range(cantidad):
+        # Se respeta la tasa pedida -> el mensaje N no sale antes de inicio + N / tasa
+        if tasa:
+            espera = inicio + numero / tasa - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+
+        yield (b"%d " % numero + relleno)[:tamano]
+
+
+# FUNCIÓN: ¿el mensaje entra en un paquete? -> los más grandes se envían fragmentados
+def es_grande(mensaje):
+    """
+    - Parámetro -> mensaje: str o bytes
+    - Return -> bool: True si tiene más de TAMANO_DATOS_FRAGMENTO bytes (el mismo criterio que el modo interactivo)
+    """
+
+    if isinstance(mensaje, str):
+        # Un carácter ocupa de 1 a 4 bytes en UTF-8 -> solo se codifica si contar caracteres no alcanza para decidir
+        if len(mensaje) * 4 <= TAMANO_DATOS_FRAGMENTO:
+            return False
+        mensaje = mensaje.encode("utf-8")
+
+    return len(mensaje) > TAMANO_DATOS_FRAGMENTO
+
+
+# FUNCIÓN: envío masivo no interactivo -> entrada por archivo/stdin o mensajes sintéticos, con ventana deslizante
+def enviar_masivo(sock, direccion_servidor, argumentos):
+    """
+    Envía todos los mensajes lo más rápido que permite el protocolo (ventana deslizante) y muestra un resumen:
+    mensajes/s, bytes/s, retransmisiones, fallidos y latencia de entrega p50/p99
+        - Los mensajes que no entran en un paquete se envían fragmentados (enviar_datos()), como en el modo interactivo;
+          en formato texto (sin fragmentación) se rechazan y se cuentan como fallidos
+        - Si se abandona la transmisión (MAX_INTENTOS), los mensajes que faltaban también se cuentan como fallidos
+
+    - Parámetros:
+        sock -> el socket UDP para enviar/recibir datos
+        direccion_servidor -> tupla(IP, puerto) del servidor
+        argumentos -> opciones de la línea de comandos (ver parsear_argumentos())
+
+    - Return -> EstadisticasEnvio
+    """
+
+    estadisticas = EstadisticasEnvio()
+
+    if argumentos.sinteticos is not None:
+        fuente = generar_mensajes(argumentos.sinteticos, argumentos.tamano, argumentos.tasa)
+        entrada = None
+    elif argumentos.entrada == "-":
+        fuente = leer_mensajes(sys.stdin)
+        entrada = None
+    else:
+        entrada = open(argumentos.entrada, encoding="utf-8")
+        fuente = leer_mensajes(entrada)
+
+    # Mensajes leídos de la fuente -> para contar los que quedaron sin enviar si se abandona la transmisión
+    leidos = 0
+
+    def contar(mensajes):
+        nonlocal leidos
+        for mensaje in mensajes:
+            leidos += 1
+            yield mensaje
+
+    secuencia = 0
+    espacio = espacio_secuencia(TAMANO_VENTANA)
+
+    log.info("Enviando en modo no interactivo...")
+    inicio = time.perf_counter()
+
+    # Un mensaje no entregado luego de MAX_INTENTOS abandona la transmisión (como enviar_mensajes_ventana())
+    abandonada = False
+
+    try:
+        # Tandas de mensajes chicos (por la ventana, sin esperar entre ellos) separadas por los mensajes grandes
+        for grandes, tanda in itertools.groupby(contar(fuente), key=es_grande):
+            if not grandes:
+                enviados = estadisticas.mensajes
+                entregados = enviar_mensajes_ventana(sock, direccion_servidor, secuencia, tanda, TAMANO_VENTANA, estadisticas=estadisticas)
+                secuencia = (secuencia + entregados) % espacio
+                abandonada = entregados < estadisticas.mensajes - enviados
+            else:
+                for mensaje in tanda:
+                    if FORMATO != protocolo.FORMATO_BINARIO:
+                        estadisticas.sin_enviar += 1
+                        log.error("ERROR: mensaje de más de %d bytes - la fragmentación requiere el formato binario", TAMANO_DATOS_FRAGMENTO)
+                        continue
+
+                    datos = mensaje.encode("utf-8") if isinstance(mensaje, str) else mensaje
+                    inicio_mensaje = time.monotonic()
+                    entregados, total = enviar_datos(sock, direccion_servidor, secuencia, datos, TAMANO_VENTANA)
+                    estadisticas.fragmentado(len(datos), entregados == total, time.monotonic() - inicio_mensaje)
+                    secuencia = (secuencia + entregados) % espacio
+
+                    abandonada = entregados < total
+                    if abandonada:
+                        break
+
+            if abandonada:
+                break
+
+        # Transmisión abandonada -> los mensajes que nunca se enviaron también fallaron (incluido el que groupby ya leyó)
+        if abandonada:
+            total = argumentos.sinteticos if argumentos.sinteticos is not None else leidos + sum(1 for mensaje in fuente)
+            estadisticas.sin_enviar = total - estadisticas.mensajes
+    finally:
+        duracion = time.perf_counter() - inicio
+        if entrada is not None:
+            entrada.close()
+
+    print(estadisticas.resumen(duracion))
+    print(f"[Cliente] {obtener_estimador(direccion_servidor).resumen()}")
+
+    comprimidos = metricas.contadores.get("comprimidos", 0)
+    if comprimidos:
+        print(f"[Cliente] Compresión: {comprimidos} paquetes comprimidos | {metricas.contadores['bytes_ahorrados']:,} bytes ahorrados")
+
+    if CONTROL_CONGESTION and TAMANO_VENTANA > 1:
+        print(f"[Cliente] {congestion.obtener_control(direccion_servidor).resumen()}")
+
+    rtt = metricas.histogramas.get("rtt_us")
+    if rtt is not None:
+        print(f"[Cliente] RTT medido: p50 {rtt.percentil(50):.0f} us | p99 {rtt.percentil(99):.0f} us ({rtt.cantidad} muestras)")
+
+    # Tiempos por etapa (--etapas) -> dónde se va el tiempo de cada paquete
+    for nombre, histograma in sorted(metricas.histogramas.items()):
+        if nombre.startswith("etapa_"):
+            print(f"[Cliente] {nombre}: p50 {histograma.percentil(50):.1f} us | p99 {histograma.percentil(99):.1f} us ({histograma.cantidad} muestras)")
+
+    log.debug("Métricas: %s", metricas.resumen())
+    return estadisticas
+
+
+# FUNCIÓN: opciones de la línea de comandos
+def parsear_argumentos(argv=None):
+    """
+    Opciones de la línea de comandos -> por defecto toman los valores de la CONFIGURACIÓN del módulo
+
+    - Ejemplos:
+        python client.py                                       -> modo interactivo (como siempre)
+        python client.py --entrada mensajes.txt --ventana 64   -> un mensaje por línea del archivo
+        cat mensajes.txt | python client.py --entrada -        -> un mensaje por línea de stdin
+        python client.py --sinteticos 100000 --tamano 512 --tasa 5000 --ventana 128
+    """
+
+    parser = argparse.ArgumentParser(description="Cliente UDP con verificación CRC y retransmisión")
+    parser.add_argument("--host", default=HOST_SERVIDOR, help="IP del servidor")
+    parser.add_argument("--port", type=int, default=PORT_SERVIDOR, help="puerto del servidor")
+    parser.add_argument("--timeout", type=float, default=MAX_TIEMPO_DE_ESPERA, help="timeout inicial en segundos")
+    parser.add_argument("--intentos", type=int, default=MAX_INTENTOS, help="cantidad máxima de intentos por paquete")
+    parser.add_argument("--ventana", type=int, default=TAMANO_VENTANA, help="paquetes en vuelo (debe coincidir con el servidor)")
+    parser.add_argument("--formato", choices=(protocolo.FORMATO_BINARIO, protocolo.FORMATO_TEXTO), default=FORMATO, help="formato de los paquetes")
+    parser.add_argument("--sin-control", action="store_true", help="sin control de congestión ni ritmo (envía toda la ventana de una vez)")
+    parser.add_argument("--tasa-maxima", type=float, help="paquetes por segundo como máximo hacia el servidor (ritmo)")
+    parser.add_argument("--sin-sack", action="store_true", help="confirmar cada paquete por separado (sin ACK acumulados + SACK)")
+    parser.add_argument("--comprimir-desde", type=int, default=COMPRIMIR_DESDE, metavar="BYTES", help="comprimir los payloads de este tamaño o más (0 = nunca)")
+    parser.add_argument("--nivel-compresion", type=int, choices=range(1, 10), default=NIVEL_COMPRESION, help="nivel de zlib (1 = rápido ... 9 = más chico)")
+    parser.add_argument("--etapas", action="store_true", help="medir el tiempo de cada etapa (armar, sendto, espera) y mostrarlo al final")
+    parser.add_argument("--nivel", choices=registro.NIVELES, default=NIVEL_LOG, help="nivel de detalle de los mensajes (DEBUG = cada intento)")
+
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--entrada", metavar="ARCHIVO", help="enviar un mensaje por línea del archivo ('-' = stdin)")
+    modo.add_argument("--sinteticos", type=int, metavar="N", help="enviar N mensajes sintéticos")
+    parser.add_argument("--tamano", type=int, default=64, help="bytes de cada mensaje sintético")
+    parser.add_argument("--tasa", type=float, help="mensajes sintéticos por segundo (por defecto, sin límite)")
+
+    return parser.parse_args(argv)
+
+
 # ===================== FUNCIÓN PRINCIPAL DEL CLIENTE =====================
 # Controla el flujo general del programa cliente -> maneja interacción con usuario y ciclo de vida del socket
 
-def main():
+def main(argv=None):
     """
     Función principal que ejecuta el cliente UDP:
+    0. Lee las opciones de la línea de comandos (ver parsear_argumentos())
     1. Crea y configura el socket
+       -> con --entrada o --sinteticos envía en modo no interactivo (enviar_masivo()) y termina
     2. Entra en bucle interactivo -> petición de mensajes al usuario
     3. Envia cada mensaje con enviar_mensaje()
     4. Alterna el número de secuencia si el envio fue OK
+       (los mensajes grandes y los archivos se envían fragmentados con enviar_datos() / enviar_archivo())
     5. Repite hasta que el usuario presiona 'Enter' sin escribir nada
     6. Cierra el socket y termina
 
     """
 
+    # Las opciones de la línea de comandos reemplazan la configuración del módulo
+    global HOST_SERVIDOR, PORT_SERVIDOR, MAX_TIEMPO_DE_ESPERA, MAX_INTENTOS, TAMANO_VENTANA, FORMATO, ACK_SELECTIVO, CONTROL_CONGESTION
+    global COMPRIMIR_DESDE, NIVEL_COMPRESION
+    argumentos = parsear_argumentos(argv)
+    HOST_SERVIDOR = argumentos.host
+    PORT_SERVIDOR = argumentos.port
+    MAX_TIEMPO_DE_ESPERA = argumentos.timeout
+    MAX_INTENTOS = argumentos.intentos
+    TAMANO_VENTANA = argumentos.ventana
+    FORMATO = argumentos.formato
+    ACK_SELECTIVO = not argumentos.sin_sack
+    CONTROL_CONGESTION = not argumentos.sin_control
+    COMPRIMIR_DESDE = argumentos.comprimir_desde or None
+    NIVEL_COMPRESION = argumentos.nivel_compresion
+    perfilado.etapas = perfilado.etapas or argumentos.etapas
+    perfilado.instalar_senales()
+    registro.configurar(argumentos.nivel)
+
     # Muestra información de configuración
-    print("[Cliente] Iniciando cliente")
-    print(f"[Cliente] Servidor: {HOST_SERVIDOR}:{PORT_SERVIDOR}")
-    print(f"[Cliente] Timeout: {MAX_TIEMPO_DE_ESPERA}s")
-    print(f"[Cliente] Máximo número de intentos: {MAX_INTENTOS}")
-    print()
+    log.info("Iniciando cliente")
+    log.info("Servidor: %s:%d", HOST_SERVIDOR, PORT_SERVIDOR)
+    log.info("Timeout inicial: %ss (luego se adapta al RTT medido)", MAX_TIEMPO_DE_ESPERA)
+    log.info("Máximo número de intentos: %d", MAX_INTENTOS)
+    log.info("Tamaño de ventana: %d", TAMANO_VENTANA)
+    log.info("Formato de paquetes: %s", FORMATO)
+
+    if FORMATO == protocolo.FORMATO_BINARIO and COMPRIMIR_DESDE is not None:
+        log.info("Compresión: payloads desde %d bytes (nivel %d)", COMPRIMIR_DESDE, NIVEL_COMPRESION)
 
     # Se crea el socket UDP -> socket.socket() crea un nuevo punto de comunicación
     # - socket.AF_INET -> indica el uso de IPv4
@@ -205,16 +1033,34 @@ def main():
     # Se define la dirección del servidor -> TODOS los paquetes irán a esta dirección
     direccion_servidor = (HOST_SERVIDOR, PORT_SERVIDOR)
 
-    # Se inicializa el numero de secuencia (0-1) -> evitar procesamiento de mensajes duplicados y detectar reenvíos o mensajes nuevos
+    # Tope de ritmo hacia el servidor (por ej. un servidor lento) -> lo respeta el control de congestión
+    if argumentos.tasa_maxima is not None:
+        congestion.configurar(direccion_servidor, tasa_maxima=argumentos.tasa_maxima, rto_inicial=MAX_TIEMPO_DE_ESPERA)
+
+    # Modo no interactivo -> se envían todos los mensajes de la entrada (o sintéticos) y se muestra un resumen
+    if argumentos.entrada is not None or argumentos.sinteticos is not None:
+        try:
+            enviar_masivo(sock, direccion_servidor, argumentos)
+        finally:
+            sock.close()
+        return
+
+    # Se inicializa el numero de secuencia (0-1, o 32 bits en modo ventana) -> evitar procesamiento de mensajes duplicados y detectar reenvíos o mensajes nuevos
     secuencia = 0
+    espacio = espacio_secuencia(TAMANO_VENTANA)
 
     # Bucle principal que se ejecuta indefinidamente hasta que el usuario decida salir -> interacción con el usuario
     while True:
         # Se muestran instrucciones al usuario
         print()
         print("=" * 50)
-        print("Escribe un mensaje y presiona 'Enter' para enviarlo")
-        print("Presiona 'Enter' para salir")
+        if TAMANO_VENTANA > 1:
+            print("Escribe un mensaje por línea; una línea vacía los envía")
+            print("Presiona 'Enter' sin mensajes para salir")
+        else:
+            print("Escribe un mensaje y presiona 'Enter' para enviarlo")
+            print("Presiona 'Enter' para salir")
+        print(f"Escribe '{COMANDO_ARCHIVO} <ruta>' para enviar un archivo")
         print("=" * 50)
 
         # Se pide mensaje al usuario
@@ -222,11 +1068,47 @@ def main():
 
         # Se verifica si el usuario quiere terminar/salir del programa (interacción)
         if mensaje == "":
-            print("[Cliente] Cerrando cliente...")
+            log.info("Cerrando cliente...")
             break  # Sale del bucle
 
+        # Comando /archivo <ruta> -> se envía el archivo fragmentado
+        # Mensaje más grande que un paquete -> se envía fragmentado
+        if mensaje.startswith(COMANDO_ARCHIVO) or len(mensaje.encode("utf-8")) > TAMANO_DATOS_FRAGMENTO:
+            try:
+                if mensaje.startswith(COMANDO_ARCHIVO):
+                    entregados, total = enviar_archivo(sock, direccion_servidor, secuencia, mensaje[len(COMANDO_ARCHIVO):].strip(), TAMANO_VENTANA)
+                else:
+                    entregados, total = enviar_datos(sock, direccion_servidor, secuencia, mensaje.encode("utf-8"), TAMANO_VENTANA)
+            except (OSError, ValueError) as error:
+                log.error("ERROR: %s", error)
+                continue
+
+            log.info("Fragmentos entregados: %d de %d", entregados, total)
+
+            # La secuencia avanza por cada fragmento entregado
+            secuencia = (secuencia + entregados) % espacio
+            log.info("Próxima secuencia: %d", secuencia)
+            continue
+
+        # Modo ventana -> se juntan varios mensajes (uno por línea) y se envían juntos hasta una línea vacía
+        if TAMANO_VENTANA > 1:
+            mensajes = []
+            while mensaje != "":
+                mensajes.append(mensaje)
+                mensaje = input("Mensaje a enviar: ")
+
+            entregados = enviar_mensajes_ventana(sock, direccion_servidor, secuencia, mensajes, TAMANO_VENTANA)
+            log.info("Mensajes entregados: %d de %d", entregados, len(mensajes))
+            log.info("%s", obtener_estimador(direccion_servidor).resumen())
+
+            # La secuencia avanza por cada mensaje entregado
+            secuencia = (secuencia + entregados) % espacio
+            log.info("Próxima secuencia: %d", secuencia)
+            continue
+
         # Se envía el mensaje -> retorna True si tuvo éxito, False si falló
         exito = enviar_mensaje(sock, direccion_servidor, secuencia, mensaje)
+        log.info("%s", obtener_estimador(direccion_servidor).resumen())
 
         # Se alterna el número de secuencia si el envío fue exitoso -> solo cambia si el mensaje fue entregado
         if exito:
@@ -234,13 +1116,13 @@ def main():
                 secuencia = 1
             else:
                 secuencia = 0
-            print(f"[Cliente] Próxima secuencia: {secuencia}")
+            log.info("Próxima secuencia: %d", secuencia)
         
         # El bucle continua y vuelve a pedir otro mensaje
     
     # Se cierra el socket (conexión)
     sock.close()
-    print("[Cliente] Cliente cerrado")
+    log.info("Cliente cerrado")
 
 
 # Punto de entrada del programa -> permite usar el script directamente o importarlo como módulo
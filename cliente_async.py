@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+CLIENTE ASYNCIO (biblioteca):
+- Misma lógica de transmisión confiable que client.py (CRC, ACK/NACK/SACK, RTO adaptativo, control de congestión),
+  pero sin bloquear: send() devuelve un awaitable que termina con el ACK o lanza ErrorEntrega luego de max_intentos
+- Un solo socket UDP para todo -> muchas tareas (flujos lógicos) pueden enviar a la vez; cada mensaje recibe su
+  número de secuencia al entrar a la ventana y el ACK se dirige al awaitable de ese número
+- Todos los flujos comparten la ventana de la sesión con el servidor (el servidor tiene una sesión por IP y puerto):
+  el servidor entrega en orden de secuencia -> los mensajes de cada flujo llegan en el orden en que se enviaron
+- Las respuestas las recibe el protocolo del socket (un solo callback); los temporizadores de retransmisión son
+  call_later del bucle de eventos -> miles de mensajes en vuelo sin un hilo por mensaje
+
+Uso:
+    async with ClienteAsync("127.0.0.1", 5000, tamano_ventana=64) as cliente:
+        await cliente.send(b"Hola")
+        await asyncio.gather(*(cliente.send(mensaje) for mensaje in mensajes))
+
+    python cliente_async.py --ventana 64 --flujos 100 --mensajes 50
+"""
+
+import argparse
+import asyncio
+import time
+
+import client
+import congestion
+import protocolo
+import registro
+from metricas import Metricas
+from rtt import obtener_estimador
+from ventana import distancia, espacio_secuencia
+
+
+log = registro.obtener("Cliente async")
+metricas = Metricas("cliente async")
+
+
+class ErrorEntrega(Exception):
+    """El mensaje no se pudo entregar (se agotaron los intentos o el cliente se cerró)"""
+
+
+class _Envio:
+    """Mensaje en vuelo -> paquete ya armado, awaitable de quien lo envió, intentos y temporizador de retransmisión"""
+
+    __slots__ = ("paquete", "futuro", "intentos", "enviado", "temporizador")
+
+    def __init__(self, paquete, futuro):
+        self.paquete = paquete
+        self.futuro = futuro
+        self.intentos = 0
+        self.enviado = 0.0
+        self.temporizador = None
+
+
+class _ProtocoloCliente(asyncio.DatagramProtocol):
+    """Protocolo UDP del cliente -> cada respuesta del servidor se pasa al cliente que la espera"""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def datagram_received(self, datos, direccion):
+        self.cliente._respuesta(datos)
+
+    def error_received(self, exc):
+        # Por ej. ICMP "puerto inalcanzable" (servidor caído) -> los temporizadores se encargan de reintentar
+        metricas.sumar("errores_socket")
+        log.debug("Error de socket: %s", exc)
+
+    def connection_lost(self, exc):
+        self.cliente._fallar(ErrorEntrega("Socket cerrado"))
+
+
+class ClienteAsync:
+    """
+    Cliente UDP confiable para asyncio
+        - send(mensaje) -> corutina: espera lugar en la ventana, envía y termina con el ACK (devuelve la secuencia)
+        - Se puede llamar desde muchas tareas a la vez (flujos lógicos) sobre el mismo socket
+        - Si un mensaje agota sus intentos, la sesión queda rota (el servidor no puede entregar los siguientes en orden):
+          ese y todos los mensajes pendientes (y los siguientes send()) lanzan ErrorEntrega
+
+    - Parámetros:
+        - host, port -> dirección del servidor (por defecto, la de client.py)
+        - tamano_ventana (int) -> paquetes en vuelo (debe coincidir con el servidor)
+        - max_intentos (int) -> envíos de un mensaje antes de abandonarlo
+        - timeout_inicial (float) -> RTO antes de medir el RTT
+    """
+
+    def __init__(self, host=None, port=None, tamano_ventana=None, max_intentos=None, timeout_inicial=None):
+        # Los valores por defecto se leen al crear el cliente -> respetan cambios a la configuración de client.py
+        self.direccion = (host or client.HOST_SERVIDOR, port or client.PORT_SERVIDOR)
+        self.tamano_ventana = tamano_ventana or client.TAMANO_VENTANA
+        self.max_intentos = max_intentos or client.MAX_INTENTOS
+        timeout_inicial = timeout_inicial or client.MAX_TIEMPO_DE_ESPERA
+
+        self.espacio = espacio_secuencia(self.tamano_ventana)
+        self.selectivo = client.ACK_SELECTIVO and self.tamano_ventana > 1 and client.FORMATO == protocolo.FORMATO_BINARIO
+
+        # Estimador de RTT y control de congestión compartidos con client.py (uno por servidor)
+        self.estimador = obtener_estimador(self.direccion, timeout_inicial)
+        self.control = None
+        if client.CONTROL_CONGESTION and self.tamano_ventana > 1:
+            self.control = congestion.obtener_control(self.direccion, timeout_inicial)
+
+        # Estado de la ventana de envío (índices relativos al primer mensaje, como en enviar_mensajes_ventana)
+        self.base = 0 # Índice del mensaje más antiguo sin confirmar
+        self.siguiente = 0 # Índice que recibirá el próximo mensaje
+        self.en_vuelo = {} # Índice -> _Envio
+        self.confirmados = set() # Confirmados fuera de orden (la base todavía no los alcanzó)
+        self.fin_timeout = 0.0 # Los timeouts hasta este momento son un solo evento (un solo backoff)
+
+        self.transport = None
+        self.error = None # ErrorEntrega que rompió la sesión (None mientras funciona)
+        self._admision = None # asyncio.Lock -> los mensajes entran a la ventana de a uno y en orden de llegada
+        self._lugar = None # asyncio.Event -> se activa cada vez que se libera lugar en la ventana
+
+    async def conectar(self):
+        """Crea el socket UDP (conectado al servidor: solo recibe sus respuestas)"""
+
+        loop = asyncio.get_running_loop()
+        self._admision = asyncio.Lock()
+        self._lugar = asyncio.Event()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: _ProtocoloCliente(self), remote_addr=self.direccion)
+        return self
+
+    def cerrar(self):
+        """Cierra el socket -> los mensajes todavía sin confirmar lanzan ErrorEntrega"""
+
+        if self.transport is not None:
+            self.transport.close()
+
+    async def __aenter__(self):
+        return await self.conectar()
+
+    async def __aexit__(self, tipo, error, traza):
+        self.cerrar()
+
+    def _hay_lugar(self):
+        # Repetición Selectiva -> a lo sumo tamano_ventana secuencias desde la base; y la ventana de congestión
+        if self.siguiente - self.base >= self.tamano_ventana:
+            return False
+
+        return self.control is None or len(self.en_vuelo) < self.control.limite()
+
+    async def send(self, mensaje):
+        """
+        Envía un mensaje y espera su confirmación
+
+        - Parámetro -> mensaje (str o bytes)
+        - Return -> int: número de secuencia con el que se confirmó
+        - Excepción -> ErrorEntrega si no se pudo entregar
+        """
+
+        if self.transport is None:
+            raise ErrorEntrega("Cliente no conectado (usar conectar() o 'async with')")
+
+        # Entrada a la ventana -> un mensaje por vez, en orden de llegada (el Lock de asyncio es FIFO)
+        async with self._admision:
+            while True:
+                if self.error is not None:
+                    raise self.error
+
+                if not self._hay_lugar():
+                    self._lugar.clear()
+                    await self._lugar.wait()
+                    continue
+
+                # Ritmo del control de congestión -> se espera el turno del próximo paquete
+                espera = self.control.espera() if self.control is not None else 0
+                if espera > 0:
+                    await asyncio.sleep(espera)
+                    continue
+
+                break
+
+            indice = self.siguiente
+            self.siguiente += 1
+            secuencia = indice % self.espacio
+
+            flags = 0
+            if self.selectivo:
+                flags = protocolo.FLAG_SACK
+                # Este paquete llena la ventana de congestión -> el servidor no debe demorar el ACK
+                if self.control is not None and len(self.en_vuelo) + 1 >= self.control.limite():
+                    flags |= protocolo.FLAG_ACK_INMEDIATO
+
+            envio = _Envio(client.armar_paquete(secuencia, mensaje, flags=flags), asyncio.get_running_loop().create_future())
+            self.en_vuelo[indice] = envio
+            self._transmitir(indice)
+
+            if self.control is not None:
+                self.control.enviado()
+
+        # Se espera el ACK fuera del Lock -> mientras tanto otros mensajes pueden entrar a la ventana
+        return await envio.futuro
+
+    def _transmitir(self, indice):
+        # Envía (o reenvía) un paquete y programa su temporizador de retransmisión
+        envio = self.en_vuelo[indice]
+        envio.intentos += 1
+        envio.enviado = time.monotonic()
+        self.transport.sendto(envio.paquete)
+
+        if envio.temporizador is not None:
+            envio.temporizador.cancel()
+        envio.temporizador = asyncio.get_running_loop().call_later(self.estimador.espera(), self._vencio, indice)
+
+        metricas.sumar("enviados" if envio.intentos == 1 else "retransmisiones")
+
+    def _reenviar(self, indice, motivo):
+        # Retransmite un paquete si le quedan intentos; si no, la sesión queda rota
+        envio = self.en_vuelo[indice]
+
+        if envio.intentos >= self.max_intentos:
+            metricas.sumar("fallidos")
+            self._fallar(ErrorEntrega(f"No se pudo entregar la secuencia {indice % self.espacio} luego de {self.max_intentos} intentos"))
+            return
+
+        log.debug("%s - retransmitiendo secuencia %d", motivo, indice % self.espacio)
+        self._transmitir(indice)
+
+    def _vencio(self, indice):
+        # Temporizador de un paquete -> no llegó el ACK a tiempo
+        if indice not in self.en_vuelo:
+            return
+
+        metricas.sumar("timeouts")
+        ahora = time.monotonic()
+
+        # Varios paquetes que vencen juntos son el mismo evento -> un solo backoff
+        if ahora >= self.fin_timeout:
+            self.estimador.timeout()
+            if self.control is not None:
+                self.control.timeout()
+            self.fin_timeout = ahora + self.estimador.rto
+
+        self._reenviar(indice, "Timeout")
+
+    def _confirmar(self, indice):
+        # Confirma un paquete: cancela su temporizador, despierta a quien lo envió y avanza la ventana
+        envio = self.en_vuelo.pop(indice)
+        envio.temporizador.cancel()
+
+        if not envio.futuro.done(): # Quien lo envió pudo haber cancelado la espera
+            envio.futuro.set_result(indice % self.espacio)
+
+        self.confirmados.add(indice)
+        while self.base in self.confirmados:
+            self.confirmados.discard(self.base)
+            self.base += 1
+
+        self._lugar.set()
+
+    def _respuesta(self, datos):
+        # Respuesta del servidor -> ACK n | NACK n | SACK base + mapa
+        try:
+            tipo, seq_respuesta, mapa = protocolo.leer_respuesta(datos)
+        except protocolo.ErrorFormato:
+            metricas.sumar("respuestas_invalidas")
+            return
+
+        ahora = time.monotonic()
+
+        # Índice de la secuencia respondida -> relativo a la base de la ventana (con ventana 1 la secuencia es solo 0-1)
+        indice = self.base + distancia(self.base % self.espacio, seq_respuesta, self.espacio)
+
+        if tipo == "SACK":
+            self._sack(indice, mapa, ahora)
+            return
+
+        envio = self.en_vuelo.get(indice)
+        if envio is None:
+            return # Respuesta de un paquete que ya no está en vuelo (vieja o duplicada)
+
+        if tipo == "ACK":
+            metricas.sumar("ack")
+
+            # Algoritmo de Karn -> el RTT solo se mide si el paquete se envió una vez
+            if envio.intentos == 1:
+                self._muestra(ahora - envio.enviado)
+
+            en_vuelo = len(self.en_vuelo)
+            self._confirmar(indice)
+
+            if self.control is not None:
+                self.control.confirmados(1, en_vuelo)
+
+        elif tipo == "NACK":
+            metricas.sumar("nack")
+
+            if self.control is not None:
+                self.control.perdida(ahora, nack=True)
+
+            self._reenviar(indice, "NACK")
+
+    def _sack(self, base_servidor, mapa, ahora):
+        # ACK acumulado + SACK -> confirma todo lo anterior a base_servidor y lo marcado en el mapa de bits
+        if base_servidor > self.siguiente:
+            return
+
+        metricas.sumar("sack")
+
+        selectivos = [base_servidor + 1 + posicion for posicion in protocolo.recibidos_sack(mapa)]
+        selectivos = [indice for indice in selectivos if indice < self.siguiente]
+
+        nuevos = [indice for indice in range(self.base, base_servidor) if indice in self.en_vuelo]
+        nuevos += [indice for indice in selectivos if indice in self.en_vuelo]
+
+        # Karn -> el más reciente de los enviados una sola vez es el que menos esperó la respuesta demorada
+        muestras = [ahora - self.en_vuelo[indice].enviado for indice in nuevos if self.en_vuelo[indice].intentos == 1]
+        if muestras:
+            self._muestra(min(muestras))
+
+        # Para el reenvío rápido hace falta el momento de envío de los confirmados -> se guarda antes de liberarlos
+        envios = {indice: self.en_vuelo[indice].enviado for indice in selectivos if indice in self.en_vuelo}
+
+        metricas.sumar("ack", len(nuevos))
+        en_vuelo = len(self.en_vuelo)
+        for indice in nuevos:
+            self._confirmar(indice)
+
+        if self.control is not None and nuevos:
+            self.control.confirmados(len(nuevos), en_vuelo)
+
+        # Huecos -> mismo criterio que client.py: REENVIO_RAPIDO paquetes posteriores confirmados y SRTT + margen vencido
+        srtt = self.estimador.srtt
+        espera_perdida = srtt * (1 + client.MARGEN_REORDENAMIENTO) if srtt is not None else 0.0
+
+        for indice in range(base_servidor, selectivos[-1] if selectivos else base_servidor):
+            envio = self.en_vuelo.get(indice)
+            if envio is None or ahora - envio.enviado < espera_perdida:
+                continue
+
+            if sum(1 for enviado in envios.values() if enviado > envio.enviado) >= client.REENVIO_RAPIDO:
+                metricas.sumar("reenvios_rapidos")
+
+                if self.control is not None:
+                    self.control.perdida(ahora)
+
+                self._reenviar(indice, "SACK")
+                if self.error is not None:
+                    return
+
+    def _muestra(self, rtt):
+        self.estimador.muestra(rtt)
+        metricas.registrar("rtt_us", rtt * 1e6)
+
+    def _fallar(self, error):
+        # La sesión queda rota -> todos los mensajes en vuelo y los que esperan lugar lanzan el error
+        # (al cerrar sin mensajes pendientes no hay nada que informar)
+        if self.error is None:
+            self.error = error
+            if self.en_vuelo:
+                log.error("ERROR: %s", error)
+
+        for envio in self.en_vuelo.values():
+            if envio.temporizador is not None:
+                envio.temporizador.cancel()
+            if not envio.futuro.done():
+                envio.futuro.set_exception(self.error)
+
+        self.en_vuelo.clear()
+
+        if self._lugar is not None:
+            self._lugar.set()
+
+
+async def _demostracion(argumentos):
+    """Varios flujos lógicos concurrentes sobre un solo cliente -> cada flujo envía sus mensajes de a uno, en orden"""
+
+    async def flujo(numero):
+        for indice in range(argumentos.mensajes):
+            await cliente.send(b"flujo %d mensaje %d " % (numero, indice) + b"x" * argumentos.tamano)
+
+    inicio = time.perf_counter()
+
+    async with ClienteAsync(argumentos.host, argumentos.port, argumentos.ventana) as cliente:
+        resultados = await asyncio.gather(*(flujo(numero) for numero in range(argumentos.flujos)), return_exceptions=True)
+
+    duracion = time.perf_counter() - inicio
+    fallidos = sum(1 for resultado in resultados if isinstance(resultado, Exception))
+    total = argumentos.flujos * argumentos.mensajes
+
+    print(f"[Cliente async] {argumentos.flujos} flujos x {argumentos.mensajes} mensajes en {duracion:.3f}s "
+          f"({total / duracion:,.0f} mensajes/s) | flujos fallidos {fallidos}")
+    print(f"[Cliente async] {cliente.estimador.resumen()}")
+
+    if cliente.control is not None:
+        print(f"[Cliente async] {cliente.control.resumen()}")
+
+    print(f"[Cliente async] Métricas: {metricas.resumen()}")
+
+
+def main(argv=None):
+    """Demostración -> python cliente_async.py --ventana 64 --flujos 100 --mensajes 50"""
+
+    parser = argparse.ArgumentParser(description="Cliente UDP confiable con asyncio (varios flujos sobre un socket)")
+    parser.add_argument("--host", default=client.HOST_SERVIDOR, help="IP del servidor")
+    parser.add_argument("--port", type=int, default=client.PORT_SERVIDOR, help="puerto del servidor")
+    parser.add_argument("--ventana", type=int, default=client.TAMANO_VENTANA, help="paquetes en vuelo (debe coincidir con el servidor)")
+    parser.add_argument("--flujos", type=int, default=10, help="cantidad de flujos (tareas) concurrentes")
+    parser.add_argument("--mensajes", type=int, default=100, help="mensajes que envía cada flujo")
+    parser.add_argument("--tamano", type=int, default=32, help="bytes de relleno de cada mensaje")
+    parser.add_argument("--nivel", choices=registro.NIVELES, default=client.NIVEL_LOG, help="nivel de detalle de los mensajes")
+    argumentos = parser.parse_args(argv)
+
+    registro.configurar(argumentos.nivel)
+    asyncio.run(_demostracion(argumentos))
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO CONGESTIÓN (control de congestión y ritmo de envío por destino):
+- Ventana de congestión (AIMD: aumento aditivo / disminución multiplicativa), medida en paquetes
+    - Arranque lento -> por debajo del umbral la ventana crece 1 paquete por cada paquete confirmado (se duplica por RTT)
+    - Aumento aditivo -> por encima del umbral crece 1 paquete por RTT
+    - NACK o paquete perdido -> la ventana se reduce a la mitad (una sola vez por RTT: varias pérdidas juntas son un solo evento)
+    - Timeout -> la ventana vuelve a VENTANA_MINIMA (el camino pudo haber cambiado por completo)
+- Ritmo (token bucket) -> los paquetes nuevos no salen todos juntos: se reparten a lo largo del RTT
+    - tasa = GANANCIA_RITMO * ventana / SRTT paquetes por segundo (con tope opcional tasa_maxima)
+    - El balde guarda como máximo las fichas de GRANULARIDAD segundos (o RAFAGA_MINIMA) -> ráfagas cortas
+- Sin control, un cliente con ventana grande llena el buffer del socket del servidor: los datagramas descartados
+  parecen errores (timeouts) y las retransmisiones empeoran la congestión
+- Cada servidor (IP, puerto) tiene su propio control, que usa el estimador de RTT de ese destino (ver rtt.py)
+"""
+
+import time
+
+from rtt import obtener_estimador
+
+
+# ===================== CONFIGURACIÓN =====================
+VENTANA_INICIAL = 4 # (paquetes) Ventana de congestión al empezar
+VENTANA_MINIMA = 1 # (paquetes) La ventana nunca baja de este valor
+VENTANA_MAXIMA = 4096 # (paquetes) Tope de la ventana (el umbral de arranque lento empieza acá)
+FACTOR_REDUCCION = 0.5 # Disminución multiplicativa -> la ventana se multiplica por este valor ante una pérdida
+REDUCIR_CON_NACK = True # Un NACK también reduce la ventana (False si los NACK son solo errores simulados, no congestión)
+GANANCIA_RITMO = 1.25 # Tasa = ganancia * ventana / SRTT -> un poco más rápido que la ventana, para no quedar limitado por el ritmo
+GRANULARIDAD = 0.002 # (segundos) Fichas que puede acumular el balde -> el socket espera en pasos de ~1 ms
+RAFAGA_MINIMA = 2 # (paquetes) Mínimo de fichas del balde
+# ==========================================================
+
+
+class ControlCongestion:
+    """
+    Control de congestión y ritmo para UN destino
+        - ventana -> ventana de congestión actual (float, en paquetes)
+        - umbral -> umbral del arranque lento (ssthresh)
+        - tasa_maxima -> tope de paquetes por segundo (None = sin tope)
+        - ventana_maxima -> tope de la ventana de congestión
+        - reducciones / timeouts -> cantidad de disminuciones por pérdida y por timeout
+    """
+
+    def __init__(self, estimador, ventana_inicial=VENTANA_INICIAL, ventana_maxima=VENTANA_MAXIMA, tasa_maxima=None):
+        self.estimador = estimador
+        self.ventana = float(ventana_inicial)
+        self.ventana_maxima = ventana_maxima
+        self.umbral = float(ventana_maxima)
+        self.tasa_maxima = tasa_maxima
+        self.fichas = float(RAFAGA_MINIMA)
+        self.ultima_recarga = time.monotonic()
+        self.fin_recuperacion = 0.0 # Hasta este momento las pérdidas pertenecen al mismo evento (no se vuelve a reducir)
+        self.reducciones = 0
+        self.timeouts = 0
+
+    def limite(self):
+        """Return -> int: cantidad de paquetes que pueden estar en vuelo (parte entera de la ventana, al menos 1)"""
+        return max(int(self.ventana), VENTANA_MINIMA)
+
+    @property
+    def tasa(self):
+        """Tasa de envío actual en paquetes por segundo (None si todavía no hay RTT medido ni tope)"""
+
+        srtt = self.estimador.srtt
+
+        if not srtt:
+            return self.tasa_maxima
+
+        tasa = GANANCIA_RITMO * self.ventana / srtt
+        return tasa if self.tasa_maxima is None else min(tasa, self.tasa_maxima)
+
+    def _recargar(self, ahora):
+        # Se agregan las fichas ganadas desde la última recarga (sin pasar la capacidad del balde)
+        tasa = self.tasa
+
+        if tasa is None:
+            return None
+
+        capacidad = max(RAFAGA_MINIMA, tasa * GRANULARIDAD)
+        self.fichas = min(self.fichas + (ahora - self.ultima_recarga) * tasa, capacidad)
+        self.ultima_recarga = ahora
+        return tasa
+
+    def espera(self, ahora=None):
+        """
+        Cuánto falta para poder enviar un paquete nuevo según el ritmo
+
+        - Parámetro -> ahora (float): time.monotonic()
+        - Return -> float: segundos (0 si ya se puede enviar)
+        """
+
+        if ahora is None:
+            ahora = time.monotonic()
+
+        tasa = self._recargar(ahora)
+
+        if tasa is None or self.fichas >= 1:
+            return 0.0
+
+        return (1 - self.fichas) / tasa
+
+    def enviado(self):
+        """Descuenta la ficha de un paquete enviado"""
+
+        if self.fichas >= 1:
+            self.fichas -= 1
+
+    def confirmados(self, cantidad=1, en_vuelo=None):
+        """
+        Paquetes confirmados (ACK / SACK) -> la ventana crece
+            - Arranque lento (ventana < umbral) -> +1 por paquete
+            - Aumento aditivo -> +1 / ventana por paquete (+1 por RTT)
+            - Si se usaba menos de la mitad de la ventana (pocos mensajes o tasa_maxima), no crece: no se midió
+              que la red soporte más (RFC 7661)
+
+        - Parámetros:
+            - cantidad (int) -> paquetes confirmados
+            - en_vuelo (int) -> paquetes en vuelo antes de la confirmación (None = no se verifica)
+        """
+
+        if en_vuelo is not None and 2 * en_vuelo < self.limite():
+            return
+
+        if self.ventana < self.umbral:
+            self.ventana += cantidad
+        else:
+            self.ventana += cantidad / self.ventana
+
+        if self.ventana > self.ventana_maxima:
+            self.ventana = float(self.ventana_maxima)
+
+    def perdida(self, ahora=None, nack=False):
+        """
+        Paquete perdido (reenvío rápido) o NACK -> disminución multiplicativa, una sola vez por RTT
+
+        - Parámetros:
+            - ahora (float) -> time.monotonic()
+            - nack (bool) -> True si la pérdida se detectó por un NACK (se ignora si REDUCIR_CON_NACK es False)
+        """
+
+        if nack and not REDUCIR_CON_NACK:
+            return
+
+        if ahora is None:
+            ahora = time.monotonic()
+
+        # Las pérdidas de paquetes enviados antes de la reducción anterior ya se tuvieron en cuenta
+        if ahora < self.fin_recuperacion:
+            return
+
+        self.umbral = max(self.ventana * FACTOR_REDUCCION, VENTANA_MINIMA)
+        self.ventana = self.umbral
+        self.fin_recuperacion = ahora + (self.estimador.srtt or self.estimador.rto)
+        self.reducciones += 1
+
+    def timeout(self):
+        """Timeout -> umbral a la mitad y la ventana vuelve al mínimo (se retoma con arranque lento)"""
+
+        self.umbral = max(self.ventana * FACTOR_REDUCCION, VENTANA_MINIMA)
+        self.ventana = float(VENTANA_MINIMA)
+        self.fin_recuperacion = time.monotonic() + self.estimador.rto
+        self.timeouts += 1
+
+    def resumen(self):
+        """Return -> str: estado del control para mostrar al usuario"""
+
+        tasa = self.tasa
+        texto_tasa = "sin ritmo (sin RTT medido)" if tasa is None else f"{tasa:,.0f} paquetes/s"
+
+        return (
+            f"Ventana de congestión {self.ventana:.1f} (umbral {self.umbral:.0f}) | ritmo {texto_tasa} | "
+            f"reducciones {self.reducciones} | timeouts {self.timeouts}"
+        )
+
+
+# Controles por destino -> cada servidor (IP, puerto) tiene su propia ventana y su propio ritmo
+_controles = {}
+
+
+def obtener_control(direccion, rto_inicial=None):
+    """
+    Devuelve el control de congestión del destino, creándolo si no existe
+
+    - Parámetros:
+        - direccion -> tupla (IP, puerto) del servidor
+        - rto_inicial (float) -> RTO inicial del estimador de RTT del destino (si todavía no existe)
+    - Return -> ControlCongestion
+    """
+
+    control = _controles.get(direccion)
+
+    if control is None:
+        estimador = obtener_estimador(direccion) if rto_inicial is None else obtener_estimador(direccion, rto_inicial)
+        control = ControlCongestion(estimador)
+        _controles[direccion] = control
+
+    return control
+
+
+def configurar(direccion, tasa_maxima=None, ventana_maxima=None, rto_inicial=None):
+    """
+    Configura los topes de un destino (por ej. un servidor lento o un enlace angosto)
+
+    - Parámetros:
+        - direccion -> tupla (IP, puerto) del servidor
+        - tasa_maxima (float) -> paquetes por segundo como máximo (None = sin tope)
+        - ventana_maxima (int) -> ventana de congestión máxima en paquetes (None = VENTANA_MAXIMA)
+        - rto_inicial (float) -> igual que en obtener_control()
+    - Return -> ControlCongestion
+    """
+
+    control = obtener_control(direccion, rto_inicial)
+    control.tasa_maxima = tasa_maxima
+
+    if ventana_maxima is not None:
+        control.ventana_maxima = ventana_maxima
+        control.umbral = min(control.umbral, ventana_maxima)
+        control.ventana = min(control.ventana, float(ventana_maxima))
+
+    return control
+
+
+def controles():
+    """Return -> dict {direccion: ControlCongestion} con todos los destinos conocidos (para mostrar o exportar)"""
+    return dict(_controles)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO CRC (compartido por server.py y client.py):
+- Calcula el CRC16-CCITT (polinomio 0x1021, valor inicial 0xFFFF)
+- Usa una tabla precalculada de 256 entradas -> procesa un byte por paso en lugar de 8 bits
+- Usa binascii.crc_hqx (implementado en C) cuando está disponible -> mismo polinomio, mismo resultado
+- Acepta str, bytes, bytearray y memoryview sin copiar los datos
+- Permite calcular el CRC de forma incremental (por partes) con la clase CRC16
+"""
+
+try:
+    # binascii.crc_hqx calcula el CRC-CCITT (0x1021) en C -> es la vía rápida
+    from binascii import crc_hqx
+except ImportError:  # pragma: no cover - intérpretes sin binascii (por ej. algunas builds embebidas)
+    crc_hqx = None
+
+
+# ===================== CONFIGURACIÓN =====================
+POLINOMIO = 0x1021 # Polinomio estándar CCITT
+CRC_INICIAL = 0xFFFF # Valor inicial estándar para CRC16-CCITT
+# ==========================================================
+
+
+def _generar_tabla():
+    """
+    Genera la tabla de 256 entradas del CRC16-CCITT
+        - Cada entrada es el resultado de procesar los 8 bits de un byte (el bucle que antes se hacía por cada byte)
+        - Se calcula UNA sola vez al importar el módulo
+
+    - Return -> tuple de 256 enteros de 16 bits
+    """
+
+    tabla = []
+
+    for byte in range(256):
+        crc = byte << 8
+
+        # Mismo procesamiento bit a bit que el algoritmo original, pero solo 256 veces en total
+        for i in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ POLINOMIO) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+
+        tabla.append(crc)
+
+    return tuple(tabla)
+
+
+# Tabla precalculada -> TABLA_CRC[i] = CRC de un byte i con el registro en 0
+TABLA_CRC = _generar_tabla()
+
+
+def _a_bytes(data):
+    """
+    Convierte el mensaje a un objeto que soporte el protocolo de buffer
+        - str -> se codifica en UTF-8 (es la única conversión que copia)
+        - bytes, bytearray, memoryview -> se usan tal cual, sin copiar
+    """
+
+    if isinstance(data, str):
+        return data.encode("utf-8")
+
+    return data
+
+
+def crc16_ccitt_tabla(data, crc=CRC_INICIAL):
+    """
+    Calcula el CRC16-CCITT usando la tabla precalculada (implementación en Python puro)
+        - Se usa cuando binascii.crc_hqx no está disponible
+        - Un acceso a la tabla reemplaza los 8 pasos del bucle bit a bit
+
+    - Parámetros:
+        - data (str, bytes, bytearray o memoryview) -> el mensaje del cual se calculará el CRC
+        - crc (int) -> valor inicial del registro; permite continuar un cálculo anterior
+    - Return -> int: número de 16 bits que representa el CRC
+    """
+
+    tabla = TABLA_CRC
+
+    # Se recorre el buffer directamente -> iterar un memoryview/bytes devuelve enteros sin copiar
+    for byte in memoryview(_a_bytes(data)).cast("B"):
+        crc = ((crc << 8) & 0xFF00) ^ tabla[(crc >> 8) ^ byte]
+
+    return crc
+
+
+def crc16_ccitt(data, crc=CRC_INICIAL):
+    """
+    Calcula el CRC16-CCITT del mensaje
+        - CRC -> es una suma de verificación que detecta si hubo errores durante la transmisión del mensaje
+            - Usa polinomio estándar 0x1021 (definido por protocolo CCITT)
+        - Da exactamente el mismo resultado que la versión bit a bit original
+
+    - Parámetros:
+        - data (str, bytes, bytearray o memoryview) -> el mensaje del cual se calculará el CRC
+        - crc (int) -> valor inicial del registro; permite continuar un cálculo anterior
+    - Return -> int: número de 16 bits que representa el CRC
+    """
+
+    data = _a_bytes(data)
+
+    # Vía rápida -> crc_hqx acepta cualquier objeto con protocolo de buffer (contiguo)
+    if crc_hqx is not None:
+        return crc_hqx(data, crc)
+
+    return crc16_ccitt_tabla(data, crc)
+
+
+class CRC16:
+    """
+    Cálculo incremental del CRC16-CCITT -> para mensajes que llegan o se envían por partes
+        - update(data) -> agrega un fragmento al cálculo
+        - digest() -> devuelve el CRC como 2 bytes (big-endian)
+        - value -> devuelve el CRC como int
+
+    Ejemplo:
+        crc = CRC16()
+        crc.update(b"Hola ")
+        crc.update(b"mundo")
+        crc.value == crc16_ccitt("Hola mundo")  # True
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, data=None, crc=CRC_INICIAL):
+        self.value = crc
+
+        if data is not None:
+            self.update(data)
+
+    def update(self, data):
+        """Agrega data (str, bytes, bytearray o memoryview) al cálculo del CRC"""
+        self.value = crc16_ccitt(data, self.value)
+        return self
+
+    def digest(self):
+        """Return -> bytes: el CRC actual en 2 bytes (orden de red, big-endian)"""
+        return self.value.to_bytes(2, "big")
+
+    def hexdigest(self):
+        """Return -> str: el CRC actual en 4 dígitos hexadecimales (mismo formato que el paquete de texto)"""
+        return format(self.value, "04X")
+
+    def copy(self):
+        """Return -> CRC16: una copia independiente del estado actual"""
+        return CRC16(crc=self.value)
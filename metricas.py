@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO MÉTRICAS (contadores e histogramas en memoria):
+- Reemplaza a los print() por paquete como forma de "ver" qué hace el servidor -> sumar 1 a un contador es
+  mucho más barato que escribir una línea en la terminal
+- Contadores -> paquetes, bytes, errores de CRC, NACK, duplicados, retransmisiones...
+- Histogramas -> latencias (en microsegundos) con cubetas de tamaño creciente: memoria fija, sin guardar cada muestra
+- Sin locks -> solo el hilo que atiende los paquetes escribe; otro hilo puede leer una instantánea en cualquier
+  momento (a lo sumo ve un contador un paquete atrasado)
+- Exportación:
+    - instantanea() -> dict listo para json.dumps() (se puede registrar periódicamente)
+    - servir_consultas() -> puerto UDP local: cualquier datagrama recibido se responde con la instantánea en JSON
+        python metricas.py --port 5099
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+from bisect import bisect_left
+
+import registro
+
+
+# ===================== CONFIGURACIÓN =====================
+HOST_METRICAS = "127.0.0.1" # Solo local -> las métricas no se exponen a la red
+PORT_METRICAS = 5099 # Puerto UDP de consulta de métricas
+TIMEOUT_CONSULTA = 1.0 # (segundos) Espera máxima de la respuesta al consultar
+# ==========================================================
+
+# Límites superiores de las cubetas de los histogramas -> crecen un 19% (2 ** (1/4)) de una a la siguiente, de 1 a 2 ** 24
+# (en microsegundos: de 1 us a ~16 s) -> el percentil informado está a lo sumo un 19% por encima del real
+LIMITES_HISTOGRAMA = [2 ** (indice / 4) for indice in range(24 * 4 + 1)]
+
+# Contenido de las consultas al puerto de métricas
+CONSULTA = b"metricas" # Respuesta resumida (percentiles) -> para mostrar
+CONSULTA_CRUDO = b"crudo" # Respuesta con las cubetas -> para sumar las métricas de varios procesos
+
+log = registro.obtener("Métricas")
+
+
+class Histograma:
+    """
+    Histograma de cubetas fijas
+        - registrar(valor) -> suma 1 a la cubeta del valor (búsqueda binaria sobre LIMITES_HISTOGRAMA)
+        - percentil(p) -> aproximado: límite superior de la cubeta donde cae el percentil
+    """
+
+    __slots__ = ("cubetas", "cantidad", "suma", "maximo")
+
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES_HISTOGRAMA) + 1) # La última cubeta guarda lo que supera el último límite
+        self.cantidad = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, valor):
+        """Agrega una muestra (en las unidades del histograma, por ej. microsegundos)"""
+
+        self.cubetas[bisect_left(LIMITES_HISTOGRAMA, valor)] += 1
+        self.cantidad += 1
+        self.suma += valor
+
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, p):
+        """Return -> float: valor aproximado del percentil p (0 - 100), 0 si no hay muestras"""
+
+        if not self.cantidad:
+            return 0.0
+
+        objetivo = self.cantidad * p / 100
+        acumulado = 0
+
+        for indice, cantidad in enumerate(self.cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo and cantidad:
+                # El máximo es exacto -> ningún percentil puede superarlo
+                limite = LIMITES_HISTOGRAMA[indice] if indice < len(LIMITES_HISTOGRAMA) else self.maximo
+                return min(limite, self.maximo)
+
+        return self.maximo
+
+    def crudo(self):
+        """Return -> dict con las cubetas completas (para combinar histogramas de varios procesos)"""
+        return {"cubetas": list(self.cubetas), "cantidad": self.cantidad, "suma": self.suma, "maximo": self.maximo}
+
+    def combinar(self, crudo):
+        """Suma a este histograma otro exportado con crudo() -> mismas cubetas, se suman una a una"""
+
+        for indice, cantidad in enumerate(crudo["cubetas"]):
+            self.cubetas[indice] += cantidad
+
+        self.cantidad += crudo["cantidad"]
+        self.suma += crudo["suma"]
+        self.maximo = max(self.maximo, crudo["maximo"])
+
+    def instantanea(self):
+        """Return -> dict: cantidad, promedio, p50, p99 y máximo"""
+
+        return {
+            "cantidad": self.cantidad,
+            "promedio": self.suma / self.cantidad if self.cantidad else 0.0,
+            "p50": self.percentil(50),
+            "p99": self.percentil(99),
+            "maximo": self.maximo,
+        }
+
+
+class Metricas:
+    """
+    Conjunto de contadores e histogramas de un proceso (servidor o cliente)
+        - contadores -> dict nombre -> int; se incrementan con sumar()
+        - histogramas -> dict nombre -> Histograma; se crean con la primera muestra
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.inicio = time.monotonic()
+        self.contadores = {}
+        self.histogramas = {}
+
+    def sumar(self, contador, cantidad=1):
+        """Suma 'cantidad' al contador (lo crea en 0 si no existe)"""
+        self.contadores[contador] = self.contadores.get(contador, 0) + cantidad
+
+    def registrar(self, histograma, valor):
+        """Agrega una muestra al histograma (lo crea si no existe)"""
+
+        destino = self.histogramas.get(histograma)
+
+        if destino is None:
+            destino = self.histogramas[histograma] = Histograma()
+
+        destino.registrar(valor)
+
+    def instantanea(self):
+        """
+        Copia de todas las métricas en este momento
+
+        - Return -> dict con nombre, segundos desde el inicio, contadores e histogramas
+        """
+
+        # Se copian primero -> el hilo de los paquetes puede agregar claves mientras se arma la instantánea
+        contadores = dict(self.contadores)
+        histogramas = dict(self.histogramas)
+
+        return {
+            "nombre": self.nombre,
+            "segundos": time.monotonic() - self.inicio,
+            "contadores": contadores,
+            "histogramas": {nombre: histograma.instantanea() for nombre, histograma in histogramas.items()},
+        }
+
+    def crudo(self):
+        """Return -> dict como instantanea(), pero con las cubetas de cada histograma (ver combinar())"""
+
+        contadores = dict(self.contadores)
+        histogramas = dict(self.histogramas)
+
+        return {
+            "nombre": self.nombre,
+            "segundos": time.monotonic() - self.inicio,
+            "contadores": contadores,
+            "histogramas": {nombre: histograma.crudo() for nombre, histograma in histogramas.items()},
+        }
+
+    def combinar(self, crudo):
+        """Suma a estas métricas las exportadas con crudo() por otro proceso (contadores e histogramas)"""
+
+        for contador, valor in crudo["contadores"].items():
+            self.sumar(contador, valor)
+
+        for nombre, histograma in crudo["histogramas"].items():
+            destino = self.histogramas.get(nombre)
+
+            if destino is None:
+                destino = self.histogramas[nombre] = Histograma()
+
+            destino.combinar(histograma)
+
+    def resumen(self):
+        """Return -> str: contadores en una línea (para registrar periódicamente)"""
+
+        contadores = dict(self.contadores)
+        return " | ".join(f"{nombre} {valor}" for nombre, valor in sorted(contadores.items())) or "sin actividad"
+
+
+def servir_consultas(metricas, host=HOST_METRICAS, port=PORT_METRICAS, comandos=None):
+    """
+    Inicia un hilo que responde consultas de métricas por UDP
+        - Un datagrama CONSULTA_CRUDO se responde con metricas.crudo(); cualquier otro, con metricas.instantanea() (JSON)
+        - metricas puede ser cualquier objeto con instantanea() y crudo() (por ej. el agregador del supervisor)
+        - comandos -> función (datos) -> dict o None que atiende primero cada datagrama (por ej. perfilado.atender_comando):
+          si devuelve un dict se responde ese dict; si devuelve None, el datagrama es una consulta de métricas
+        - El hilo es daemon -> termina junto con el proceso
+        - Un error de socket (por ej. el que consultó ya cerró su puerto) se registra y el hilo sigue atendiendo
+
+    - Return -> threading.Thread ya iniciado
+    """
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+
+    def atender():
+        while True:
+            try:
+                datos, direccion = sock.recvfrom(64)
+                respuesta = comandos(datos) if comandos is not None else None
+
+                if respuesta is None:
+                    respuesta = metricas.crudo() if datos == CONSULTA_CRUDO else metricas.instantanea()
+
+                sock.sendto(json.dumps(respuesta).encode("utf-8"), direccion)
+            except OSError as error:
+                # Sin este except un solo error terminaría el hilo y las métricas dejarían de responder sin aviso
+                log.warning("Error atendiendo una consulta de métricas (%s)", error)
+
+    hilo = threading.Thread(target=atender, name="metricas", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def consultar(host=HOST_METRICAS, port=PORT_METRICAS, timeout=TIMEOUT_CONSULTA, crudo=False):
+    """
+    Pide la instantánea de métricas a un proceso que ejecuta servir_consultas()
+
+    - Parámetro -> crudo (bool): True pide las cubetas completas de los histogramas (para combinarlas)
+    - Return -> dict (la instantánea)
+    - Excepción -> socket.timeout si no hay respuesta
+    """
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.sendto(CONSULTA_CRUDO if crudo else CONSULTA, (host, port))
+        datos, direccion = sock.recvfrom(65535)
+
+    return json.loads(datos)
+
+
+def main(argv=None):
+    """Consulta las métricas de un servidor en ejecución y las muestra en JSON"""
+
+    parser = argparse.ArgumentParser(description="Consulta las métricas de un servidor en ejecución")
+    parser.add_argument("--host", default=HOST_METRICAS, help="IP del puerto de métricas")
+    parser.add_argument("--port", type=int, default=PORT_METRICAS, help="puerto de métricas")
+    argumentos = parser.parse_args(argv)
+
+    try:
+        print(json.dumps(consultar(argumentos.host, argumentos.port), indent=2))
+    except socket.timeout:
+        print(f"[Métricas] Sin respuesta de {argumentos.host}:{argumentos.port}")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO PERFILADO (dónde se va el tiempo de cada paquete, sin reiniciar el servidor):
+- Etapas -> con 'etapas' en True, el servidor y el cliente miden cada etapa del camino de un paquete con
+  time.perf_counter() y la registran en un histograma de las métricas (cubetas fijas, ver metricas.py):
+    - servidor -> etapa_decodificar_us (cabecera binaria o split del texto), etapa_canal_us (errores simulados),
+      etapa_crc_us, etapa_descomprimir_us, etapa_ventana_us (ventana de recepción + entrega), etapa_sendto_us
+    - cliente -> etapa_armar_us (paquete + CRC), etapa_sendto_us, etapa_espera_us (hasta la respuesta o el timeout)
+    - Desactivadas (por defecto) cuestan una comparación por etapa: no se llama a perf_counter() ni se registra nada
+- Capturas bajo demanda -> se inician y se detienen con el proceso en marcha; al detenerlas se escriben en DIRECTORIO_PERFILES
+    - cProfile -> archivo .prof (python -m pstats <archivo>) + resumen .txt ordenado por tiempo acumulado
+    - tracemalloc -> instantánea .tracemalloc (tracemalloc.Snapshot.load) + resumen .txt con las líneas que más memoria reservan
+- Control:
+    - Señales -> SIGUSR1 inicia/detiene cProfile, SIGUSR2 inicia/detiene tracemalloc (kill -USR1 <pid>)
+    - Datagramas al puerto de métricas (ver metricas.servir_consultas) -> python perfilado.py perfil-iniciar | perfil-detener |
+      memoria-iniciar | memoria-detener | etapas-iniciar | etapas-detener | estado
+- cProfile solo mide el hilo que lo activa -> los pedidos que llegan al hilo de métricas se ejecutan en el hilo principal
+  (el que atiende los paquetes): se encolan y se lo despierta con SENAL_PEDIDO (una señal propia: un kill -USR1 que
+  llega mientras hay un pedido en cola no se confunde con ese pedido)
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import signal
+import socket
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import registro
+from metricas import HOST_METRICAS, PORT_METRICAS, TIMEOUT_CONSULTA
+
+
+# ===================== CONFIGURACIÓN =====================
+ETAPAS_ACTIVAS = False # Medir las etapas de cada paquete desde el inicio (también se activan en marcha con etapas-iniciar)
+DIRECTORIO_PERFILES = "perfiles" # Carpeta donde se escriben las capturas
+SENAL_PERFIL = getattr(signal, "SIGUSR1", None) # Inicia/detiene cProfile (None en sistemas sin la señal, por ej. Windows)
+SENAL_MEMORIA = getattr(signal, "SIGUSR2", None) # Inicia/detiene tracemalloc
+SENAL_PEDIDO = getattr(signal, "SIGRTMIN", getattr(signal, "SIGURG", None)) # Despierta al hilo principal para los pedidos encolados (solo de uso interno)
+CUADROS_MEMORIA = 10 # Cuadros de la pila que guarda tracemalloc por cada reserva (más = más detalle y más costo)
+LINEAS_RESUMEN = 40 # Funciones / líneas del resumen .txt de cada captura
+TIMEOUT_PEDIDO = 2.0 # (segundos) Espera máxima del hilo de métricas a que el hilo principal ejecute un pedido
+# ==========================================================
+
+log = registro.obtener("Perfilado")
+
+# Comandos de control -> cualquier otro datagrama al puerto de métricas es una consulta de métricas
+COMANDOS = ("perfil-iniciar", "perfil-detener", "memoria-iniciar", "memoria-detener", "etapas-iniciar", "etapas-detener", "estado")
+
+# Medición de etapas -> se consulta una vez por paquete (un atributo de módulo: se puede cambiar en marcha)
+etapas = ETAPAS_ACTIVAS
+
+# Captura de cProfile en curso (None si no hay)
+_perfil = None
+
+# Pedidos del hilo de métricas para el hilo principal -> (comando, threading.Event, dict con el resultado, dict con el estado)
+# El estado se fija una sola vez con setdefault (atómico): "tomado" por el hilo principal o "vencido" por el que espera
+_pedidos = deque()
+
+
+def _ruta(extension):
+    # Un archivo por captura (fecha con milisegundos) -> el pid distingue a los trabajadores del supervisor
+    os.makedirs(DIRECTORIO_PERFILES, exist_ok=True)
+    ahora = time.time()
+    fecha = time.strftime("%Y%m%d_%H%M%S", time.localtime(ahora))
+    return os.path.join(DIRECTORIO_PERFILES, f"{fecha}_{int(ahora * 1000) % 1000:03d}_{os.getpid()}.{extension}")
+
+
+def iniciar_perfil():
+    """Inicia una captura de cProfile en el hilo actual -> Return: dict con el estado"""
+
+    global _perfil
+
+    if _perfil is not None:
+        return {"perfil": "ya iniciado"}
+
+    _perfil = cProfile.Profile()
+    _perfil.enable()
+    return {"perfil": "iniciado"}
+
+
+def detener_perfil():
+    """
+    Detiene la captura de cProfile y la escribe en DIRECTORIO_PERFILES
+
+    - Return -> dict con las rutas del .prof y del resumen .txt (o el estado, si no había captura)
+    """
+
+    global _perfil
+
+    if _perfil is None:
+        return {"perfil": "no iniciado"}
+
+    perfil, _perfil = _perfil, None
+    perfil.disable()
+
+    ruta = _ruta("prof")
+    perfil.dump_stats(ruta)
+
+    with open(ruta[:-len("prof")] + "perfil.txt", "w", encoding="utf-8") as resumen:
+        pstats.Stats(perfil, stream=resumen).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(LINEAS_RESUMEN)
+
+    return {"perfil": "detenido", "archivo": ruta, "resumen": resumen.name}
+
+
+def iniciar_memoria():
+    """Inicia tracemalloc (todas las reservas de memoria de Python, de todos los hilos) -> Return: dict con el estado"""
+
+    if tracemalloc.is_tracing():
+        return {"memoria": "ya iniciada"}
+
+    tracemalloc.start(CUADROS_MEMORIA)
+    return {"memoria": "iniciada"}
+
+
+def detener_memoria():
+    """
+    Toma una instantánea de tracemalloc, la escribe en DIRECTORIO_PERFILES y detiene el seguimiento
+
+    - Return -> dict con las rutas de la instantánea y del resumen .txt (o el estado, si no estaba iniciada)
+    """
+
+    if not tracemalloc.is_tracing():
+        return {"memoria": "no iniciada"}
+
+    instantanea = tracemalloc.take_snapshot()
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ruta = _ruta("tracemalloc")
+    instantanea.dump(ruta)
+
+    with open(ruta[:-len("tracemalloc")] + "memoria.txt", "w", encoding="utf-8") as resumen:
+        resumen.write(f"Memoria seguida: actual {actual:,} bytes | pico {pico:,} bytes\n\n")
+        for estadistica in instantanea.statistics("lineno")[:LINEAS_RESUMEN]:
+            resumen.write(f"{estadistica}\n")
+
+    return {"memoria": "detenida", "archivo": ruta, "resumen": resumen.name, "actual": actual, "pico": pico}
+
+
+def estado():
+    """Return -> dict: qué está activo (etapas, cProfile, tracemalloc)"""
+    return {"etapas": etapas, "perfil": _perfil is not None, "memoria": tracemalloc.is_tracing(), "pid": os.getpid()}
+
+
+def ejecutar(comando):
+    """
+    Ejecuta un comando de control EN EL HILO ACTUAL
+
+    - Parámetro -> comando (str): uno de COMANDOS
+    - Return -> dict con el resultado (para responderlo en JSON)
+    """
+
+    global etapas
+
+    if comando == "perfil-iniciar":
+        return iniciar_perfil()
+    if comando == "perfil-detener":
+        return detener_perfil()
+    if comando == "memoria-iniciar":
+        return iniciar_memoria()
+    if comando == "memoria-detener":
+        return detener_memoria()
+    if comando in ("etapas-iniciar", "etapas-detener"):
+        etapas = comando == "etapas-iniciar"
+        return {"etapas": etapas}
+    if comando == "estado":
+        return estado()
+
+    return {"error": f"comando desconocido: {comando}"}
+
+
+def _ejecutar_sin_fallar(comando):
+    # Un error de la captura (por ej. sin permiso de escritura en DIRECTORIO_PERFILES) se informa: el servidor sigue
+    try:
+        return ejecutar(comando)
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+
+
+def _atender_pedidos(numero, marco):
+    # Pedidos encolados por el hilo de métricas -> un pedido cuya espera ya venció no se ejecuta (ya se respondió el error)
+    while _pedidos:
+        comando, listo, resultado, estado_pedido = _pedidos.popleft()
+
+        if estado_pedido.setdefault("estado", "tomado") != "tomado":
+            continue
+
+        resultado.update(_ejecutar_sin_fallar(comando))
+        listo.set()
+
+
+def _atender_senal(numero, marco):
+    # Señal enviada desde afuera (kill) -> alterna la captura
+    if numero == SENAL_PERFIL:
+        comando = "perfil-detener" if _perfil is not None else "perfil-iniciar"
+    else:
+        comando = "memoria-detener" if tracemalloc.is_tracing() else "memoria-iniciar"
+
+    log.info("%s", json.dumps(_ejecutar_sin_fallar(comando), ensure_ascii=False))
+
+
+def instalar_senales():
+    """
+    Instala los manejadores de SENAL_PERFIL y SENAL_MEMORIA (solo desde el hilo principal y si el sistema las tiene)
+
+    - Return -> bool: True si quedaron instaladas
+    """
+
+    if SENAL_PERFIL is None or threading.current_thread() is not threading.main_thread():
+        return False
+
+    signal.signal(SENAL_PERFIL, _atender_senal)
+
+    if SENAL_MEMORIA is not None:
+        signal.signal(SENAL_MEMORIA, _atender_senal)
+
+    if SENAL_PEDIDO is not None:
+        signal.signal(SENAL_PEDIDO, _atender_pedidos)
+
+    return True
+
+
+def atender_comando(datos):
+    """
+    Atiende un datagrama de control recibido en el puerto de métricas (ver metricas.servir_consultas)
+        - cProfile se inicia/detiene en el hilo principal -> el pedido se encola, se lo despierta con SENAL_PEDIDO y se
+          espera el resultado (como máximo TIMEOUT_PEDIDO; si vence antes de que el hilo principal lo tome, no se ejecuta)
+
+    - Parámetro -> datos (bytes): contenido del datagrama
+    - Return -> dict con el resultado, o None si el datagrama no es un comando (es una consulta de métricas)
+    """
+
+    comando = datos.decode("ascii", errors="replace").strip()
+
+    if comando not in COMANDOS:
+        return None
+
+    if threading.current_thread() is threading.main_thread():
+        return _ejecutar_sin_fallar(comando)
+
+    # Sin señales instaladas, solo se puede ejecutar acá lo que no depende del hilo (tracemalloc y etapas son globales)
+    if SENAL_PEDIDO is None or signal.getsignal(SENAL_PEDIDO) is not _atender_pedidos:
+        if comando.startswith("perfil-"):
+            return {"error": "cProfile requiere las señales del hilo principal (ver instalar_senales())"}
+        return _ejecutar_sin_fallar(comando)
+
+    listo = threading.Event()
+    resultado = {}
+    estado_pedido = {}
+    _pedidos.append((comando, listo, resultado, estado_pedido))
+    signal.pthread_kill(threading.main_thread().ident, SENAL_PEDIDO)
+
+    if not listo.wait(TIMEOUT_PEDIDO):
+        # Se marca vencido solo si el hilo principal todavía no lo tomó -> si ya lo está ejecutando, se espera el resultado
+        if estado_pedido.setdefault("estado", "vencido") == "vencido":
+            return {"error": "el hilo principal no atendió el pedido a tiempo"}
+        listo.wait()
+
+    return resultado
+
+
+def enviar_comando(comando, host=HOST_METRICAS, port=PORT_METRICAS, timeout=TIMEOUT_CONSULTA):
+    """
+    Envía un comando de control al puerto de métricas de un proceso en marcha
+
+    - Return -> dict (la respuesta)
+    - Excepción -> socket.timeout si no hay respuesta
+    """
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.sendto(comando.encode("ascii"), (host, port))
+        datos, direccion = sock.recvfrom(65535)
+
+    return json.loads(datos)
+
+
+def main(argv=None):
+    """
+    Envía un comando de control a un servidor en ejecución
+
+    - Ejemplos:
+        python perfilado.py perfil-iniciar     -> empieza a capturar con cProfile
+        python perfilado.py perfil-detener     -> detiene la captura y muestra el archivo escrito
+        python perfilado.py etapas-iniciar     -> activa los histogramas etapa_*_us (python metricas.py los muestra)
+    """
+
+    parser = argparse.ArgumentParser(description="Perfilado bajo demanda de un servidor en ejecución")
+    parser.add_argument("comando", choices=COMANDOS, help="acción a realizar")
+    parser.add_argument("--host", default=HOST_METRICAS, help="IP del puerto de métricas")
+    parser.add_argument("--port", type=int, default=PORT_METRICAS, help="puerto de métricas")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_PEDIDO + TIMEOUT_CONSULTA, help="espera máxima de la respuesta en segundos")
+    argumentos = parser.parse_args(argv)
+
+    try:
+        print(json.dumps(enviar_comando(argumentos.comando, argumentos.host, argumentos.port, argumentos.timeout), indent=2, ensure_ascii=False))
+    except socket.timeout:
+        print(f"[Perfilado] Sin respuesta de {argumentos.host}:{argumentos.port}")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
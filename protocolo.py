@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO PROTOCOLO (formato de los paquetes en la red):
+- Formato BINARIO (versión 1) -> cabecera fija de 12 bytes empaquetada con struct + payload en bytes crudos
+
+    0      2         3       4           8           10     12
+    +------+---------+-------+-----------+-----------+------+---------------+
+    |magia | versión | flags | secuencia | longitud  | CRC  | payload ...   |
+    +------+---------+-------+-----------+-----------+------+---------------+
+     2 B     1 B       1 B     4 B         2 B         2 B    longitud B
+
+    - El CRC16-CCITT cubre los primeros 10 bytes de la cabecera y el payload -> también detecta errores en la secuencia
+    - El payload puede contener cualquier byte (incluido "|")
+    - Las respuestas (ACK/NACK) son una cabecera sin payload con el flag correspondiente
+    - ACK acumulado + SACK (si el cliente envía sus paquetes con FLAG_SACK) -> una sola respuesta confirma muchos paquetes:
+        - flags ACK | SACK, secuencia = próxima secuencia esperada (todas las anteriores llegaron)
+        - payload = mapa de bits de los paquetes recibidos fuera de orden: el bit i (bit i % 8 del byte i // 8,
+          empezando por el menos significativo) indica que llegó la secuencia + 1 + i
+    - Payload comprimido (FLAG_COMPRIMIDO) -> deflate crudo (zlib, sin cabecera ni checksum: ya está el CRC); se
+      descomprime después de verificar el CRC
+    - Mensaje fragmentado comprimido -> se comprime el mensaje COMPLETO y después se divide (menos fragmentos):
+        - Solo el primer fragmento lleva FLAG_COMPRIMIDO; sus datos empiezan con el largo sin comprimir (4 bytes)
+        - El CRC-32 de la subcabecera cubre lo enviado (largo + comprimido); el servidor descomprime al reensamblar
+    - Mensajes grandes -> se dividen en fragmentos con FLAG_FRAGMENTO; cada payload empieza con una subcabecera
+      de 16 bytes: id del mensaje, índice, total de fragmentos y CRC-32 del mensaje completo
+
+- Formato TEXTO (legado) -> "secuencia|mensaje|CRC-hex" y respuestas "ACK n" | "NACK n"
+
+- Negociación -> el servidor reconoce el formato por los 2 bytes de magia y responde en el mismo formato
+  (un paquete de texto siempre empieza con un dígito, nunca con la magia)
+"""
+
+import struct
+import zlib
+from collections import namedtuple
+
+from crc import crc16_ccitt
+
+
+# ===================== CONFIGURACIÓN =====================
+MAGIA = b"\xCC\x16" # Identifica un paquete binario
+VERSION = 1 # Versión del formato binario
+FORMATO_BINARIO = "binario"
+FORMATO_TEXTO = "texto" # Formato original (legado)
+# ==========================================================
+
+# Flags de la cabecera (se combinan con |)
+FLAG_ACK = 0x01 # Respuesta: paquete recibido correctamente
+FLAG_NACK = 0x02 # Respuesta: paquete con error, reenviar
+FLAG_FRAGMENTO = 0x04 # El payload empieza con una subcabecera de fragmento (mensaje grande dividido en partes)
+FLAG_SACK = 0x08 # Paquete de datos: el cliente acepta ACK acumulados + SACK | Respuesta: ACK acumulado con mapa de bits
+FLAG_ACK_INMEDIATO = 0x10 # Paquete de datos con FLAG_SACK: el cliente no enviará más hasta recibir el ACK -> no demorarlo
+FLAG_COMPRIMIDO = 0x20 # Paquete de datos: el payload está comprimido (deflate crudo, zlib) -> el CRC cubre los bytes comprimidos
+
+# Cabecera: magia (2s), versión (B), flags (B), secuencia (I), longitud (H), CRC (H) -> orden de red (big-endian)
+CABECERA = struct.Struct("!2sBBIHH")
+TAMANO_CABECERA = CABECERA.size # 12 bytes
+FIN_CABECERA_CRC = TAMANO_CABECERA - 2 # Bytes de la cabecera cubiertos por el CRC (todo menos el propio CRC)
+MAX_PAYLOAD = 0xFFFF # El campo longitud tiene 16 bits
+
+# Compresión -> deflate crudo (wbits negativo): sin los 6 bytes de cabecera y Adler-32 de zlib
+BITS_VENTANA_COMPRESION = -15
+MAX_DESCOMPRIMIDO = MAX_PAYLOAD # (bytes) Un payload comprimido no puede crecer más que un payload sin comprimir (evita "bombas" de compresión)
+
+# Subcabecera de fragmento (al inicio del payload): id del mensaje (I), índice (I), total de fragmentos (I), CRC-32 del mensaje completo (I)
+FRAGMENTO = struct.Struct("!IIII")
+TAMANO_FRAGMENTO = FRAGMENTO.size # 16 bytes
+
+# Inicio de los datos del primer fragmento de un mensaje comprimido: largo del mensaje sin comprimir (I)
+LARGO_ORIGINAL = struct.Struct("!I")
+
+# Paquete ya parseado -> payload es un memoryview sobre el buffer recibido (sin copiar)
+Paquete = namedtuple("Paquete", "version flags secuencia payload crc_recibido")
+
+# Respuesta ya parseada -> mapa es el mapa de bits del SACK (b"" en las respuestas ACK/NACK de un solo paquete)
+Respuesta = namedtuple("Respuesta", "tipo secuencia mapa")
+
+# Fragmento ya parseado -> datos es un memoryview sobre el payload (sin copiar)
+Fragmento = namedtuple("Fragmento", "id_mensaje indice total crc_mensaje datos")
+
+
+class ErrorFormato(ValueError):
+    """El datagrama no respeta el formato del protocolo (se descarta sin responder)"""
+
+
+def es_binario(datos):
+    """Return -> bool: True si el datagrama usa el formato binario (empieza con la magia)"""
+    return datos[:2] == MAGIA
+
+
+def calcular_crc(cabecera, payload):
+    """
+    Calcula el CRC de un paquete binario
+        - cabecera -> los primeros 10 bytes de la cabecera (sin el campo CRC)
+        - payload -> bytes, bytearray o memoryview con el contenido
+
+    - Return -> int: CRC16-CCITT de cabecera + payload (calculado por partes, sin concatenar)
+    """
+
+    return crc16_ccitt(payload, crc16_ccitt(cabecera))
+
+
+def construir_paquete(secuencia, payload, flags=0, prefijo=b""):
+    """
+    Construye un paquete binario
+
+    - Parámetros:
+        - secuencia (int) -> número de secuencia (32 bits)
+        - payload (bytes, bytearray, memoryview o str) -> contenido; los str se codifican en UTF-8
+        - flags (int) -> combinación de FLAG_*
+        - prefijo (bytes) -> subcabecera que va antes del payload (por ej. la de fragmento); evita concatenar antes
+    - Return -> bytes: cabecera + prefijo + payload listos para sendto()
+    """
+
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+
+    longitud = len(prefijo) + len(payload)
+
+    if longitud > MAX_PAYLOAD:
+        raise ValueError(f"Payload demasiado grande: {longitud} bytes (máximo {MAX_PAYLOAD})")
+
+    # Se empaqueta la cabecera con CRC 0 -> el CRC se calcula sobre los primeros 10 bytes y luego se completa
+    paquete = bytearray(TAMANO_CABECERA + longitud)
+    CABECERA.pack_into(paquete, 0, MAGIA, VERSION, flags, secuencia, longitud, 0)
+    paquete[TAMANO_CABECERA:TAMANO_CABECERA + len(prefijo)] = prefijo
+    paquete[TAMANO_CABECERA + len(prefijo):] = payload
+
+    vista = memoryview(paquete)
+    crc = calcular_crc(vista[:FIN_CABECERA_CRC], vista[TAMANO_CABECERA:])
+    struct.pack_into("!H", paquete, FIN_CABECERA_CRC, crc)
+
+    return bytes(paquete)
+
+
+def leer_paquete(datos):
+    """
+    Parsea un paquete binario directamente sobre el buffer recibido (sin copiar el payload)
+
+    - Parámetro -> datos (bytes, bytearray o memoryview): el datagrama completo
+    - Return -> Paquete (payload es un memoryview sobre datos)
+        - El CRC NO se verifica acá -> el servidor lo calcula con calcular_crc() después de simular errores
+    - Excepción -> ErrorFormato si la magia, la versión o la longitud no son válidas
+    """
+
+    vista = memoryview(datos)
+
+    if len(vista) < TAMANO_CABECERA:
+        raise ErrorFormato("Paquete más corto que la cabecera")
+
+    magia, version, flags, secuencia, longitud, crc_recibido = CABECERA.unpack_from(vista)
+
+    if magia != MAGIA:
+        raise ErrorFormato("Magia incorrecta")
+
+    if version != VERSION:
+        raise ErrorFormato(f"Versión no soportada: {version}")
+
+    if len(vista) != TAMANO_CABECERA + longitud:
+        raise ErrorFormato(f"Longitud incorrecta: cabecera dice {longitud}, llegaron {len(vista) - TAMANO_CABECERA}")
+
+    return Paquete(version, flags, secuencia, vista[TAMANO_CABECERA:], crc_recibido)
+
+
+def construir_fragmento(secuencia, id_mensaje, indice, total, crc_mensaje, datos, flags=0):
+    """
+    Construye un paquete binario con un fragmento de un mensaje grande
+        - Cada fragmento tiene su propio CRC16 (el del paquete) y su propio número de secuencia
+        - crc_mensaje (CRC-32 del mensaje completo) se verifica al terminar de reensamblar
+        - flags -> flags adicionales a FLAG_FRAGMENTO (por ej. FLAG_SACK)
+
+    - Return -> bytes listos para sendto()
+    """
+
+    return construir_paquete(secuencia, datos, FLAG_FRAGMENTO | flags, FRAGMENTO.pack(id_mensaje, indice, total, crc_mensaje))
+
+
+def leer_fragmento(payload):
+    """
+    Parsea la subcabecera de fragmento al inicio del payload
+
+    - Parámetro -> payload (bytes o memoryview): payload de un paquete con FLAG_FRAGMENTO
+    - Return -> Fragmento (datos es un memoryview sobre payload)
+    - Excepción -> ErrorFormato si el payload es demasiado corto o los índices no tienen sentido
+    """
+
+    vista = memoryview(payload)
+
+    if len(vista) < TAMANO_FRAGMENTO:
+        raise ErrorFormato("Fragmento más corto que su subcabecera")
+
+    id_mensaje, indice, total, crc_mensaje = FRAGMENTO.unpack_from(vista)
+
+    if indice >= total:
+        raise ErrorFormato(f"Índice de fragmento inválido: {indice} de {total}")
+
+    return Fragmento(id_mensaje, indice, total, crc_mensaje, vista[TAMANO_FRAGMENTO:])
+
+
+def comprimir(payload, nivel=zlib.Z_DEFAULT_COMPRESSION):
+    """
+    Comprime un payload para enviarlo con FLAG_COMPRIMIDO
+
+    - Parámetros:
+        - payload (bytes, bytearray o memoryview) -> contenido a comprimir
+        - nivel (int) -> nivel de zlib (1 = rápido ... 9 = más chico)
+    - Return -> bytes comprimidos, o None si comprimido no es más chico (se envía sin comprimir)
+    """
+
+    # La ventana (y la tabla de hash) del compresor se ajustan al payload: reservar el estado completo de zlib
+    # (~256 KB) cuesta más que comprimir un paquete chico; el descompresor acepta cualquier ventana menor a la suya
+    bits = min(-BITS_VENTANA_COMPRESION, max(9, len(payload).bit_length()))
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, -bits, max(1, min(8, bits - 7)))
+    comprimido = compresor.compress(payload) + compresor.flush()
+
+    return comprimido if len(comprimido) < len(payload) else None
+
+
+def descomprimir(payload, maximo=MAX_DESCOMPRIMIDO):
+    """
+    Descomprime el payload de un paquete con FLAG_COMPRIMIDO (después de verificar su CRC)
+
+    - Parámetros:
+        - payload (bytes, bytearray o memoryview) -> payload comprimido
+        - maximo (int) -> bytes máximos del resultado (no se descomprime más allá de este tope)
+    - Return -> bytes descomprimidos
+    - Excepción -> ErrorFormato si el payload no es deflate válido, está incompleto o supera el máximo
+    """
+
+    descompresor = zlib.decompressobj(BITS_VENTANA_COMPRESION)
+
+    try:
+        datos = descompresor.decompress(payload, maximo)
+    except zlib.error as error:
+        raise ErrorFormato(f"Payload comprimido inválido ({error})") from None
+
+    if descompresor.unconsumed_tail:
+        raise ErrorFormato(f"Payload descomprimido mayor a {maximo} bytes")
+
+    if not descompresor.eof:
+        raise ErrorFormato("Payload comprimido incompleto")
+
+    return datos
+
+
+def construir_paquete_texto(secuencia, mensaje):
+    """
+    Construye un paquete en el formato de texto original -> "secuencia|mensaje|CRC"
+
+    - Return -> bytes codificados en UTF-8
+    """
+
+    # Conversión CRC a hexadecimal -> formato: 04X = 4 dígitos hex
+    return f"{secuencia}|{mensaje}|{format(crc16_ccitt(mensaje), '04X')}".encode("utf-8")
+
+
+def construir_respuesta(formato, tipo, secuencia):
+    """
+    Construye una respuesta ACK/NACK en el formato indicado
+
+    - Parámetros:
+        - formato -> FORMATO_BINARIO | FORMATO_TEXTO
+        - tipo (str) -> "ACK" | "NACK"
+        - secuencia (int) -> secuencia que se confirma
+    - Return -> bytes
+    """
+
+    if formato == FORMATO_BINARIO:
+        return construir_paquete(secuencia, b"", FLAG_ACK if tipo == "ACK" else FLAG_NACK)
+
+    return f"{tipo} {secuencia}".encode("utf-8")
+
+
+def construir_sack(base, mapa):
+    """
+    Construye una respuesta ACK acumulado + SACK (solo formato binario)
+
+    - Parámetros:
+        - base (int) -> próxima secuencia esperada: confirma todas las anteriores
+        - mapa (bytes) -> mapa de bits de las secuencias base + 1 + i ya recibidas (ver VentanaRecepcion.mapa_sack())
+    - Return -> bytes
+    """
+
+    return construir_paquete(base, mapa, FLAG_ACK | FLAG_SACK)
+
+
+def recibidos_sack(mapa):
+    """
+    Recorre el mapa de bits de un SACK
+
+    - Parámetro -> mapa (bytes): payload de la respuesta SACK
+    - Return -> generador de int: posiciones i con el bit en 1 (la secuencia base + 1 + i llegó), de menor a mayor
+    """
+
+    for indice_byte, byte in enumerate(mapa):
+        # Los bytes en 0 (la mayoría, si se pierde poco) se saltean sin revisar sus 8 bits
+        while byte:
+            bit = (byte & -byte).bit_length() - 1 # Bit en 1 menos significativo
+            yield indice_byte * 8 + bit
+            byte &= byte - 1
+
+
+def leer_respuesta(datos):
+    """
+    Parsea una respuesta del servidor en cualquiera de los dos formatos
+
+    - Parámetro -> datos (bytes): datagrama recibido por el cliente
+    - Return -> Respuesta(tipo, secuencia, mapa) con tipo "ACK" | "NACK" | "SACK"
+        - "SACK" -> secuencia es la próxima esperada por el servidor y mapa el mapa de bits (ver recibidos_sack())
+    - Excepción -> ErrorFormato si la respuesta no es válida (o su CRC no coincide)
+    """
+
+    if es_binario(datos):
+        paquete = leer_paquete(datos)
+
+        if calcular_crc(memoryview(datos)[:FIN_CABECERA_CRC], paquete.payload) != paquete.crc_recibido:
+            raise ErrorFormato("CRC de la respuesta incorrecto")
+
+        if paquete.flags & FLAG_SACK:
+            return Respuesta("SACK", paquete.secuencia, bytes(paquete.payload))
+
+        if paquete.flags & FLAG_ACK:
+            return Respuesta("ACK", paquete.secuencia, b"")
+
+        if paquete.flags & FLAG_NACK:
+            return Respuesta("NACK", paquete.secuencia, b"")
+
+        raise ErrorFormato("La respuesta no es ACK ni NACK")
+
+    # Formato texto -> "ACK 0" | "NACK 1"
+    try:
+        tipo, secuencia = datos.decode("utf-8").split()
+        return Respuesta(tipo, int(secuencia), b"")
+    except (UnicodeDecodeError, ValueError):
+        raise ErrorFormato("Respuesta de texto inválida") from None
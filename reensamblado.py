@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO REENSAMBLADO (mensajes grandes divididos en fragmentos):
+- La ventana de recepción entrega los fragmentos EN ORDEN -> cada fragmento se escribe apenas llega
+- Mensajes chicos (hasta MAX_MENSAJE_EN_MEMORIA) se arman en memoria; los grandes se escriben a un archivo por partes
+- El CRC-32 del mensaje completo se calcula a medida que llegan los fragmentos y se verifica al final
+- Mensaje comprimido (el primer fragmento llegó con FLAG_COMPRIMIDO) -> se descomprime a medida que llegan los
+  fragmentos, sin superar el largo sin comprimir anunciado al principio (ver protocolo.LARGO_ORIGINAL)
+- Cada cliente puede tener como máximo MAX_MENSAJES_PARCIALES mensajes a medio armar (memoria y archivos acotados)
+"""
+
+import os
+import zlib
+from collections import OrderedDict
+
+import protocolo
+
+
+# ===================== CONFIGURACIÓN =====================
+DIRECTORIO_RECEPCION = "recibidos" # Carpeta donde se guardan los mensajes grandes reensamblados
+MAX_MENSAJE_EN_MEMORIA = 64 * 1024 # (bytes) Mensajes hasta este tamaño se arman en memoria
+MAX_MENSAJES_PARCIALES = 4 # Mensajes a medio armar por cliente -> si se supera, se descarta el más viejo
+# ==========================================================
+
+
+class MensajeParcial:
+    """
+    Estado de un mensaje que se está reensamblando
+        - siguiente -> índice del próximo fragmento esperado
+        - crc -> CRC-32 acumulado de los fragmentos recibidos
+        - buffer -> bytearray (mensaje en memoria) o None si se escribe a archivo
+        - archivo -> archivo abierto (mensaje grande) o None
+        - original -> largo sin comprimir (mensaje comprimido) o None; descompresor -> zlib.decompressobj o None
+        - tamano -> bytes del mensaje ya armados (descomprimidos)
+    """
+
+    __slots__ = ("id_mensaje", "total", "crc_esperado", "siguiente", "crc", "tamano", "buffer", "archivo", "ruta", "original", "descompresor")
+
+    def __init__(self, id_mensaje, total, crc_esperado, en_memoria, ruta, original=None):
+        self.id_mensaje = id_mensaje
+        self.total = total
+        self.crc_esperado = crc_esperado
+        self.siguiente = 0
+        self.crc = 0
+        self.tamano = 0
+        self.ruta = ruta
+        self.original = original
+        self.descompresor = zlib.decompressobj(protocolo.BITS_VENTANA_COMPRESION) if original is not None else None
+
+        if en_memoria:
+            self.buffer = bytearray()
+            self.archivo = None
+        else:
+            self.buffer = None
+            self.archivo = open(ruta + ".parcial", "wb")
+
+    def escribir(self, datos):
+        """
+        Agrega un fragmento (en orden) y actualiza el CRC-32 (calculado sobre lo enviado, comprimido o no)
+            - Excepción -> protocolo.ErrorFormato si los datos comprimidos son inválidos o superan el largo anunciado
+        """
+
+        self.crc = zlib.crc32(datos, self.crc)
+
+        if self.descompresor is not None:
+            # El primer fragmento empieza con el largo sin comprimir (ya leído por el reensamblador)
+            if self.siguiente == 0:
+                datos = datos[protocolo.LARGO_ORIGINAL.size:]
+
+            # Nunca se descomprime más que lo anunciado (+1 para detectar el exceso) -> evita "bombas" de compresión
+            restante = self.original - self.tamano
+
+            try:
+                datos = self.descompresor.decompress(datos, restante + 1)
+            except zlib.error as error:
+                raise protocolo.ErrorFormato(f"Mensaje comprimido inválido ({error})") from None
+
+            if len(datos) > restante or self.descompresor.unconsumed_tail:
+                raise protocolo.ErrorFormato(f"Mensaje descomprimido mayor a {self.original} bytes")
+
+        self.tamano += len(datos)
+
+        if self.archivo is not None:
+            self.archivo.write(datos)
+        else:
+            self.buffer += datos
+
+        self.siguiente += 1
+
+    def descartar(self):
+        """Cierra y borra el archivo parcial (si lo hay)"""
+
+        if self.archivo is not None:
+            self.archivo.close()
+            os.remove(self.ruta + ".parcial")
+
+
+class Reensamblador:
+    """
+    Reensamblador de fragmentos de UN cliente
+        - agregar(fragmento) -> procesa un fragmento entregado en orden por la ventana de recepción
+        - Los mensajes parciales se guardan en un OrderedDict -> el primero es el más viejo (se descarta si hay demasiados)
+    """
+
+    # Resultados posibles de agregar()
+    INCOMPLETO = "incompleto"
+    COMPLETO = "completo"
+    CORRUPTO = "corrupto"
+    FUERA_DE_ORDEN = "fuera de orden"
+
+    def __init__(self, prefijo, directorio=DIRECTORIO_RECEPCION, max_parciales=MAX_MENSAJES_PARCIALES):
+        self.prefijo = prefijo
+        self.directorio = directorio
+        self.max_parciales = max_parciales
+        self.parciales = OrderedDict()
+
+    def agregar(self, fragmento, comprimido=False):
+        """
+        Agrega un fragmento a su mensaje
+
+        - Parámetros:
+            - fragmento (protocolo.Fragmento)
+            - comprimido (bool) -> el paquete llegó con FLAG_COMPRIMIDO (solo cuenta en el primer fragmento: indica
+              que el mensaje completo va comprimido)
+        - Return -> tuple(estado, resultado)
+            - COMPLETO -> resultado es bytes (mensaje en memoria, ya descomprimido) o la ruta del archivo escrito
+            - INCOMPLETO -> resultado es None (faltan fragmentos)
+            - CORRUPTO -> el CRC-32 del mensaje completo no coincide, o sus datos comprimidos son inválidos; resultado es None
+            - FUERA_DE_ORDEN -> el fragmento no es el esperado; el mensaje se descarta
+        """
+
+        parcial = self.parciales.get(fragmento.id_mensaje)
+
+        if parcial is None:
+            if fragmento.indice != 0:
+                return self.FUERA_DE_ORDEN, None
+
+            # Mensaje nuevo -> si hay demasiados a medio armar, se descarta el más viejo
+            if len(self.parciales) >= self.max_parciales:
+                id_viejo, viejo = self.parciales.popitem(last=False)
+                viejo.descartar()
+
+            # Mensaje comprimido -> el primer fragmento empieza con su largo sin comprimir
+            original = None
+            if comprimido:
+                if len(fragmento.datos) < protocolo.LARGO_ORIGINAL.size:
+                    return self.CORRUPTO, None
+                original, = protocolo.LARGO_ORIGINAL.unpack_from(fragmento.datos)
+
+            # Tamaño máximo posible del mensaje -> decide si se arma en memoria o en archivo
+            maximo = original if original is not None else fragmento.total * len(fragmento.datos)
+            en_memoria = maximo <= MAX_MENSAJE_EN_MEMORIA
+            ruta = os.path.join(self.directorio, f"{self.prefijo}_{fragmento.id_mensaje}.bin")
+
+            if not en_memoria:
+                os.makedirs(self.directorio, exist_ok=True)
+
+            parcial = MensajeParcial(fragmento.id_mensaje, fragmento.total, fragmento.crc_mensaje, en_memoria, ruta, original)
+            self.parciales[fragmento.id_mensaje] = parcial
+
+        if fragmento.indice != parcial.siguiente or fragmento.total != parcial.total:
+            del self.parciales[fragmento.id_mensaje]
+            parcial.descartar()
+            return self.FUERA_DE_ORDEN, None
+
+        # Se escribe el fragmento apenas llega -> en memoria queda solo el mensaje parcial chico o nada
+        try:
+            parcial.escribir(fragmento.datos)
+        except protocolo.ErrorFormato:
+            del self.parciales[fragmento.id_mensaje]
+            parcial.descartar()
+            return self.CORRUPTO, None
+
+        if parcial.siguiente < parcial.total:
+            return self.INCOMPLETO, None
+
+        # Último fragmento -> se verifica el CRC-32 del mensaje completo (y que se haya descomprimido entero)
+        del self.parciales[fragmento.id_mensaje]
+
+        incompleto = parcial.descompresor is not None and (not parcial.descompresor.eof or parcial.tamano != parcial.original)
+
+        if parcial.crc != parcial.crc_esperado or incompleto:
+            parcial.descartar()
+            return self.CORRUPTO, None
+
+        if parcial.archivo is None:
+            return self.COMPLETO, bytes(parcial.buffer)
+
+        parcial.archivo.close()
+        os.replace(parcial.ruta + ".parcial", parcial.ruta)
+        return self.COMPLETO, parcial.ruta
+
+    def descartar_todo(self):
+        """Descarta todos los mensajes a medio armar (por ej. cuando la sesión expira)"""
+
+        for parcial in self.parciales.values():
+            parcial.descartar()
+
+        self.parciales.clear()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO REGISTRO (mensajes por pantalla con niveles, usando logging):
+- DEBUG -> detalle de cada paquete (secuencia, CRC recibido/calculado, respuesta, cada intento del cliente)
+- INFO -> mensajes entregados, archivos recibidos, resúmenes periódicos (nivel por defecto)
+- WARNING / ERROR -> problemas: fragmentos inválidos, mensajes no entregados, errores de socket
+- Formato diferido -> log.debug("Secuencia %d", secuencia) solo arma el texto si el nivel DEBUG está activo
+  (con print() el texto se armaba y se escribía en la terminal SIEMPRE, por cada paquete)
+- Se mantiene el formato de salida original -> "[Servidor] mensaje" / "[Cliente] mensaje"
+"""
+
+import logging
+import sys
+
+
+# ===================== CONFIGURACIÓN =====================
+NIVEL = "INFO" # Nivel por defecto -> "DEBUG" muestra el detalle de cada paquete
+FORMATO = "[%(name)s] %(message)s"
+# ==========================================================
+
+NIVELES = ["DEBUG", "INFO", "WARNING", "ERROR"] # Para las opciones de la línea de comandos
+
+
+def obtener(nombre):
+    """
+    Devuelve el logger de un componente
+
+    - Parámetro -> nombre (str): aparece entre corchetes al inicio de cada línea (por ej. "Servidor")
+    - Return -> logging.Logger
+    """
+
+    return logging.getLogger(nombre)
+
+
+def configurar(nivel=NIVEL):
+    """
+    Configura la salida de todos los loggers -> stdout, con FORMATO y el nivel indicado
+        - Se puede llamar más de una vez (por ej. al leer las opciones de la línea de comandos): reemplaza la configuración anterior
+
+    - Parámetro -> nivel (str o int): "DEBUG" | "INFO" | "WARNING" | "ERROR"
+    """
+
+    logging.basicConfig(stream=sys.stdout, format=FORMATO, level=nivel, force=True)
+
+    # Los mensajes internos de asyncio no son del protocolo -> solo advertencias y errores
+    logging.getLogger("asyncio").setLevel(logging.WARNING)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO RTT (tiempo de retransmisión adaptativo):
+- Estima el RTT (tiempo de ida y vuelta) de cada servidor con el algoritmo de Jacobson/Karels (RFC 6298)
+    - SRTT -> RTT suavizado;  RTTVAR -> variación del RTT;  RTO = SRTT + 4 * RTTVAR
+- Algoritmo de Karn -> solo se mide el RTT de paquetes enviados UNA vez (con retransmisiones no se sabe a cuál envío responde el ACK)
+- Timeout -> el RTO se duplica (backoff exponencial) hasta RTO_MAXIMO
+- Jitter -> cada espera se alarga un porcentaje aleatorio, para que varios clientes no reintenten todos a la vez
+"""
+
+import random
+
+
+# ===================== CONFIGURACIÓN =====================
+RTO_INICIAL = 1.0 # (segundos) RTO antes de tener mediciones -> valor recomendado por RFC 6298
+RTO_MINIMO = 0.01 # (segundos) En loopback el RTT es de microsegundos; no tiene sentido esperar menos que esto
+RTO_MAXIMO = 8.0 # (segundos) Tope del backoff exponencial
+JITTER = 0.1 # Fracción aleatoria (0 - 10%) que se agrega a cada espera
+ALFA = 1 / 8 # Peso de la nueva muestra en SRTT
+BETA = 1 / 4 # Peso de la nueva muestra en RTTVAR
+K = 4 # Cantidad de RTTVAR que se suman a SRTT
+# ==========================================================
+
+
+class EstimadorRTT:
+    """
+    Estimador de RTT y RTO para UN destino
+        - srtt, rttvar -> estimaciones actuales (None hasta la primera muestra)
+        - rto -> tiempo de espera antes de retransmitir (sin backoff)
+        - backoff -> multiplicador actual por timeouts consecutivos (1, 2, 4, ...)
+    """
+
+    def __init__(self, rto_inicial=RTO_INICIAL):
+        self.srtt = None
+        self.rttvar = None
+        self.rto_base = rto_inicial
+        self.backoff = 1
+        self.muestras = 0
+        self.timeouts = 0
+
+    @property
+    def rto(self):
+        """RTO actual (con backoff y tope) en segundos"""
+        return min(self.rto_base * self.backoff, RTO_MAXIMO)
+
+    def muestra(self, rtt):
+        """
+        Agrega una medición de RTT (en segundos) de un paquete enviado una sola vez
+            - Actualiza SRTT y RTTVAR (Jacobson/Karels)
+            - Una respuesta a tiempo cancela el backoff
+        """
+
+        if self.srtt is None:
+            # Primera medición -> RFC 6298: SRTT = R, RTTVAR = R / 2
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            # RTTVAR se actualiza con el SRTT anterior, luego SRTT
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - ALFA) * self.srtt + ALFA * rtt
+
+        self.rto_base = min(max(self.srtt + K * self.rttvar, RTO_MINIMO), RTO_MAXIMO)
+        self.backoff = 1
+        self.muestras += 1
+
+    def timeout(self):
+        """Registra un timeout -> duplica el RTO (backoff exponencial, con tope RTO_MAXIMO)"""
+
+        if self.rto < RTO_MAXIMO:
+            self.backoff *= 2
+
+        self.timeouts += 1
+
+    def espera(self):
+        """Return -> float: segundos a esperar la respuesta (RTO actual + jitter aleatorio)"""
+        return self.rto * (1 + random.uniform(0, JITTER))
+
+    def resumen(self):
+        """Return -> str: estado del estimador para mostrar al usuario"""
+
+        if self.srtt is None:
+            return f"RTO {self.rto * 1000:.1f} ms (sin mediciones)"
+
+        return (
+            f"RTO {self.rto * 1000:.1f} ms | SRTT {self.srtt * 1000:.3f} ms | "
+            f"RTTVAR {self.rttvar * 1000:.3f} ms | backoff x{self.backoff}"
+        )
+
+
+# Estimadores por destino -> cada servidor (IP, puerto) tiene su propio RTT
+_estimadores = {}
+
+
+def obtener_estimador(direccion, rto_inicial=RTO_INICIAL):
+    """
+    Devuelve el estimador del destino, creándolo si no existe
+
+    - Parámetros:
+        - direccion -> tupla (IP, puerto) del servidor
+        - rto_inicial (float) -> RTO a usar antes de la primera medición
+    - Return -> EstimadorRTT
+    """
+
+    estimador = _estimadores.get(direccion)
+
+    if estimador is None:
+        estimador = EstimadorRTT(rto_inicial)
+        _estimadores[direccion] = estimador
+
+    return estimador
+
+
+def estimadores():
+    """Return -> dict {direccion: EstimadorRTT} con todos los destinos conocidos (para mostrar o exportar)"""
+    return dict(_estimadores)
@@ -11,98 +11,479 @@ EL SERVIDOR DEBE:
 - Recibir mensajes desde un cliente UDP
 - Calcular y verificar el CRC
 - Responder con ACK o NACK según corresponda
+    - Duplicados (retransmisiones por un ACK perdido) -> se repite la respuesta guardada antes de calcular el CRC
+    - Clientes con FLAG_SACK -> ACK acumulado + mapa de bits (SACK), demorado hasta RETARDO_ACK o cada ACK_CADA paquetes
+    - Payloads con FLAG_COMPRIMIDO -> se descomprimen después de verificar el CRC
 - Simular errores en los datos recibidos
 """
 
+import logging
+import os
 import socket 
-import random
+import select
+import time
+from collections import deque
+
+# CRC16-CCITT compartido con client.py -> una sola implementación (tabla + vía rápida en C)
+from crc import crc16_ccitt
+# Ventana de recepción (Repetición Selectiva) -> reemplaza al bit alternante secuencia_esperada
+from ventana import VentanaRecepcion
+# Sesiones por cliente -> cada (IP, puerto) tiene su propia ventana de recepción
+from sesiones import CacheRespuestas, TablaSesiones
+# Reensamblado de mensajes grandes divididos en fragmentos
+from reensamblado import DIRECTORIO_RECEPCION, Reensamblador
+# Simulación de un canal con fallas (separada del procesamiento de paquetes)
+from canal import Canal, FiltroCanal
+# Formato de los paquetes (binario con cabecera struct, o texto legado)
+import protocolo
+# Mensajes con niveles (logging) y métricas en memoria -> reemplazan a los print() por paquete
+import registro
+from metricas import HOST_METRICAS, Metricas, servir_consultas
+# Tiempos por etapa (opcionales) y capturas de cProfile / tracemalloc con el servidor en marcha
+import perfilado
 
 # ===================== CONFIGURACIÓN =====================
 HOST = "127.0.0.1" # Dirección IP local
 PORT = 5000 # Puerto de escucha del servidor
-PROBABILIDAD_DE_ERROR = 0.6 # Probabilidad de error
+PROBABILIDAD_DE_ERROR = 0.6 # Probabilidad de error (por datagrama) -> 0 desactiva la simulación de errores
+SEMILLA_CANAL = None # Semilla de la simulación de errores -> un número hace que las pruebas se puedan repetir
+CANAL = None # Canal con fallas personalizado (canal.Canal: errores por bit/byte, ráfagas, pérdida, duplicación, retardo...)
+TAMANO_VENTANA = 1 # Paquetes en vuelo aceptados -> 1 = stop-and-wait (bit alternante); > 1 = Repetición Selectiva (debe coincidir con el cliente)
+INTERVALO_LIMPIEZA = 5.0 # Cada cuántos segundos se eliminan las sesiones inactivas
+RECEPCION_POR_LOTES = True # True -> buffers reutilizables y respuestas agrupadas; False -> un recvfrom()/sendto() por datagrama
+TAMANO_BUFFER = 65535 # Tamaño máximo de un datagrama (bytes a recibir) -> el máximo de UDP, nada se trunca
+CANTIDAD_BUFFERS = 64 # Cantidad de buffers del anillo -> máximo de datagramas procesados por lote
+NIVEL_LOG = registro.NIVEL # "INFO" muestra los mensajes entregados; "DEBUG" además el detalle de cada paquete (lento con mucha carga)
+INTERVALO_METRICAS = 10.0 # Cada cuántos segundos se muestran los contadores (0 = nunca)
+PORT_METRICAS = 5099 # Puerto UDP local para consultar las métricas (python metricas.py) -> None lo desactiva
+RETARDO_ACK = 0.005 # (segundos) Demora máxima de un ACK acumulado (clientes con FLAG_SACK) -> 0 responde cada paquete
+ACK_CADA = 8 # Paquetes en orden confirmados por cada ACK acumulado (como máximo la mitad de la ventana: el cliente nunca se queda esperando)
 # ==========================================================
 
+# Logger y métricas del servidor -> las usan también servidor_async.py
+log = registro.obtener("Servidor")
+metricas = Metricas("servidor")
 
-def crc16_ccitt(data):
+# ACK acumulados demorados -> direccion_cliente -> Sesion; todos se demoran RETARDO_ACK, así que el orden de
+# inserción es el orden de vencimiento (el primero es siempre el más próximo a vencer)
+acks_diferidos = {}
+
+# Últimas respuestas por (cliente, secuencia) -> un duplicado se responde sin calcular el CRC (ver sesiones.MAX_RESPUESTAS)
+respuestas = CacheRespuestas()
+
+# Respuesta guardada de los clientes con FLAG_SACK -> no se repite la vieja: se arma el SACK con el estado actual
+# Objeto propio (se compara con 'is') -> no se puede confundir con ninguna respuesta real
+SACK_ACTUAL = object()
+
+
+# FUNCIÓN: canal con fallas del servidor -> reemplaza a la antigua simular_error()
+def crear_canal():
+    """
+    Devuelve el canal con fallas que se aplica a los datagramas recibidos (ver canal.py)
+        - CANAL configurado -> se usa ese
+        - PROBABILIDAD_DE_ERROR > 0 -> con esa probabilidad se corrompe un byte del MENSAJE de cada datagrama (como
+          antes: nunca la cabecera, así cada error termina en NACK y no en un datagrama ignorado)
+        - Si no -> None: el servidor no pasa los datagramas por ningún filtro
+
+    - Return -> Canal o None
+    """
+
+    if CANAL is not None:
+        return CANAL
+
+    if PROBABILIDAD_DE_ERROR > 0:
+        return Canal(semilla=SEMILLA_CANAL, probabilidad_paquete=PROBABILIDAD_DE_ERROR, solo_payload=True)
+
+    return None
+
+
+# FUNCIÓN: entregar un mensaje -> se llama en orden, una vez por cada mensaje nuevo aceptado por la ventana
+def entregar_mensaje(sesion, direccion_cliente, flags, mensaje):
     """
-    Calcula el crc16_ccitt del mensaje recibido
-        - CRC -> es una suma de verificación que detecta si hubo errores durante la transmisión del mensaje
-            - Usa polinomio estándar 0x1021 (definido por protocolo CCITT)
-        - Crea un "código único" para cualquier mensaje -> si el mensaje cambia aunque sea UNA letra, el código cambia por COMPLETO
+    Entrega un mensaje aceptado (en orden de secuencia)
+        - Mensaje común -> se muestra
+        - Fragmento -> se agrega al reensamblador de la sesión; al completarse se verifica el CRC-32 del mensaje
 
-    - Parámetro -> data (str o bytes): el mensaje del cual se calculará el CRC
-    - Return -> int: numero de 16 bits que representa el CRC
-    
+    - Parámetros:
+        - sesion (Sesion) -> sesión del cliente
+        - direccion_cliente -> tupla (IP, puerto)
+        - flags (int) -> flags del paquete (0 en formato texto)
+        - mensaje (str o bytes) -> contenido del paquete
     """
 
-    # Convierte el mensaje a bytes -> la computadora trabaja con números, no con letras
-    if type(data) == str:
-        data = data.encode("utf-8")
+    metricas.sumar("entregados")
+
+    if not flags & protocolo.FLAG_FRAGMENTO:
+        # El texto solo se decodifica si se va a mostrar
+        if log.isEnabledFor(logging.INFO):
+            if not isinstance(mensaje, str):
+                mensaje = mensaje.decode("utf-8", errors="replace")
+            log.info("Mensaje aceptado: %s", mensaje)
+        return
+
+    try:
+        fragmento = protocolo.leer_fragmento(mensaje)
+    except protocolo.ErrorFormato as error:
+        metricas.sumar("fragmentos_invalidos")
+        log.warning("Fragmento inválido (%s)", error)
+        return
+
+    # El reensamblador se crea con el primer fragmento del cliente
+    if sesion.reensamblador is None:
+        sesion.reensamblador = Reensamblador(f"{direccion_cliente[0]}_{direccion_cliente[1]}", DIRECTORIO_RECEPCION)
+
+    estado, resultado = sesion.reensamblador.agregar(fragmento, flags & protocolo.FLAG_COMPRIMIDO)
+
+    if flags & protocolo.FLAG_COMPRIMIDO:
+        metricas.sumar("mensajes_comprimidos")
+
+    if estado == Reensamblador.INCOMPLETO:
+        log.debug("Fragmento %d de %d del mensaje %d", fragmento.indice + 1, fragmento.total, fragmento.id_mensaje)
+    elif estado == Reensamblador.COMPLETO and isinstance(resultado, bytes):
+        metricas.sumar("mensajes_reensamblados")
+        log.info("Mensaje aceptado (%d fragmentos, CRC-32 correcto): %s", fragmento.total, resultado.decode("utf-8", errors="replace"))
+    elif estado == Reensamblador.COMPLETO:
+        metricas.sumar("archivos_recibidos")
+        log.info("Archivo recibido (%d fragmentos, CRC-32 correcto): %s", fragmento.total, resultado)
+    elif estado == Reensamblador.CORRUPTO:
+        metricas.sumar("mensajes_corruptos")
+        log.warning("ERROR: el CRC-32 del mensaje %d no coincide (o su compresión es inválida) - mensaje descartado", fragmento.id_mensaje)
+    else:
+        metricas.sumar("fragmentos_fuera_de_orden")
+        log.warning("ERROR: fragmento %d del mensaje %d fuera de orden - mensaje descartado", fragmento.indice, fragmento.id_mensaje)
+
+
+# FUNCIÓN: respuesta ACK acumulado + SACK -> confirma de una vez todo lo recibido por la sesión
+def respuesta_sack(sesion, direccion_cliente):
+    """
+    Construye el ACK acumulado + SACK de la sesión y cancela el que estuviera demorado
 
-    # Se inicializa el CRC -> valor inicial estándar para CRC16-CCITT: 0xFFFF en hexa
-    crc = 0xFFFF
+    - Parámetros:
+        - sesion (Sesion) -> sesión del cliente
+        - direccion_cliente -> tupla (IP, puerto)
+    - Return -> bytes: respuesta con la base de la ventana y el mapa de bits de los mensajes guardados fuera de orden
+    """
 
-    # Se procesa cada byte del mensaje -> cada byte modifica el crc de forma matemática
-    for byte in data:
-        # XOR (^) -> combina los bits del crc con los del byte desplazado. Si los bits son iguales -> resultado 0, sino resultado 1
-        # Desplazamiento (byte << 8) -> desplaza el byte 8 posiciones a la izquierda
-        crc = crc ^ (byte << 8)
+    if sesion.vencimiento_ack is not None:
+        sesion.vencimiento_ack = None
+        acks_diferidos.pop(direccion_cliente, None)
 
-        # Se procesa cada bit del byte usando el polinomio 0x1021
-        for i in range(8):
-            # Verificar si el el primer bit es 1 -> crc & 0x8000 verifica el primer bit >> si el resultado NO ES 0, el primer bit es 1
-            if crc & 0x8000:
-                # Si es 1 -> desplaza crc un bit a la izquierda (empuja todos los bits hacia izquierda. Por ej: 1011 << 1 = 0110)
-                crc = (crc << 1) ^ 0x1021  # Se aplica XOR con el polinomio estándar
-            else:
-                # Si es 0 -> desplaza un bit a izquierda
-                crc = crc << 1
+    sesion.sin_confirmar = 0
+    metricas.sumar("sack")
 
-            # Se mantienen solo 16 bits (en caso de generar más números con desplazamiento)
-            crc = crc & 0xFFFF
-    
-    # Se retorna la "huella" única del mensaje
-    return crc
+    ventana = sesion.ventana
+    log.debug("Respuesta: SACK base %d (%d fuera de orden)", ventana.base, len(ventana.buffer))
+    return protocolo.construir_sack(ventana.base, ventana.mapa_sack())
 
 
-def simular_error(mensaje: str, probabilidad: float):
+# FUNCIÓN: confirmar un paquete de un cliente con FLAG_SACK -> responde ahora o demora el ACK acumulado
+def confirmar_sack(sesion, direccion_cliente, en_orden):
     """
-    Simula errores de transmisión corrompiendo el mensaje
-        - Prueba que el CRC detecte errores de forma correcta
-    
+    Decide si el ACK acumulado se envía ya o se demora para confirmar varios paquetes con un solo datagrama
+        - Se demora solo si el paquete llegó en orden (no hay huecos), no se llegó a ACK_CADA paquetes sin confirmar
+          y el cliente no pidió el ACK inmediato (FLAG_ACK_INMEDIATO: su ventana de congestión está llena)
+        - Huecos o duplicados -> respuesta inmediata: el cliente se entera rápido de lo que falta (o del ACK perdido)
+
     - Parámetros:
-        - mensaje (str) -> el mensaje que puede ser corrompido
-        - probabilidad (float) -> numero entre 0 y 1
+        - sesion (Sesion) -> sesión del cliente
+        - direccion_cliente -> tupla (IP, puerto)
+        - en_orden (bool) -> True si el paquete era nuevo, no quedó nada guardado fuera de orden y no pide ACK inmediato
+    - Return -> bytes con la respuesta, o None si quedó demorada (la envía el bucle con acks_vencidos())
+    """
+
+    sesion.sin_confirmar += 1
+    cada = max(1, min(ACK_CADA, sesion.ventana.tamano // 2))
+
+    if not en_orden or sesion.sin_confirmar >= cada or RETARDO_ACK <= 0:
+        return respuesta_sack(sesion, direccion_cliente)
+
+    if sesion.vencimiento_ack is None:
+        sesion.vencimiento_ack = time.monotonic() + RETARDO_ACK
+        acks_diferidos[direccion_cliente] = sesion
+
+    metricas.sumar("acks_demorados")
+    log.debug("ACK demorado (%d paquetes sin confirmar)", sesion.sin_confirmar)
+    return None
+
+
+# FUNCIÓN: ACK acumulados vencidos -> los que el bucle del servidor debe enviar ahora
+def acks_vencidos(ahora):
+    """
+    Saca los ACK acumulados demorados cuyo plazo ya venció
 
-    - Return -> str, que representa el mensaje original o corrompido (con una letra cambiada), según la probabilidad de corrupción
+    - Parámetro -> ahora (float): time.monotonic()
+    - Return -> generador de (respuesta, direccion_cliente)
     """
 
-    # Genera un número random que determinará si habrá error o no
-    numero_random = random.random()
+    while acks_diferidos:
+        direccion_cliente, sesion = next(iter(acks_diferidos.items()))
+
+        # Ordenados por vencimiento -> se corta en el primero que todavía no venció
+        if sesion.vencimiento_ack > ahora:
+            return
+
+        yield respuesta_sack(sesion, direccion_cliente), direccion_cliente
+
 
-    # Compara el número random con la probabilidad -> ej con probabilidad = 0.2 >>> si numero_random = 0.15 -> 0.15 < 0.2 == habrá error
-    if numero_random < probabilidad:
-        # Conversión del mensaje (str) en una lista de strings para poder modificarlo (corromperlo)
-        lista_caracteres = list(mensaje)
+def proximo_ack():
+    """Return -> float: momento (time.monotonic) en que vence el próximo ACK demorado, o None si no hay"""
 
-        # Si el mensaje no está vacío
-        if len(lista_caracteres) > 0:
-            # Se genera un numero random entre 0 y la longitud de la lista - 1 -> decide una posición válida para insertar el cambio
-            posicion = random.randint(0, len(lista_caracteres) - 1)
-            
-            # Se genera la corrupción del mensaje
-            lista_caracteres[posicion] = "x"
+    for sesion in acks_diferidos.values():
+        return sesion.vencimiento_ack
 
-            # Se le indica al usuario dónde ocurrió el error
-            print(f"[Servidor] ¡Error simulado en la posición {posicion}!")
+    return None
 
-        # Se convierte nuevamente el mensaje a string para retornarlo en modo "texto" -> join() une todos los elementos de la lista en un solo string
-        mensaje = "".join(lista_caracteres)
 
-    # Se retorna el mensaje -> si hubo error, retorna el mensaje con una letra cambiada; si NO hubo error, retorna el mensaje original (sin cambios)
-    return mensaje
+# FUNCIÓN: sesión eliminada -> se borra todo lo que el servidor guardaba de ese cliente fuera de la sesión
+def eliminar_sesion(direccion_cliente):
+    """
+    Borra las respuestas guardadas y el ACK demorado de un cliente cuya sesión se eliminó (TablaSesiones(al_eliminar=...))
+        - Sin esto, la caché seguiría ocupando lugar con respuestas de una sesión que ya no existe
+
+    - Parámetro -> direccion_cliente: tupla (IP, puerto)
+    """
+
+    acks_diferidos.pop(direccion_cliente, None)
 
+    if respuestas.descartar(direccion_cliente):
+        metricas.sumar("respuestas_descartadas")
+
+
+# FUNCIÓN: guardar una respuesta en la caché -> cuenta las respuestas descartadas por falta de lugar
+def guardar_respuesta(direccion_cliente, secuencia, crc, respuesta):
+    if respuestas.guardar(direccion_cliente, secuencia, crc, respuesta):
+        metricas.sumar("respuestas_desalojadas")
+
+
+# FUNCIÓN: procesar un paquete -> toda la lógica del protocolo para UN datagrama (sin tocar el socket)
+# La usan tanto el servidor bloqueante (main) como el servidor asyncio (servidor_async.py)
+def procesar_paquete(datos, direccion_cliente, sesion):
+    """
+    Procesa un datagrama recibido y decide la respuesta
+        - Reconoce el formato (binario o texto) y separa secuencia, mensaje y CRC
+        - Verifica el CRC (los errores simulados ya se aplicaron antes, en el canal)
+        - Usa la ventana de recepción DEL CLIENTE para detectar duplicados y entregar en orden
+        - Los fragmentos de mensajes grandes se entregan al reensamblador de la sesión
+        - Cuenta todo en las métricas del servidor; el detalle del paquete solo se muestra con nivel DEBUG
+        - Con perfilado.etapas, registra el tiempo de cada etapa (decodificar, crc, descomprimir, ventana)
+
+    - Parámetros:
+        - datos (bytes, bytearray o memoryview) -> datagrama recibido
+        - direccion_cliente -> tupla (IP, puerto) del que se envió el mensaje
+        - sesion (Sesion) -> sesión de ese cliente (ventana de recepción y reensamblador)
+    - Return -> bytes con la respuesta (ACK | NACK | SACK, en el mismo formato que el paquete) o None si no se debe
+      responder (o si el ACK acumulado quedó demorado)
+    """
+
+    inicio = time.perf_counter()
+    metricas.sumar("paquetes")
+    metricas.sumar("bytes", len(datos))
+
+    # Tiempos por etapa -> desactivados solo cuestan leer este valor y un if por etapa
+    etapas = perfilado.etapas
+    inicio_etapa = inicio
+
+    # Formato BINARIO -> la cabecera se lee directamente del buffer, el payload no se copia
+    if protocolo.es_binario(datos):
+        formato = protocolo.FORMATO_BINARIO
+
+        try:
+            paquete = protocolo.leer_paquete(datos)
+        except protocolo.ErrorFormato as error:
+            metricas.sumar("formato_invalido")
+            log.debug("Formato incorrecto de %s (%s)", direccion_cliente, error)
+            return None  # Ignora el mensaje actual (no se responde)
+
+        secuencia = paquete.secuencia
+        mensaje = paquete.payload
+        crc_recibido = paquete.crc_recibido
+        flags = paquete.flags
+
+        if etapas:
+            metricas.registrar("etapa_decodificar_us", (time.perf_counter() - inicio_etapa) * 1e6)
+
+        # Duplicado de un paquete ya recibido (su ACK se perdió) -> se repite la respuesta sin tocar el payload ni el CRC
+        # Solo si la secuencia Y el CRC coinciden con el paquete respondido (si no, se procesa normalmente)
+        if sesion.ventana.ya_recibido(secuencia):
+            respuesta = respuestas.obtener(direccion_cliente, secuencia, crc_recibido)
+
+            if respuesta is not None:
+                metricas.sumar("duplicados")
+                metricas.sumar("respuestas_repetidas")
+                log.debug("Duplicado de la secuencia %d - se repite la respuesta guardada", secuencia)
+
+                if respuesta is SACK_ACTUAL:
+                    respuesta = respuesta_sack(sesion, direccion_cliente)
+                else:
+                    metricas.sumar("ack")
+
+                metricas.registrar("procesamiento_us", (time.perf_counter() - inicio) * 1e6)
+                return respuesta
+
+    # Formato TEXTO (legado) -> secuencia|mensaje|crc
+    else:
+        formato = protocolo.FORMATO_TEXTO
+        flags = 0
+
+        # Se decodifican los bytes a texto y se separa el mensaje en partes: secuencia|mensaje|crc
+        # El mensaje DEBE tener 3 partes; si no, el formato es incorrecto
+        try:
+            partes = bytes(datos).decode("utf-8").split("|")
+
+            if len(partes) != 3:
+                raise ValueError("se esperaban 3 partes")
+
+            # Se extraen las partes del mensaje: secuencia -> se convierte a int; mensaje -> el mensaje en sí; crc_recibido -> crc recibido en hexadecimal
+            secuencia = int(partes[0])
+            mensaje = partes[1]
+            crc_recibido = int(partes[2], 16) # Se convierte de hexa (base 16) a número decimal
+        except ValueError as error: # UnicodeDecodeError también es un ValueError
+            metricas.sumar("formato_invalido")
+            log.debug("Formato incorrecto de %s (%s)", direccion_cliente, error)
+            return None  # Ignora el mensaje actual (no se responde)
+
+        if etapas:
+            metricas.registrar("etapa_decodificar_us", (time.perf_counter() - inicio_etapa) * 1e6)
+
+    # Se calcula el CRC del mensaje recibido -> calcula el crc del mensaje y este crc se comparará con el que envió el cliente
+    # En formato binario el CRC cubre también la cabecera (sin el campo CRC)
+    # crc_us se registra siempre; con las etapas activas la misma medición va también a etapa_crc_us
+    inicio_crc = time.perf_counter()
+
+    if formato == protocolo.FORMATO_BINARIO:
+        crc_calculado = protocolo.calcular_crc(memoryview(datos)[:protocolo.FIN_CABECERA_CRC], mensaje)
+    else:
+        crc_calculado = crc16_ccitt(mensaje)
+
+    duracion_crc = (time.perf_counter() - inicio_crc) * 1e6
+    metricas.registrar("crc_us", duracion_crc)
+
+    if etapas:
+        metricas.registrar("etapa_crc_us", duracion_crc)
+
+    log.debug(
+        "Paquete de %s: formato %s | secuencia %d | %d bytes | CRC recibido %04X | CRC calculado %04X",
+        direccion_cliente, formato, secuencia, len(mensaje), crc_recibido, crc_calculado,
+    )
+
+    # Se comparan los CRC -> es la verificación de INTEGRIDAD del mensaje
+    if crc_calculado == crc_recibido:
+        # CRC CORRECTO - sin errores
+        # Se verifica el número de secuencia -> ¿Es un mensaje nuevo, un duplicado o no pertenece a la ventana?
+        # El payload binario se copia solo acá: el buffer del datagrama puede reutilizarse, el mensaje guardado no
+        # Payload comprimido -> se descomprime recién ahora (el CRC cubre los bytes comprimidos): el resultado
+        # reemplaza a esa copia, así que descomprimir no agrega otra copia del mensaje
+        # En un fragmento, FLAG_COMPRIMIDO indica que el mensaje COMPLETO va comprimido -> lo descomprime el reensamblador
+        if flags & protocolo.FLAG_COMPRIMIDO and not flags & protocolo.FLAG_FRAGMENTO:
+            if etapas:
+                inicio_etapa = time.perf_counter()
+
+            try:
+                mensaje = protocolo.descomprimir(mensaje)
+            except protocolo.ErrorFormato as error:
+                # El CRC es correcto -> el error es del cliente, no del canal: reenviarlo no lo arreglaría
+                metricas.sumar("compresion_invalida")
+                log.warning("Payload comprimido inválido de %s (%s) - se ignora", direccion_cliente, error)
+                return None
+
+            if etapas:
+                metricas.registrar("etapa_descomprimir_us", (time.perf_counter() - inicio_etapa) * 1e6)
+
+            metricas.sumar("comprimidos")
+            metricas.sumar("bytes_descomprimidos", len(mensaje) - len(paquete.payload))
+        elif formato == protocolo.FORMATO_BINARIO:
+            mensaje = bytes(mensaje)
+
+        if etapas:
+            inicio_etapa = time.perf_counter()
+
+        ventana = sesion.ventana
+        estado, entregados = ventana.recibir(secuencia, (flags, mensaje))
+
+        if estado == VentanaRecepcion.FUERA_DE_VENTANA:
+            # Secuencia fuera de la ventana -> no se confirma (el cliente la reenviará si corresponde)
+            metricas.sumar("fuera_de_ventana")
+            log.debug("Secuencia %d fuera de ventana (base %d) - se ignora", secuencia, ventana.base)
+            return None
+
+        if estado == VentanaRecepcion.NUEVO:
+            # Secuencia dentro de la ventana -> mensaje NUEVO (se entrega cuando llegan todos los anteriores)
+            metricas.sumar("nuevos")
+
+            if not entregados:
+                log.debug("Mensaje guardado hasta recibir la secuencia %d", ventana.base)
+
+            for secuencia_entregada, (flags_entregado, mensaje_entregado) in entregados:
+                entregar_mensaje(sesion, direccion_cliente, flags_entregado, mensaje_entregado)
+
+        else:
+            # Secuencia ya recibida - mensaje DUPLICADO
+            metricas.sumar("duplicados")
+            log.debug("Mensaje duplicado (ya fue recibido)")
+
+        if etapas:
+            metricas.registrar("etapa_ventana_us", (time.perf_counter() - inicio_etapa) * 1e6)
+
+        # El cliente acepta ACK acumulados -> un solo datagrama confirma este paquete y todos los anteriores
+        # Ventana provisoria (sesión recién creada) -> ACK individual: el acumulado confirmaría secuencias que no llegaron
+        if flags & protocolo.FLAG_SACK and ventana.inicio is None:
+            guardar_respuesta(direccion_cliente, secuencia, crc_recibido, SACK_ACTUAL)
+            en_orden = estado == VentanaRecepcion.NUEVO and not ventana.buffer and not flags & protocolo.FLAG_ACK_INMEDIATO
+            respuesta = confirmar_sack(sesion, direccion_cliente, en_orden)
+            metricas.registrar("procesamiento_us", (time.perf_counter() - inicio) * 1e6)
+            return respuesta
+
+        # Tanto los mensajes nuevos como los duplicados se confirman -> el ACK anterior pudo haberse perdido
+        tipo = "ACK"
+        metricas.sumar("ack")
+
+    else:
+        # CRC INCORRECTO - hay error
+        # Se envía el NACK al cliente -> indica que hubo un error y le pide que lo reenvíe
+        tipo = "NACK"
+        metricas.sumar("errores_crc")
+        metricas.sumar("nack")
+
+    log.debug("Respuesta: %s %d", tipo, secuencia)
+
+    # La respuesta va en el mismo formato que el paquete -> así se negocia el formato con cada cliente
+    respuesta = protocolo.construir_respuesta(formato, tipo, secuencia)
+
+    # Los ACK binarios se guardan para repetirlos si el paquete vuelve a llegar (los NACK no: el reenvío es otro paquete)
+    if tipo == "ACK" and formato == protocolo.FORMATO_BINARIO:
+        guardar_respuesta(direccion_cliente, secuencia, crc_recibido, respuesta)
+    metricas.registrar("procesamiento_us", (time.perf_counter() - inicio) * 1e6)
+    return respuesta
+
+
+# FUNCIÓN: registrar las métricas -> una línea con los contadores (cada INTERVALO_METRICAS segundos)
+def registrar_metricas():
+    """Muestra (nivel INFO) los contadores del servidor y la latencia de procesamiento por paquete"""
+
+    procesamiento = metricas.histogramas.get("procesamiento_us")
+
+    if procesamiento is not None:
+        log.info(
+            "Métricas: %s | procesamiento p50 %.0f us, p99 %.0f us",
+            metricas.resumen(), procesamiento.percentil(50), procesamiento.percentil(99),
+        )
+    else:
+        log.info("Métricas: %s", metricas.resumen())
+
+
+# FUNCIÓN: iniciar la consulta de métricas -> puerto UDP local (si está configurado)
+def iniciar_metricas():
+    """Inicia el hilo que responde consultas de métricas en PORT_METRICAS (si no es None)"""
+
+    if PORT_METRICAS is None:
+        return
+
+    try:
+        servir_consultas(metricas, HOST_METRICAS, PORT_METRICAS, perfilado.atender_comando)
+        log.info("Métricas disponibles en %s:%d (python metricas.py --port %d)", HOST_METRICAS, PORT_METRICAS, PORT_METRICAS)
+    except OSError as error:
+        # Puerto ocupado (por ej. otro servidor) -> el servidor funciona igual, sin consulta de métricas
+        log.warning("No se pudo abrir el puerto de métricas %d (%s)", PORT_METRICAS, error)
 
 
 # ===================== FUNCIÓN PRINCIPAL DEL SERVIDOR =====================
@@ -116,100 +497,307 @@ def main():
     """
     Función principal que ejecuta el servidor UDP:
         - Espera mensajes en un puerto específico
-        - Simula errores de transmisión
+        - Simula errores de transmisión (canal con fallas entre el socket y el procesamiento)
         - Calcula el CRC del mensaje recibido
         - Compara con el CRC que envió el cliente
         - Responde ACK si está OK, NACK si hay error
-        - Lleva control de secuencia para evitar mensajes duplicados
+        - Lleva control de secuencia POR CLIENTE para evitar mensajes duplicados
+        - Con TAMANO_VENTANA > 1 acepta paquetes fuera de orden y los entrega en orden
+    """
+
+    registro.configurar(NIVEL_LOG)
+
+    log.info("Iniciando servidor en %s:%d", HOST, PORT)
+    log.info("Probabilidad de error: %s%%", PROBABILIDAD_DE_ERROR * 100)
+    log.info("Tamaño de ventana: %d", TAMANO_VENTANA)
+
+    sock = crear_socket()
+
+    # Perfilado bajo demanda -> kill -USR1 / -USR2 o python perfilado.py (ver perfilado.py)
+    if perfilado.instalar_senales():
+        log.info("Perfilado: kill -USR1 %d (cProfile) | kill -USR2 %d (tracemalloc)", os.getpid(), os.getpid())
+
+    # Consulta de métricas por UDP (hilo aparte) -> se puede observar el servidor sin frenarlo
+    iniciar_metricas()
+
+    atender_clientes(sock)
+
+
+# FUNCIÓN: crear el socket del servidor
+def crear_socket(reutilizar_puerto=False):
     """
+    Crea el socket UDP del servidor asociado a HOST:PORT
 
-    print(f"[Servidor] Iniciando servidor en {HOST}:{PORT}")
-    print(f"[Servidor] Probabilidad de error: {PROBABILIDAD_DE_ERROR * 100}%")
-    print()
+    - Parámetro -> reutilizar_puerto (bool): activa SO_REUSEPORT -> varios procesos pueden asociarse al mismo puerto
+      y el kernel reparte los clientes entre ellos (ver supervisor.py)
+    - Return -> socket
+    """
 
     # Creación y configuración del socket UDP:
     # socket.AF_INET --> AF determina la familia de direcciones & INET usa direcciones IPv4 para la comunicación (Internet)
     # socket.SOCK_DGRAM --> DGRAM es el tipo unidad de dato usada en UDP (datagrama)
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
+    # SO_REUSEPORT se activa ANTES de bind() y en todos los procesos que comparten el puerto
+    if reutilizar_puerto:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
     # Se "amarra" el socket a una dirección y puertos especificos -> de esta forma, el servidor SOLO RECIBE mensajes EN ESTE PUERTO
     sock.bind((HOST, PORT)) 
 
-    # Se inicia el control de secuencia -> evita procesar mensajes duplicados (alternando entre 0 y 1 para cada mensaje nuevo)
-    secuencia_esperada = 0
+    return sock
+
+
+# FUNCIÓN: atender clientes -> sesiones, canal con fallas y bucle de recepción (no termina)
+def atender_clientes(sock):
+    """
+    Atiende clientes en el socket indefinidamente (bucle por lotes o simple, según RECEPCION_POR_LOTES)
+
+    - Parámetro -> sock: socket creado con crear_socket()
+    """
+
+    # Se inicia el control de secuencia POR CLIENTE -> evita procesar mensajes duplicados
+    # Con ventana 1 alterna entre 0 y 1 para cada mensaje nuevo; con ventana > 1 guarda los que llegan fuera de orden
+    sesiones = TablaSesiones(TAMANO_VENTANA, al_eliminar=eliminar_sesion)
+
+    # Se crea el filtro del canal con fallas -> None si no se simulan errores (los datagramas van directo al procesamiento)
+    canal = crear_canal()
+    filtro = FiltroCanal(canal) if canal is not None else None
 
-    print("[Servidor] Esperando mensajes...\n")
+    log.info("Esperando mensajes...")
 
     # Se genera la espera y procesamiento de mensajes
+    if RECEPCION_POR_LOTES:
+        atender_por_lotes(sock, sesiones, filtro)
+    else:
+        atender(sock, sesiones, filtro)
+
+
+# FUNCIÓN: bucle simple -> un recvfrom() y un sendto() por datagrama
+def atender(sock, sesiones, filtro=None):
+    """
+    Atiende clientes de a un datagrama por vez (bucle original del servidor)
+        - Cada recvfrom() crea un objeto bytes nuevo
+        - Cada respuesta se envía apenas se procesa el paquete
+
+    - Parámetros:
+        - sock -> socket UDP ya asociado al puerto
+        - sesiones (TablaSesiones) -> sesiones por cliente
+        - filtro (FiltroCanal o None) -> canal con fallas por el que pasa cada datagrama antes de procesarlo
+    """
+
+    proxima_limpieza = time.monotonic() + INTERVALO_LIMPIEZA
+    proxima_metricas = time.monotonic() + INTERVALO_METRICAS
+
     while True:
-        # Se reciben datos del cliente -> datos: bytes recibidos; direccion_cliente: tupla con (IP, puerto) del que se envió el mensaje
-        datos, direccion_cliente = sock.recvfrom(1024)  # 1024 es el tamaño máximo del buffer (bytes a recibir)
-        
-        # Se decodifican los bytes a texto
-        mensaje_completo = datos.decode("utf-8")
+        # Con datagramas demorados por el canal o ACK demorados, la espera termina cuando vence el primero
+        proximo = proximo_evento(filtro)
+        sock.settimeout(None if proximo is None else max(proximo - time.monotonic(), 0))
+
+        # Se reciben datos del cliente -> datos: bytes recibidos (formato binario o texto); direccion_cliente: tupla con (IP, puerto) del que se envió el mensaje
+        try:
+            datos, direccion_cliente = sock.recvfrom(TAMANO_BUFFER)  # TAMANO_BUFFER es el tamaño máximo del buffer (bytes a recibir)
+        except socket.timeout:
+            datos = None # Venció un datagrama o un ACK demorado -> se procesa abajo
+
+        ahora = time.monotonic()
+
+        # Cada tanto se eliminan las sesiones de clientes inactivos -> la memoria queda acotada
+        if ahora >= proxima_limpieza:
+            eliminadas = sesiones.expirar(ahora)
+            if eliminadas:
+                metricas.sumar("sesiones_expiradas", eliminadas)
+            proxima_limpieza = ahora + INTERVALO_LIMPIEZA
+
+        # Cada INTERVALO_METRICAS segundos se muestran los contadores
+        if INTERVALO_METRICAS and ahora >= proxima_metricas:
+            registrar_metricas()
+            proxima_metricas = ahora + INTERVALO_METRICAS
+
+        # Sin canal -> el datagrama se procesa directamente; con canal -> se procesan los que ya salieron de él
+        if filtro is None:
+            recibidos = ((datos, direccion_cliente),) if datos is not None else ()
+        else:
+            if datos is not None:
+                entrada_canal(filtro, datos, direccion_cliente, ahora)
+            recibidos = filtro.listos(ahora)
 
-        print(f"[Servidor] Mensaje recibido de: {direccion_cliente}")
-        print(f"\tContenido: {mensaje_completo}")
+        for datos, direccion_cliente in recibidos:
+            # Se busca (o crea) la sesión del cliente -> cada cliente tiene su propia secuencia esperada
+            sesion = sesiones.obtener(direccion_cliente, ahora)
 
-        # Se separa el mensaje en partes: secuencia|mensaje|crc
-        partes = mensaje_completo.split("|")
+            # Se procesa el paquete -> verifica CRC y secuencia, y decide la respuesta
+            respuesta = procesar_paquete(datos, direccion_cliente, sesion)
 
-        # Se valida que el formato sea el correcto -> el mensaje DEBE tener 3 partes, de lo contrario el formato será incorrecto
-        if len(partes) != 3:
-            print("[Servidor] Error: formato incorrecto")
-            continue  # Ignora el mensaje actual y salta al siguiente
+            if respuesta is None:
+                continue  # No se responde -> salta al siguiente mensaje
 
-        # Se extraen las partes del mensaje: secuencia (0 - 1) -> se convierte a int; mensaje -> el mensaje en sí; crc_recibido -> crc recibido en hexadecimal
-        secuencia = int(partes[0])
-        mensaje = partes[1]
-        crc_recibido = int(partes[2], 16) # Se convierte de hexa (base 16) a número decimal
+            # Se envia la respuesta al cliente -> sentdto() envía datos a una dirección específica
+            # respuesta --> ya está en bytes, en el mismo formato que el paquete recibido
+            # direccion_cliente --> define a quién enviar (IP y puerto)
+            enviar_respuesta(sock, respuesta, direccion_cliente)
 
-        # Se simula error en el mensaje -> usando la probabilidad, corrompe el mensaje
-        mensaje = simular_error(mensaje, PROBABILIDAD_DE_ERROR)
+        # ACK acumulados cuyo plazo venció
+        for respuesta, direccion_cliente in acks_vencidos(time.monotonic()):
+            enviar_respuesta(sock, respuesta, direccion_cliente)
 
-        # Se calcula el CRC del mensaje recibido -> calcula el crc del mensaje y este crc se comparará con el que envió el cliente
-        crc_calculado = crc16_ccitt(mensaje)
 
-        print(f"\tSecuencia: {secuencia}")
-        print(f"\tCRC recibido: {crc_recibido}")
-        print(f"\tCRC calculado: {crc_calculado}")
+# FUNCIÓN: pasar un datagrama por el canal con fallas -> con perfilado.etapas se mide cuánto tarda (etapa_canal_us)
+def entrada_canal(filtro, datos, direccion_cliente, ahora):
+    if not perfilado.etapas:
+        filtro.entrada(datos, direccion_cliente, ahora)
+        return
 
+    inicio = time.perf_counter()
+    filtro.entrada(datos, direccion_cliente, ahora)
+    metricas.registrar("etapa_canal_us", (time.perf_counter() - inicio) * 1e6)
 
-        # Se comparan los CRC -> es la verificación de INTEGRIDAD del mensaje
-        if crc_calculado == crc_recibido:
-            # CRC CORRECTO - sin errores
-            print("\n[Servidor] CRC correcto")
 
-            # Se verifica el número de secuencia -> ¿Es el mensaje esperado o es duplicado?
-            if secuencia == secuencia_esperada:
-                
-                # Secuencia correcta -> mensaje NUEVO
-                print(f"[Servidor] Mensaje aceptado: {mensaje}")
-                respuesta = f"ACK {str(secuencia)}"
+# FUNCIÓN: enviar una respuesta -> con perfilado.etapas se mide cuánto tarda sendto() (etapa_sendto_us)
+def enviar_respuesta(sock, respuesta, direccion_cliente):
+    if not perfilado.etapas:
+        sock.sendto(respuesta, direccion_cliente)
+        return
 
-                # Se alterna la secuencia esperada (0 -> 1 -> 0 -> 1...) --> asegura que cada mensaje nuevo tenga un número diferente
-                if secuencia_esperada == 0:
-                    secuencia_esperada = 1
-                else:
-                    secuencia_esperada = 0
-                
-            else:
-                # Secuencia incorrecta - mensaje DUPLICADO
-                print("[Servidor] Mensaje duplicado (ya fue recibido)")
-                respuesta = f"ACK {str(secuencia)}"
+    inicio = time.perf_counter()
+    sock.sendto(respuesta, direccion_cliente)
+    metricas.registrar("etapa_sendto_us", (time.perf_counter() - inicio) * 1e6)
 
-        else:
-            # CRC INCORRECTO - hay error
-            print("[Servidor] ERROR detectado en el mensaje")
-            # Se envía el NACK al cliente -> indica que hubo un error y le pide que lo reenvíe
-            respuesta = f"NACK {str(secuencia)}"
-        
-
-        # Se envia la respuesta al cliente -> sentdto() envía datos a una dirección específica
-        # respuesta.encode() --> convierte str a bytes
-        # direccion_cliente --> define a quién enviar (IP y puerto)
-        sock.sendto(respuesta.encode("utf-8"), direccion_cliente)
-        print(f"[Servidor] Respuesta enviada: {respuesta}\n")
+
+# FUNCIÓN: próximo evento con plazo -> hasta cuándo puede esperar el bucle sin recibir nada
+def proximo_evento(filtro):
+    """
+    - Parámetro -> filtro (FiltroCanal o None)
+    - Return -> float: momento (time.monotonic) del próximo datagrama demorado por el canal o ACK demorado; None si no hay
+    """
+
+    plazos = [plazo for plazo in (proximo_ack(), filtro.proximo() if filtro is not None else None) if plazo is not None]
+    return min(plazos) if plazos else None
+
+
+# FUNCIÓN: recibir un lote -> vacía el socket en los buffers preasignados
+def recibir_lote(sock, vistas):
+    """
+    Recibe todos los datagramas disponibles (hasta llenar los buffers) sin bloquear
+        - recvfrom_into() escribe en un buffer que ya existe -> no se crea un objeto bytes por datagrama
+
+    - Parámetros:
+        - sock -> socket UDP en modo no bloqueante
+        - vistas -> lista de memoryview sobre los bytearray del anillo de buffers
+    - Return -> lista de (vista del datagrama, direccion_cliente); las vistas son válidas hasta el próximo lote
+    """
+
+    lote = []
+
+    for vista in vistas:
+        try:
+            cantidad, direccion_cliente = sock.recvfrom_into(vista)
+        except (BlockingIOError, InterruptedError):
+            break  # No hay más datagramas listos
+
+        lote.append((vista[:cantidad], direccion_cliente))
+
+    return lote
+
+
+# FUNCIÓN: enviar un lote -> vacía la cola de respuestas pendientes
+def enviar_lote(sock, pendientes):
+    """
+    Envía las respuestas encoladas (ACK/NACK) una detrás de otra
+        - Si el buffer de envío del socket se llena, las que faltan quedan en la cola para el próximo ciclo
+
+    - Parámetros:
+        - sock -> socket UDP en modo no bloqueante
+        - pendientes (collections.deque) -> cola de (respuesta, direccion_cliente)
+    """
+
+    while pendientes:
+        respuesta, direccion_cliente = pendientes[0]
+
+        try:
+            enviar_respuesta(sock, respuesta, direccion_cliente)
+        except (BlockingIOError, InterruptedError):
+            return  # Socket lleno -> se reintenta cuando vuelva a estar disponible para escritura
+
+        pendientes.popleft()
+
+
+# FUNCIÓN: bucle por lotes -> buffers reutilizables y respuestas agrupadas
+def atender_por_lotes(sock, sesiones, filtro=None):
+    """
+    Atiende clientes por lotes:
+        1. Espera (select) hasta que haya datagramas para leer
+        2. Recibe TODOS los datagramas listos en un anillo de buffers preasignados (recvfrom_into)
+        3. Procesa el lote completo y encola las respuestas
+        4. Envía las respuestas encoladas juntas
+
+    - Parámetros:
+        - sock -> socket UDP ya asociado al puerto
+        - sesiones (TablaSesiones) -> sesiones por cliente
+        - filtro (FiltroCanal o None) -> canal con fallas por el que pasa cada datagrama antes de procesarlo
+    """
+
+    # El socket no bloquea -> se drena hasta que recvfrom_into() indique que no hay más datos
+    sock.setblocking(False)
+
+    # Anillo de buffers -> se crean UNA sola vez y se reutilizan en cada lote
+    buffers = [bytearray(TAMANO_BUFFER) for i in range(CANTIDAD_BUFFERS)]
+    vistas = [memoryview(buffer) for buffer in buffers]
+
+    # Cola de respuestas pendientes de envío
+    pendientes = deque()
+
+    proxima_limpieza = time.monotonic() + INTERVALO_LIMPIEZA
+    proxima_metricas = time.monotonic() + INTERVALO_METRICAS
+
+    while True:
+        # Se espera a que haya datagramas (o lugar para enviar respuestas pendientes)
+        # Con datagramas demorados por el canal o ACK demorados, la espera termina cuando vence el primero
+        escritura = [sock] if pendientes else []
+        espera = min(INTERVALO_LIMPIEZA, INTERVALO_METRICAS or INTERVALO_LIMPIEZA)
+        proximo = proximo_evento(filtro)
+        if proximo is not None:
+            espera = min(espera, max(proximo - time.monotonic(), 0))
+
+        listos_lectura, listos_escritura, _ = select.select([sock], escritura, [], espera)
+
+        # Se recibe y procesa el lote -> las vistas apuntan a los buffers del anillo (sin copiar)
+        ahora = time.monotonic()
+        lote = recibir_lote(sock, vistas) if listos_lectura else []
+
+        if lote:
+            metricas.registrar("lote", len(lote))
+
+        # Con canal -> el lote pasa por el filtro y se procesan los datagramas que ya salieron de él
+        if filtro is not None:
+            for datos, direccion_cliente in lote:
+                entrada_canal(filtro, datos, direccion_cliente, ahora)
+            lote = filtro.listos(ahora)
+
+        for datos, direccion_cliente in lote:
+            sesion = sesiones.obtener(direccion_cliente, ahora)
+            respuesta = procesar_paquete(datos, direccion_cliente, sesion)
+
+            if respuesta is not None:
+                pendientes.append((respuesta, direccion_cliente))
+
+        # ACK acumulados cuyo plazo venció -> salen junto con las respuestas del lote
+        pendientes.extend(acks_vencidos(time.monotonic()))
+
+        # Se envían juntas todas las respuestas del lote
+        enviar_lote(sock, pendientes)
+
+        # Cada tanto se eliminan las sesiones de clientes inactivos -> la memoria queda acotada
+        if ahora >= proxima_limpieza:
+            eliminadas = sesiones.expirar(ahora)
+            if eliminadas:
+                metricas.sumar("sesiones_expiradas", eliminadas)
+            proxima_limpieza = ahora + INTERVALO_LIMPIEZA
+
+        # Cada INTERVALO_METRICAS segundos se muestran los contadores
+        if INTERVALO_METRICAS and ahora >= proxima_metricas:
+            registrar_metricas()
+            proxima_metricas = ahora + INTERVALO_METRICAS
 
 
 # Punto de entrada del programa -> permite usar el script directamente o importarlo como módulo
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+SERVIDOR ASYNCIO:
+- Misma lógica de protocolo que server.py (procesar_paquete), pero sobre asyncio.DatagramProtocol
+- Cada cliente (IP, puerto) tiene su propia sesión -> muchos clientes a la vez sin mezclar sus secuencias
+- Las sesiones inactivas se eliminan periódicamente y su cantidad está acotada (memoria acotada)
+- El envío de respuestas no bloquea -> el transporte las encola si el socket está ocupado
+- Errores simulados -> cada datagrama pasa por el canal con fallas del servidor (server.crear_canal()); los demorados se procesan con call_later
+- ACK acumulados demorados (clientes con FLAG_SACK) -> un temporizador (call_later) los envía cuando vence el primero
+"""
+
+import asyncio
+import time
+
+import perfilado
+import registro
+import server
+from sesiones import MAX_SESIONES, SESION_TTL, TablaSesiones
+
+
+class ProtocoloServidor(asyncio.DatagramProtocol):
+    """
+    Protocolo UDP del servidor -> asyncio llama a datagram_received() por cada datagrama que llega
+        - sesiones -> tabla de sesiones por direccion_cliente
+        - canal -> canal con fallas (canal.Canal) o None si no se simulan errores
+    """
+
+    def __init__(self, sesiones, canal=None):
+        self.sesiones = sesiones
+        self.canal = canal
+        self.transport = None
+        self.temporizador_ack = None # asyncio.TimerHandle del próximo ACK demorado (None si no hay ninguno programado)
+
+    def connection_made(self, transport):
+        # El socket ya está creado y asociado al puerto -> se guarda el transporte para responder
+        self.transport = transport
+
+    def datagram_received(self, datos, direccion_cliente):
+        if self.canal is None:
+            self.procesar(datos, direccion_cliente)
+            return
+
+        # El datagrama pasa por el canal -> puede perderse, corromperse, duplicarse o llegar más tarde
+        loop = asyncio.get_running_loop()
+        for retardo, salida in self.canal.aplicar(datos):
+            if retardo <= 0:
+                self.procesar(salida, direccion_cliente)
+            else:
+                loop.call_later(retardo, self.procesar, salida, direccion_cliente)
+
+    def procesar(self, datos, direccion_cliente):
+        # Se busca (o crea) la sesión del cliente -> cada cliente tiene su propia secuencia esperada
+        sesion = self.sesiones.obtener(direccion_cliente)
+
+        # Se procesa el paquete con la misma lógica que el servidor bloqueante
+        respuesta = server.procesar_paquete(datos, direccion_cliente, sesion)
+
+        if respuesta is not None:
+            # sendto() del transporte no bloquea -> si el socket no puede enviar, asyncio lo encola
+            self.transport.sendto(respuesta, direccion_cliente)
+
+        # El paquete pudo dejar un ACK acumulado demorado -> se programa el envío si no había ninguno programado
+        if self.temporizador_ack is None and server.acks_diferidos:
+            self.programar_acks()
+
+    def programar_acks(self):
+        # Un solo temporizador para todos los clientes -> vence con el primer ACK demorado
+        espera = max(server.proximo_ack() - time.monotonic(), 0)
+        self.temporizador_ack = asyncio.get_running_loop().call_later(espera, self.enviar_acks)
+
+    def enviar_acks(self):
+        self.temporizador_ack = None
+
+        for respuesta, direccion_cliente in server.acks_vencidos(time.monotonic()):
+            self.transport.sendto(respuesta, direccion_cliente)
+
+        if server.acks_diferidos:
+            self.programar_acks()
+
+    def error_received(self, exc):
+        # Errores del socket (por ej. ICMP "puerto inalcanzable" de un cliente que ya cerró) -> no detienen el servidor
+        server.metricas.sumar("errores_socket")
+        server.log.warning("Error de socket: %s", exc)
+
+
+async def limpiar_sesiones(sesiones, intervalo):
+    """
+    Tarea periódica -> elimina las sesiones de clientes inactivos cada 'intervalo' segundos
+    """
+
+    while True:
+        await asyncio.sleep(intervalo)
+        eliminadas = sesiones.expirar()
+
+        if eliminadas:
+            server.metricas.sumar("sesiones_expiradas", eliminadas)
+            server.log.info("Sesiones inactivas eliminadas: %d (activas: %d)", eliminadas, len(sesiones))
+
+
+async def mostrar_metricas(intervalo):
+    """
+    Tarea periódica -> muestra los contadores del servidor cada 'intervalo' segundos
+    """
+
+    while True:
+        await asyncio.sleep(intervalo)
+        server.registrar_metricas()
+
+
+async def servir(host=server.HOST, port=server.PORT, ttl=SESION_TTL, max_sesiones=MAX_SESIONES):
+    """
+    Inicia el servidor asyncio y atiende clientes hasta que se cancele la tarea
+
+    - Parámetros:
+        - host, port -> dirección de escucha
+        - ttl (float) -> segundos sin actividad antes de eliminar una sesión
+        - max_sesiones (int) -> cantidad máxima de sesiones simultáneas
+    """
+
+    loop = asyncio.get_running_loop()
+    sesiones = TablaSesiones(server.TAMANO_VENTANA, ttl, max_sesiones, server.eliminar_sesion)
+
+    # Se crea el socket UDP asociado al puerto -> asyncio lo registra en el bucle de eventos
+    transport, protocolo = await loop.create_datagram_endpoint(
+        lambda: ProtocoloServidor(sesiones, server.crear_canal()),
+        local_addr=(host, port),
+    )
+
+    tareas = [asyncio.create_task(limpiar_sesiones(sesiones, server.INTERVALO_LIMPIEZA))]
+
+    if server.INTERVALO_METRICAS:
+        tareas.append(asyncio.create_task(mostrar_metricas(server.INTERVALO_METRICAS)))
+
+    try:
+        # El servidor atiende clientes desde los callbacks -> acá solo se espera indefinidamente
+        await asyncio.Future()
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
+        transport.close()
+
+
+def main():
+    """
+    Función principal del servidor asyncio
+    """
+
+    registro.configurar(server.NIVEL_LOG)
+
+    server.log.info("Iniciando servidor asyncio en %s:%d", server.HOST, server.PORT)
+    server.log.info("Probabilidad de error: %s%%", server.PROBABILIDAD_DE_ERROR * 100)
+    server.log.info("Tamaño de ventana: %d", server.TAMANO_VENTANA)
+    server.log.info("Sesiones: máximo %d, expiran tras %ss sin actividad", MAX_SESIONES, SESION_TTL)
+
+    # Consulta de métricas por UDP (hilo aparte) y perfilado bajo demanda, igual que en server.py
+    perfilado.instalar_senales()
+    server.iniciar_metricas()
+
+    server.log.info("Esperando mensajes...")
+
+    try:
+        asyncio.run(servir(server.HOST, server.PORT))
+    except KeyboardInterrupt:
+        server.log.info("Servidor detenido")
+
+
+# Punto de entrada del programa -> permite usar el script directamente o importarlo como módulo
+if __name__ == "__main__":
+    main()
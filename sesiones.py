@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO SESIONES (estado por cliente del servidor):
+- Cada cliente (IP, puerto) tiene su propia ventana de recepción -> dos clientes ya no se pisan los números de secuencia
+- Las sesiones sin actividad durante SESION_TTL segundos se eliminan
+- Como máximo se guardan MAX_SESIONES -> si se llena, se elimina la sesión usada hace más tiempo (LRU)
+- Caché de respuestas -> la última respuesta a cada (cliente, secuencia), para repetirla ante un duplicado sin volver
+  a calcular el CRC; como máximo MAX_RESPUESTAS entradas (LRU)
+    -> al eliminar la sesión de un cliente se borran también sus respuestas (TablaSesiones(al_eliminar=...))
+"""
+
+import time
+from collections import OrderedDict
+
+from ventana import VentanaRecepcion
+
+
+# ===================== CONFIGURACIÓN =====================
+SESION_TTL = 60.0 # Segundos sin actividad antes de eliminar la sesión de un cliente
+MAX_SESIONES = 10000 # Cantidad máxima de clientes con sesión al mismo tiempo (memoria acotada)
+MAX_RESPUESTAS = 4096 # Respuestas guardadas para repetir ante duplicados (~150 bytes cada una) -> 0 desactiva la caché
+# ==========================================================
+
+
+class Sesion:
+    """
+    Estado del servidor para un cliente
+        - ventana -> ventana de recepción (secuencia esperada + mensajes fuera de orden)
+        - ultimo_uso -> momento (time.monotonic) del último paquete recibido
+        - reensamblador -> mensajes fragmentados a medio armar (se crea con el primer fragmento)
+        - sin_confirmar -> paquetes aceptados desde el último ACK acumulado enviado (modo SACK)
+        - vencimiento_ack -> momento en que se debe enviar el ACK acumulado demorado (None si no hay ninguno pendiente)
+    """
+
+    __slots__ = ("ventana", "ultimo_uso", "reensamblador", "sin_confirmar", "vencimiento_ack")
+
+    def __init__(self, tamano_ventana, ahora):
+        self.ventana = VentanaRecepcion(tamano_ventana)
+        self.ultimo_uso = ahora
+        self.reensamblador = None
+        self.sin_confirmar = 0
+        self.vencimiento_ack = None
+
+    def cerrar(self):
+        """Libera lo que la sesión tenga abierto (mensajes fragmentados a medio armar)"""
+
+        if self.reensamblador is not None:
+            self.reensamblador.descartar_todo()
+
+
+class TablaSesiones:
+    """
+    Tabla de sesiones indexada por direccion_cliente (IP, puerto)
+        - El OrderedDict se mantiene ordenado por último uso -> la primera sesión es siempre la más vieja
+        - Tanto la búsqueda como la eliminación por TTL o por capacidad son O(1) por sesión
+        - al_eliminar -> función (direccion_cliente) que se llama por cada sesión eliminada (por ej. para borrar las
+          respuestas guardadas de ese cliente), o None
+    """
+
+    def __init__(self, tamano_ventana=1, ttl=SESION_TTL, max_sesiones=MAX_SESIONES, al_eliminar=None):
+        self.tamano_ventana = tamano_ventana
+        self.ttl = ttl
+        self.max_sesiones = max_sesiones
+        self.al_eliminar = al_eliminar
+        self.sesiones = OrderedDict()
+        self.eliminadas = 0 # Contador de sesiones eliminadas (por TTL o por capacidad)
+
+    def __len__(self):
+        return len(self.sesiones)
+
+    def obtener(self, direccion_cliente, ahora=None):
+        """
+        Devuelve la sesión del cliente, creándola si no existe
+
+        - Parámetros:
+            - direccion_cliente -> tupla (IP, puerto)
+            - ahora (float) -> time.monotonic(); se puede pasar para no llamarlo dos veces
+        - Return -> Sesion
+        """
+
+        if ahora is None:
+            ahora = time.monotonic()
+
+        sesion = self.sesiones.get(direccion_cliente)
+
+        if sesion is None:
+            # Cliente nuevo -> si la tabla está llena se elimina la sesión usada hace más tiempo
+            if len(self.sesiones) >= self.max_sesiones:
+                direccion_vieja, sesion_vieja = self.sesiones.popitem(last=False)
+                self._eliminar(direccion_vieja, sesion_vieja)
+                self.eliminadas += 1
+
+            sesion = Sesion(self.tamano_ventana, ahora)
+            self.sesiones[direccion_cliente] = sesion
+        else:
+            # Cliente conocido -> pasa al final (es la sesión usada más recientemente)
+            self.sesiones.move_to_end(direccion_cliente)
+            sesion.ultimo_uso = ahora
+
+        return sesion
+
+    def expirar(self, ahora=None):
+        """
+        Elimina las sesiones sin actividad durante más de ttl segundos
+
+        - Parámetro -> ahora (float): time.monotonic()
+        - Return -> int: cantidad de sesiones eliminadas
+        """
+
+        if ahora is None:
+            ahora = time.monotonic()
+
+        limite = ahora - self.ttl
+        eliminadas = 0
+
+        # Las sesiones más viejas están al principio -> se corta en la primera que sigue activa
+        while self.sesiones:
+            direccion_cliente, sesion = next(iter(self.sesiones.items()))
+            if sesion.ultimo_uso > limite:
+                break
+
+            del self.sesiones[direccion_cliente]
+            self._eliminar(direccion_cliente, sesion)
+            eliminadas += 1
+
+        self.eliminadas += eliminadas
+        return eliminadas
+
+    def _eliminar(self, direccion_cliente, sesion):
+        """Libera una sesión ya sacada de la tabla y avisa a al_eliminar"""
+
+        sesion.cerrar()
+
+        if self.al_eliminar is not None:
+            self.al_eliminar(direccion_cliente)
+
+
+class CacheRespuestas:
+    """
+    Últimas respuestas enviadas, indexadas por (direccion_cliente, secuencia)
+        - Cada entrada guarda también el CRC del paquete respondido -> un duplicado solo se reconoce si trae el mismo
+          CRC (misma secuencia y mismo CRC = la retransmisión del mismo paquete)
+        - OrderedDict ordenado por uso -> si se llena, se descarta la respuesta usada hace más tiempo (LRU)
+        - aciertos / desalojos -> respuestas repetidas desde la caché / entradas descartadas por falta de lugar
+        - por_cliente -> direccion_cliente -> secuencias guardadas de ese cliente (para descartar() sin recorrer todo)
+    """
+
+    def __init__(self, maximo=MAX_RESPUESTAS):
+        self.maximo = maximo
+        self.respuestas = OrderedDict()
+        self.por_cliente = {}
+        self.aciertos = 0
+        self.desalojos = 0
+
+    def __len__(self):
+        return len(self.respuestas)
+
+    def obtener(self, direccion_cliente, secuencia, crc):
+        """
+        Busca la respuesta guardada de un paquete
+
+        - Parámetros:
+            - direccion_cliente -> tupla (IP, puerto)
+            - secuencia (int), crc (int) -> secuencia y CRC recibido del paquete
+        - Return -> bytes con la respuesta guardada, o None si no está (o es de otro paquete con la misma secuencia)
+        """
+
+        clave = (direccion_cliente, secuencia)
+        entrada = self.respuestas.get(clave)
+
+        if entrada is None or entrada[0] != crc:
+            return None
+
+        self.respuestas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[1]
+
+    def guardar(self, direccion_cliente, secuencia, crc, respuesta):
+        """
+        Guarda (o reemplaza) la respuesta de un paquete
+
+        - Return -> bool: True si se tuvo que descartar otra respuesta para hacer lugar
+        """
+
+        if self.maximo <= 0:
+            return False
+
+        clave = (direccion_cliente, secuencia)
+        self.respuestas[clave] = (crc, respuesta)
+        self.respuestas.move_to_end(clave)
+        self.por_cliente.setdefault(direccion_cliente, set()).add(secuencia)
+
+        if len(self.respuestas) > self.maximo:
+            (direccion_vieja, secuencia_vieja), entrada = self.respuestas.popitem(last=False)
+            secuencias = self.por_cliente[direccion_vieja]
+            secuencias.discard(secuencia_vieja)
+            if not secuencias:
+                del self.por_cliente[direccion_vieja]
+
+            self.desalojos += 1
+            return True
+
+        return False
+
+    def descartar(self, direccion_cliente):
+        """
+        Borra todas las respuestas guardadas de un cliente (por ej. al eliminar su sesión)
+
+        - Parámetro -> direccion_cliente: tupla (IP, puerto)
+        - Return -> int: cantidad de respuestas borradas
+        """
+
+        secuencias = self.por_cliente.pop(direccion_cliente, ())
+
+        for secuencia in secuencias:
+            del self.respuestas[(direccion_cliente, secuencia)]
+
+        return len(secuencias)
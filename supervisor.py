@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+SUPERVISOR (servidor en varios procesos -> usa todos los núcleos):
+- Inicia N procesos trabajadores; cada uno ejecuta el servidor de server.py sobre su PROPIO socket
+- Todos los sockets se asocian al mismo HOST:PORT con SO_REUSEPORT -> el kernel reparte los datagramas según
+  (IP, puerto) de origen y destino: un cliente siempre llega al mismo trabajador
+    -> la sesión de cada cliente (ventana, reensamblado) vive en un solo proceso, sin compartir memoria ni locks
+- Si un trabajador termina (por un error), el supervisor lo reinicia
+- Métricas -> cada trabajador responde en PORT_METRICAS_TRABAJADORES + índice; el supervisor las suma y las
+  responde en server.PORT_METRICAS (python metricas.py muestra el total y los paquetes de cada trabajador)
+    -> la última instantánea de cada trabajador se guarda: si termina, lo que contó hasta esa consulta sigue sumado
+       al total (un hilo aparte las renueva cada INTERVALO_SUPERVISION: los trabajadores que no responden no demoran
+       los reinicios del bucle principal)
+- Perfilado -> SIGUSR1 / SIGUSR2 al supervisor y los comandos de perfilado.py a su puerto de métricas se reenvían a
+  todos los trabajadores (cada uno escribe su propia captura, con su pid en el nombre)
+- Requiere SO_REUSEPORT (Linux, BSD)
+
+Uso:
+    python supervisor.py --trabajadores 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import perfilado
+import registro
+import server
+from metricas import HOST_METRICAS, Metricas, consultar, servir_consultas
+
+
+# ===================== CONFIGURACIÓN =====================
+CANTIDAD_TRABAJADORES = os.cpu_count() or 1 # Un trabajador por núcleo
+PORT_METRICAS_TRABAJADORES = 5100 # El trabajador i responde sus métricas en este puerto + i
+INTERVALO_SUPERVISION = 0.5 # (segundos) Cada cuánto se revisa si algún trabajador terminó
+ESPERA_REINICIO = 1.0 # (segundos) Tiempo mínimo entre reinicios de un mismo trabajador (si falla al arrancar, no se reinicia en un bucle sin pausa)
+TIMEOUT_METRICAS_TRABAJADOR = 0.2 # (segundos) Espera máxima de las métricas de cada trabajador
+# ==========================================================
+
+log = registro.obtener("Supervisor")
+
+# fork -> los trabajadores heredan la configuración de server.py ya modificada (por ej. por benchmark.py)
+_contexto = multiprocessing.get_context("fork")
+
+
+def trabajador(indice):
+    """
+    Proceso trabajador -> servidor de server.py con SO_REUSEPORT (no termina)
+
+    - Parámetro -> indice (int): número de trabajador (0 - N-1)
+    """
+
+    # Ctrl+C llega a todo el grupo de procesos -> solo el supervisor lo atiende y detiene a los trabajadores
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    # Cada trabajador tiene su logger, sus métricas y su puerto de métricas; el resumen periódico lo muestra el supervisor
+    server.log = registro.obtener(f"Servidor {indice}")
+    server.metricas = Metricas(f"trabajador {indice}")
+    server.INTERVALO_METRICAS = 0
+
+    if server.PORT_METRICAS is not None:
+        server.PORT_METRICAS = PORT_METRICAS_TRABAJADORES + indice
+
+    # Errores simulados distintos (pero repetibles) en cada trabajador
+    if server.SEMILLA_CANAL is not None:
+        server.SEMILLA_CANAL += indice
+
+    registro.configurar(server.NIVEL_LOG)
+    perfilado.instalar_senales()
+    sock = server.crear_socket(reutilizar_puerto=True)
+    server.iniciar_metricas()
+    server.atender_clientes(sock)
+
+
+class Supervisor:
+    """
+    Inicia, vigila y detiene a los trabajadores
+        - procesos -> lista de multiprocessing.Process (uno por índice)
+        - reinicios -> cantidad de trabajadores reiniciados
+        - instantanea() / crudo() -> métricas de todos los trabajadores sumadas (se pueden servir con servir_consultas())
+        - ultimas -> (pid, crudo) de la última consulta a cada trabajador; si no responde se usa esa
+        - terminados -> métricas sumadas de los trabajadores que terminaron (su última instantánea)
+          -> al reiniciar un trabajador sus contadores no desaparecen del total
+        - lock -> combinar() corre en los hilos de métricas y de renovar() y vigilar() en el principal
+        - detenido -> threading.Event que detiene el hilo de renovar() (lo activa detener())
+    """
+
+    def __init__(self, cantidad):
+        self.cantidad = cantidad
+        self.procesos = [None] * cantidad
+        self.inicios = [0.0] * cantidad
+        self.reinicios = 0
+        self.inicio = time.monotonic()
+        self.ultimas = [None] * cantidad
+        self.terminados = Metricas("terminados")
+        self.lock = threading.Lock()
+        self.detenido = threading.Event()
+
+    def iniciar(self, indice):
+        """Inicia (o reinicia) el trabajador indice"""
+
+        proceso = _contexto.Process(target=trabajador, args=(indice,), name=f"trabajador-{indice}", daemon=True)
+        proceso.start()
+        self.procesos[indice] = proceso
+        self.inicios[indice] = time.monotonic()
+
+    def iniciar_todos(self):
+        for indice in range(self.cantidad):
+            self.iniciar(indice)
+
+    def vigilar(self):
+        """Reinicia los trabajadores que terminaron (respetando ESPERA_REINICIO)"""
+
+        ahora = time.monotonic()
+
+        for indice, proceso in enumerate(self.procesos):
+            if proceso.is_alive() or ahora - self.inicios[indice] < ESPERA_REINICIO:
+                continue
+
+            log.warning("Trabajador %d (pid %d) terminó con código %s - reiniciando", indice, proceso.pid, proceso.exitcode)
+            proceso.join()
+
+            # Lo que contó el trabajador (hasta su última consulta) pasa a los terminados -> sigue en el total
+            with self.lock:
+                ultima = self.ultimas[indice]
+                if ultima is not None and ultima[0] == proceso.pid:
+                    self.terminados.combinar(ultima[1])
+
+                self.ultimas[indice] = None
+                self.reinicios += 1
+                self.iniciar(indice)
+
+    def detener(self):
+        """Termina todos los trabajadores y espera a que salgan (también detiene el hilo de renovar())"""
+
+        self.detenido.set()
+
+        for proceso in self.procesos:
+            if proceso is not None and proceso.is_alive():
+                proceso.terminate()
+
+        for proceso in self.procesos:
+            if proceso is not None:
+                proceso.join()
+
+    def combinar(self):
+        """
+        Consulta las métricas de cada trabajador y las suma
+
+        - Return -> tuple(Metricas con el total, lista con el estado de cada trabajador)
+        """
+
+        total = Metricas("servidor")
+        total.inicio = self.inicio
+        trabajadores = []
+
+        with self.lock:
+            total.combinar(self.terminados.crudo())
+
+        for indice, proceso in enumerate(self.procesos):
+            estado = {"trabajador": indice, "pid": proceso.pid, "vivo": proceso.is_alive()}
+
+            try:
+                crudo = consultar(HOST_METRICAS, PORT_METRICAS_TRABAJADORES + indice, TIMEOUT_METRICAS_TRABAJADOR, crudo=True)
+            except (socket.timeout, OSError):
+                # Sin respuesta (por ej. terminó y todavía no se reinició) -> cuenta su última instantánea
+                estado["sin_respuesta"] = True
+
+                with self.lock:
+                    ultima = self.ultimas[indice]
+                    crudo = ultima[1] if ultima is not None and ultima[0] == proceso.pid else None
+            else:
+                # Solo si sigue siendo el mismo proceso (vigilar() pudo haberlo reiniciado durante la consulta)
+                with self.lock:
+                    if self.procesos[indice] is proceso:
+                        self.ultimas[indice] = (proceso.pid, crudo)
+
+            if crudo is not None:
+                total.combinar(crudo)
+                estado["paquetes"] = crudo["contadores"].get("paquetes", 0)
+
+            trabajadores.append(estado)
+
+        return total, trabajadores
+
+    def renovar(self, intervalo_resumen=0):
+        """
+        Inicia el hilo que renueva cada INTERVALO_SUPERVISION la última instantánea de cada trabajador
+            - Fuera del bucle de vigilar() -> cada trabajador colgado o terminado demora la consulta hasta
+              TIMEOUT_METRICAS_TRABAJADOR, y eso no debe retrasar su reinicio
+            - Cada intervalo_resumen segundos (0 = nunca) muestra una línea con las métricas sumadas
+
+        - Return -> threading.Thread
+        """
+
+        def renovar_siempre():
+            proximo_resumen = time.monotonic() + intervalo_resumen
+
+            while not self.detenido.wait(INTERVALO_SUPERVISION):
+                # Un error inesperado se registra y el hilo sigue (sin él las instantáneas dejarían de renovarse)
+                try:
+                    total, trabajadores = self.combinar()
+                except OSError as error:
+                    log.warning("No se pudieron renovar las métricas de los trabajadores (%s)", error)
+                    continue
+
+                if intervalo_resumen and time.monotonic() >= proximo_resumen:
+                    log.info("Métricas (%d trabajadores): %s", self.cantidad, total.resumen())
+                    proximo_resumen = time.monotonic() + intervalo_resumen
+
+        hilo = threading.Thread(target=renovar_siempre, name="renovar-metricas", daemon=True)
+        hilo.start()
+        return hilo
+
+    def reenviar_senal(self, numero):
+        """Reenvía una señal (por ej. SIGUSR1 de perfilado) a todos los trabajadores vivos"""
+
+        for proceso in self.procesos:
+            if proceso is not None and proceso.is_alive():
+                os.kill(proceso.pid, numero)
+
+    def comando(self, datos):
+        """
+        Reenvía un comando de perfilado.py a cada trabajador (ver metricas.servir_consultas)
+
+        - Return -> dict con la respuesta de cada trabajador, o None si no es un comando (es una consulta de métricas)
+        """
+
+        comando = datos.decode("ascii", errors="replace").strip()
+
+        if comando not in perfilado.COMANDOS:
+            return None
+
+        trabajadores = []
+
+        for indice, proceso in enumerate(self.procesos):
+            estado = {"trabajador": indice, "pid": proceso.pid}
+
+            try:
+                estado.update(perfilado.enviar_comando(comando, HOST_METRICAS, PORT_METRICAS_TRABAJADORES + indice, perfilado.TIMEOUT_PEDIDO + TIMEOUT_METRICAS_TRABAJADOR))
+            except (socket.timeout, OSError):
+                estado["sin_respuesta"] = True
+
+            trabajadores.append(estado)
+
+        return {"trabajadores": trabajadores}
+
+    def instantanea(self):
+        """Return -> dict: instantánea de las métricas sumadas + estado de cada trabajador y reinicios"""
+
+        total, trabajadores = self.combinar()
+        instantanea = total.instantanea()
+        instantanea["trabajadores"] = trabajadores
+        instantanea["reinicios"] = self.reinicios
+        return instantanea
+
+    def crudo(self):
+        """Return -> dict: métricas sumadas con las cubetas de los histogramas"""
+
+        total, trabajadores = self.combinar()
+        return total.crudo()
+
+
+def supervisar(cantidad=CANTIDAD_TRABAJADORES):
+    """
+    Inicia 'cantidad' trabajadores y los vigila hasta recibir Ctrl+C o SIGTERM
+
+    - Parámetro -> cantidad (int): cantidad de procesos trabajadores
+    """
+
+    registro.configurar(server.NIVEL_LOG)
+
+    # SIGTERM (por ej. kill o benchmark.py) -> se detiene igual que con Ctrl+C, terminando a los trabajadores
+    signal.signal(signal.SIGTERM, lambda numero, marco: sys.exit(0))
+
+    log.info("Iniciando %d trabajadores en %s:%d (SO_REUSEPORT)", cantidad, server.HOST, server.PORT)
+
+    supervisor = Supervisor(cantidad)
+    supervisor.iniciar_todos()
+
+    # Perfilado bajo demanda -> las señales se reenvían a los trabajadores (que son los que atienden los paquetes)
+    for numero in (perfilado.SENAL_PERFIL, perfilado.SENAL_MEMORIA):
+        if numero is not None:
+            signal.signal(numero, lambda numero, marco: supervisor.reenviar_senal(numero))
+
+    # Métricas de todos los trabajadores en el puerto de métricas del servidor
+    if server.PORT_METRICAS is not None:
+        try:
+            servir_consultas(supervisor, HOST_METRICAS, server.PORT_METRICAS, supervisor.comando)
+            log.info("Métricas de todos los trabajadores en %s:%d", HOST_METRICAS, server.PORT_METRICAS)
+        except OSError as error:
+            log.warning("No se pudo abrir el puerto de métricas %d (%s)", server.PORT_METRICAS, error)
+
+        # Instantáneas de los trabajadores (requiere sus puertos de métricas) -> si uno termina, se pierde a lo sumo lo
+        # que contó en el último INTERVALO_SUPERVISION; el resumen periódico también sale de ese hilo
+        supervisor.renovar(server.INTERVALO_METRICAS)
+
+    try:
+        while True:
+            time.sleep(INTERVALO_SUPERVISION)
+            supervisor.vigilar()
+    except KeyboardInterrupt:
+        log.info("Supervisor detenido")
+    finally:
+        supervisor.detener()
+
+
+def main(argv=None):
+    """Punto de entrada -> python supervisor.py --trabajadores N"""
+
+    parser = argparse.ArgumentParser(description="Servidor UDP con CRC en varios procesos (SO_REUSEPORT)")
+    parser.add_argument("--trabajadores", type=int, default=CANTIDAD_TRABAJADORES, help="cantidad de procesos trabajadores")
+    argumentos = parser.parse_args(argv)
+
+    supervisar(argumentos.trabajadores)
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
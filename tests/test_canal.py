@@ -0,0 +1,41 @@
+"""
+Pruebas del canal con fallas -> con solo_payload los errores nunca tocan la cabecera (cada error es un NACK)
+"""
+
+import protocolo
+from canal import Canal
+
+
+def test_solo_payload_binario():
+    canal = Canal(semilla=1, probabilidad_paquete=1.0, error_bit=0.01, solo_payload=True)
+    paquete = protocolo.construir_paquete(7, bytes(200))
+
+    for i in range(200):
+        corrupto = canal.corromper(paquete)
+
+        # Cabecera intacta -> el paquete se sigue leyendo y el error lo detecta el CRC
+        assert corrupto[:protocolo.TAMANO_CABECERA] == paquete[:protocolo.TAMANO_CABECERA]
+        assert corrupto != paquete
+        leido = protocolo.leer_paquete(corrupto)
+        assert protocolo.calcular_crc(corrupto[:protocolo.FIN_CABECERA_CRC], leido.payload) != leido.crc_recibido
+
+
+def test_solo_payload_texto():
+    canal = Canal(semilla=2, probabilidad_paquete=1.0, solo_payload=True)
+    paquete = protocolo.construir_paquete_texto(1, "hola mundo")
+    secuencia, mensaje, crc = paquete.split(b"|")
+
+    for i in range(200):
+        corrupto = bytes(canal.corromper(paquete))
+
+        assert corrupto.startswith(secuencia + b"|")
+        assert corrupto.endswith(b"|" + crc)
+        assert corrupto != paquete
+
+
+def test_datagrama_completo_por_defecto():
+    # Sin solo_payload cualquier byte puede corromperse, también la cabecera
+    canal = Canal(semilla=3, error_byte=0.5)
+    paquete = protocolo.construir_paquete(7, bytes(20))
+
+    assert any(canal.corromper(paquete)[:protocolo.TAMANO_CABECERA] != paquete[:protocolo.TAMANO_CABECERA] for i in range(50))
@@ -0,0 +1,170 @@
+"""
+Pruebas del cliente contra un servidor en un hilo (loopback) -> la ventana de --ventana se usa en todos los envíos;
+el modo masivo fragmenta los mensajes grandes y cuenta como fallidos los que nunca se enviaron
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+import client
+import perfilado
+import protocolo
+import server
+from metricas import Metricas
+from reensamblado import Reensamblador
+from sesiones import CacheRespuestas, TablaSesiones
+
+
+@pytest.fixture
+def servidor(monkeypatch, tmp_path):
+    """
+    Servidor con ventana 4 en un puerto libre de 127.0.0.1, atendido por un hilo con la lógica de server.py
+        - Return -> (port, lista de mensajes entregados en orden; los fragmentados, ya reensamblados)
+    """
+
+    monkeypatch.setattr(server, "metricas", Metricas("prueba"))
+    monkeypatch.setattr(server, "respuestas", CacheRespuestas())
+    monkeypatch.setattr(server, "acks_diferidos", {})
+
+    entregados = []
+    reensamblador = Reensamblador("prueba", str(tmp_path))
+
+    def entregar(sesion, direccion, flags, mensaje):
+        if not flags & protocolo.FLAG_FRAGMENTO:
+            entregados.append(bytes(mensaje))
+            return
+
+        estado, resultado = reensamblador.agregar(protocolo.leer_fragmento(mensaje), flags & protocolo.FLAG_COMPRIMIDO)
+        if estado == Reensamblador.COMPLETO:
+            # Mensaje grande -> el reensamblador lo escribió en un archivo
+            if isinstance(resultado, str):
+                with open(resultado, "rb") as archivo:
+                    resultado = archivo.read()
+            entregados.append(resultado)
+
+    monkeypatch.setattr(server, "entregar_mensaje", entregar)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.002)
+    sesiones = TablaSesiones(4)
+    terminar = threading.Event()
+
+    def atender():
+        while not terminar.is_set():
+            try:
+                datos, direccion = sock.recvfrom(2048)
+            except socket.timeout:
+                pass
+            else:
+                respuesta = server.procesar_paquete(datos, direccion, sesiones.obtener(direccion))
+                if respuesta is not None:
+                    sock.sendto(respuesta, direccion)
+
+            for respuesta, direccion in server.acks_vencidos(time.monotonic()):
+                sock.sendto(respuesta, direccion)
+
+    hilo = threading.Thread(target=atender, daemon=True)
+    hilo.start()
+
+    yield sock.getsockname()[1], entregados
+
+    terminar.set()
+    hilo.join()
+    sock.close()
+
+
+@pytest.fixture
+def configuracion(monkeypatch):
+    # main() cambia la configuración del módulo con las opciones -> se restaura al terminar cada prueba
+    for nombre in ("HOST_SERVIDOR", "PORT_SERVIDOR", "MAX_TIEMPO_DE_ESPERA", "MAX_INTENTOS", "TAMANO_VENTANA", "FORMATO",
+                   "ACK_SELECTIVO", "CONTROL_CONGESTION", "COMPRIMIR_DESDE", "NIVEL_COMPRESION"):
+        monkeypatch.setattr(client, nombre, getattr(client, nombre))
+
+    monkeypatch.setattr(perfilado, "instalar_senales", lambda: False)
+
+
+def test_interactivo_con_ventana(servidor, configuracion, monkeypatch):
+    port, entregados = servidor
+
+    # Más mensajes que el espacio de secuencia de la ventana 1 (0 - 1), en dos tandas
+    mensajes = [f"mensaje {i}" for i in range(10)]
+    lineas = iter(mensajes[:6] + [""] + mensajes[6:] + ["", ""])
+    monkeypatch.setattr("builtins.input", lambda texto="": next(lineas))
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+    client.main(["--port", str(port), "--ventana", "4", "--nivel", "WARNING"])
+
+    assert entregados == [mensaje.encode() for mensaje in mensajes]
+
+
+def test_valor_por_defecto_al_llamar(servidor, configuracion, monkeypatch):
+    port, entregados = servidor
+
+    # La ventana se lee al llamar (no al definir la función) -> vale el valor actual de TAMANO_VENTANA
+    monkeypatch.setattr(client, "TAMANO_VENTANA", 4)
+    mensajes = [b"x%d" % i for i in range(20)]
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        assert client.enviar_mensajes_ventana(sock, ("127.0.0.1", port), 0, mensajes) == len(mensajes)
+
+    assert entregados == mensajes
+
+
+def test_masivo_fragmenta_los_mensajes_grandes(servidor, configuracion, monkeypatch, tmp_path):
+    port, entregados = servidor
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+    # Líneas que no entran en un paquete entre líneas chicas; una de más de 64 KB no entra ni en el campo longitud
+    lineas = ["uno", "a" * 3000, "dos", "tres", "".join(f"{i:06d}" for i in range(12000)), "cuatro"]
+    entrada = tmp_path / "mensajes.txt"
+    entrada.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+
+    argumentos = client.parsear_argumentos(["--entrada", str(entrada)])
+    client.TAMANO_VENTANA = 4
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        estadisticas = client.enviar_masivo(sock, ("127.0.0.1", port), argumentos)
+
+    assert entregados == [linea.encode() for linea in lineas]
+    assert (estadisticas.mensajes, estadisticas.entregados, estadisticas.fallidos) == (6, 6, 0)
+
+
+def test_masivo_texto_rechaza_los_mensajes_grandes(servidor, configuracion, monkeypatch):
+    port, entregados = servidor
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+    # Sin fragmentación en formato texto -> el mensaje grande se cuenta como fallido y los demás se entregan
+    client.FORMATO = protocolo.FORMATO_TEXTO
+    client.TAMANO_VENTANA = 4
+    argumentos = client.parsear_argumentos(["--sinteticos", "3", "--tamano", "3000"])
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        estadisticas = client.enviar_masivo(sock, ("127.0.0.1", port), argumentos)
+
+    assert entregados == []
+    assert (estadisticas.mensajes, estadisticas.sin_enviar, estadisticas.fallidos) == (0, 3, 3)
+
+
+def test_masivo_abandonado_cuenta_los_no_enviados(configuracion, monkeypatch):
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+    # Nadie escucha en el puerto -> se abandona con la primera ventana en vuelo; el resto nunca se envía
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as libre:
+        libre.bind(("127.0.0.1", 0))
+        port = libre.getsockname()[1]
+
+    client.TAMANO_VENTANA = 4
+    client.MAX_INTENTOS = 1
+    client.MAX_TIEMPO_DE_ESPERA = 0.01
+    client.CONTROL_CONGESTION = False
+    argumentos = client.parsear_argumentos(["--sinteticos", "10"])
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        estadisticas = client.enviar_masivo(sock, ("127.0.0.1", port), argumentos)
+
+    assert estadisticas.entregados == 0
+    assert estadisticas.mensajes + estadisticas.sin_enviar == 10
+    assert estadisticas.fallidos == 10
+    assert "(10 fallidos" in estadisticas.resumen(1.0)
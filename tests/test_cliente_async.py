@@ -0,0 +1,216 @@
+"""
+Pruebas del cliente asyncio contra un servidor local en el mismo bucle de eventos -> muchos send() concurrentes
+terminan cada uno con su secuencia y se entregan en orden; un SACK (o ACK acumulado) despierta a varios a la vez; al
+agotar los intentos, y al cerrar el cliente, todos los mensajes pendientes lanzan ErrorEntrega
+"""
+
+import asyncio
+
+import pytest
+
+import client
+import cliente_async
+import congestion
+import protocolo
+import rtt
+import server
+from cliente_async import ClienteAsync, ErrorEntrega
+from metricas import Metricas
+from servidor_async import ProtocoloServidor
+from sesiones import CacheRespuestas, TablaSesiones
+
+
+@pytest.fixture(autouse=True)
+def configuracion(monkeypatch):
+    monkeypatch.setattr(client, "FORMATO", protocolo.FORMATO_BINARIO)
+    monkeypatch.setattr(client, "ACK_SELECTIVO", True)
+    monkeypatch.setattr(client, "CONTROL_CONGESTION", False)
+    monkeypatch.setattr(cliente_async, "metricas", Metricas("prueba"))
+    monkeypatch.setattr(server, "metricas", Metricas("prueba"))
+    monkeypatch.setattr(server, "respuestas", CacheRespuestas())
+    monkeypatch.setattr(server, "acks_diferidos", {})
+    monkeypatch.setattr(server, "RETARDO_ACK", 0.001)
+
+    # Estimadores de RTT y controles de congestión propios de cada prueba (son globales por destino)
+    monkeypatch.setattr(rtt, "_estimadores", {})
+    monkeypatch.setattr(congestion, "_controles", {})
+
+
+@pytest.fixture
+def entregados(monkeypatch):
+    mensajes = []
+    monkeypatch.setattr(server, "entregar_mensaje", lambda sesion, direccion, flags, mensaje: mensajes.append(bytes(mensaje)))
+    return mensajes
+
+
+async def servidor(tamano_ventana):
+    """Servidor asyncio (la lógica de server.py) en un puerto libre -> Return: (transport, port)"""
+
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: ProtocoloServidor(TablaSesiones(tamano_ventana)),
+        local_addr=("127.0.0.1", 0),
+    )
+    return transport, transport.get_extra_info("sockname")[1]
+
+
+class Silencioso(asyncio.DatagramProtocol):
+    """Servidor que nunca responde solo -> guarda las secuencias que recibe y la prueba decide qué contestar"""
+
+    def __init__(self):
+        self.transport = None
+        self.recibidas = []
+        self.cliente = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, datos, direccion):
+        self.recibidas.append(protocolo.leer_paquete(datos).secuencia)
+        self.cliente = direccion
+
+    def responder(self, respuesta):
+        self.transport.sendto(respuesta, self.cliente)
+
+    async def esperar(self, cantidad):
+        while len(self.recibidas) < cantidad:
+            await asyncio.sleep(0.001)
+
+
+async def silencioso():
+    loop = asyncio.get_running_loop()
+    transport, actual = await loop.create_datagram_endpoint(Silencioso, local_addr=("127.0.0.1", 0))
+    return actual, transport.get_extra_info("sockname")[1]
+
+
+@pytest.mark.parametrize("control", [False, True])
+def test_envios_concurrentes(entregados, monkeypatch, control):
+    monkeypatch.setattr(client, "CONTROL_CONGESTION", control)
+    mensajes = [b"mensaje %d" % numero for numero in range(300)]
+
+    async def prueba():
+        transport, port = await servidor(16)
+        try:
+            async with ClienteAsync("127.0.0.1", port, 16, timeout_inicial=0.5) as cliente:
+                return await asyncio.wait_for(asyncio.gather(*(cliente.send(mensaje) for mensaje in mensajes)), 10)
+        finally:
+            transport.close()
+
+    # Cada send() termina con la secuencia de SU mensaje (entran a la ventana en orden de llegada)
+    assert asyncio.run(prueba()) == list(range(len(mensajes)))
+    assert entregados == mensajes
+
+
+def test_flujos_concurrentes(entregados):
+    async def flujo(cliente, numero):
+        return [await cliente.send(b"flujo %d mensaje %d" % (numero, indice)) for indice in range(20)]
+
+    async def prueba():
+        transport, port = await servidor(8)
+        try:
+            async with ClienteAsync("127.0.0.1", port, 8, timeout_inicial=0.5) as cliente:
+                return await asyncio.wait_for(asyncio.gather(*(flujo(cliente, numero) for numero in range(10))), 10)
+        finally:
+            transport.close()
+
+    secuencias = asyncio.run(prueba())
+
+    # Ninguna secuencia se repite entre flujos y cada flujo llega al servidor en el orden en que envió
+    assert sorted(secuencia for flujo in secuencias for secuencia in flujo) == list(range(200))
+    for numero in range(10):
+        propios = [mensaje for mensaje in entregados if mensaje.startswith(b"flujo %d " % numero)]
+        assert propios == [b"flujo %d mensaje %d" % (numero, indice) for indice in range(20)]
+
+
+def test_sack_despierta_a_varios():
+    async def prueba():
+        servidor_falso, port = await silencioso()
+
+        # RTO largo -> ningún paquete se reenvía mientras la prueba arma las respuestas
+        async with ClienteAsync("127.0.0.1", port, 8, timeout_inicial=5.0) as cliente:
+            envios = [asyncio.create_task(cliente.send(b"m%d" % numero)) for numero in range(6)]
+            await asyncio.wait_for(servidor_falso.esperar(6), 5)
+
+            # SACK: falta la 0, llegaron la 1 y la 2 (bits 0 y 1) -> solo esos dos terminan
+            servidor_falso.responder(protocolo.construir_sack(0, bytes([0b00000011])))
+            await asyncio.wait_for(asyncio.wait(envios[1:3]), 5)
+            assert [envio.done() for envio in envios] == [False, True, True, False, False, False]
+            assert cliente.base == 0
+
+            # ACK individual de la 4
+            servidor_falso.responder(protocolo.construir_respuesta(protocolo.FORMATO_BINARIO, "ACK", 4))
+            await asyncio.wait_for(envios[4], 5)
+            assert [envio.done() for envio in envios] == [False, True, True, False, True, False]
+
+            # ACK acumulado hasta la 5 (próxima esperada 6) -> terminan todos los que faltaban con un solo datagrama
+            servidor_falso.responder(protocolo.construir_sack(6, b""))
+            resultados = await asyncio.wait_for(asyncio.gather(*envios), 5)
+
+            assert (cliente.base, cliente.en_vuelo, cliente.confirmados) == (6, {}, set())
+
+        servidor_falso.transport.close()
+        return resultados, servidor_falso.recibidas
+
+    resultados, recibidas = asyncio.run(prueba())
+
+    assert resultados == list(range(6))
+    assert recibidas == list(range(6)) # Sin reenvíos
+
+
+def test_falla_luego_de_max_intentos():
+    async def prueba():
+        servidor_falso, port = await silencioso()
+
+        async with ClienteAsync("127.0.0.1", port, 4, max_intentos=3, timeout_inicial=0.01) as cliente:
+            resultados = await asyncio.wait_for(asyncio.gather(*(cliente.send(b"m%d" % numero) for numero in range(2)), return_exceptions=True), 5)
+
+            # La sesión quedó rota -> los siguientes send() lanzan el mismo error sin enviar nada
+            enviados = len(servidor_falso.recibidas)
+            with pytest.raises(ErrorEntrega):
+                await cliente.send(b"otro")
+            assert len(servidor_falso.recibidas) == enviados
+
+            assert cliente.en_vuelo == {}
+            error = cliente.error
+
+        servidor_falso.transport.close()
+        return resultados, error, servidor_falso.recibidas
+
+    resultados, error, recibidas = asyncio.run(prueba())
+
+    assert all(resultado is error for resultado in resultados)
+    assert "luego de 3 intentos" in str(error)
+    assert recibidas.count(0) == 3
+    assert recibidas.count(1) <= 3
+    assert cliente_async.metricas.contadores.get("fallidos") == 1
+
+
+def test_cerrar_con_mensajes_pendientes():
+    async def prueba():
+        servidor_falso, port = await silencioso()
+        cliente = ClienteAsync("127.0.0.1", port, 2, timeout_inicial=5.0)
+
+        with pytest.raises(ErrorEntrega):
+            await cliente.send(b"sin conectar")
+
+        await cliente.conectar()
+
+        # Dos mensajes en vuelo (ventana 2) y un tercero esperando lugar en la ventana
+        envios = [asyncio.create_task(cliente.send(b"m%d" % numero)) for numero in range(3)]
+        await asyncio.wait_for(servidor_falso.esperar(2), 5)
+        en_vuelo = list(cliente.en_vuelo.values())
+        assert len(en_vuelo) == 2 and not any(envio.done() for envio in envios)
+
+        cliente.cerrar()
+        resultados = await asyncio.wait_for(asyncio.gather(*envios, return_exceptions=True), 5)
+
+        # Los temporizadores de retransmisión se cancelaron -> nada se reenvía después de cerrar
+        assert all(envio.temporizador.cancelled() for envio in en_vuelo)
+
+        servidor_falso.transport.close()
+        return resultados, servidor_falso.recibidas
+
+    resultados, recibidas = asyncio.run(prueba())
+
+    assert all(isinstance(resultado, ErrorEntrega) and str(resultado) == "Socket cerrado" for resultado in resultados)
+    assert recibidas == [0, 1]
@@ -0,0 +1,195 @@
+"""
+Pruebas del control de congestión con un reloj falso -> arranque lento y aumento aditivo, reducción a la mitad por
+pérdida (una vez por RTT), vuelta al mínimo por timeout, ritmo del token bucket y un control independiente por destino
+"""
+
+import pytest
+
+import congestion
+import rtt
+from congestion import ControlCongestion
+from rtt import EstimadorRTT
+
+
+class Reloj:
+    """Reemplaza al módulo time dentro de congestion.py -> el tiempo solo avanza cuando la prueba lo pide"""
+
+    def __init__(self, ahora=100.0):
+        self.ahora = ahora
+
+    def monotonic(self):
+        return self.ahora
+
+
+@pytest.fixture(autouse=True)
+def reloj(monkeypatch):
+    actual = Reloj()
+    monkeypatch.setattr(congestion, "time", actual)
+    monkeypatch.setattr(congestion, "_controles", {})
+    monkeypatch.setattr(rtt, "_estimadores", {})
+    return actual
+
+
+def control_con_rtt(srtt=0.1, **opciones):
+    estimador = EstimadorRTT()
+    estimador.muestra(srtt)
+    return ControlCongestion(estimador, **opciones)
+
+
+def test_arranque_lento_y_aumento_aditivo():
+    control = control_con_rtt(ventana_inicial=4)
+
+    # Arranque lento -> +1 por paquete confirmado: una ventana completa de ACK la duplica
+    control.confirmados(4, en_vuelo=4)
+    assert control.ventana == 8
+
+    # Por encima del umbral -> +1 por ventana (una ventana de ACK, uno por uno, suma apenas menos de 1)
+    control.umbral = control.ventana
+    for ventana in range(8, 12):
+        for _ in range(control.limite()):
+            control.confirmados(1, en_vuelo=control.limite())
+        assert ventana + 0.9 < control.ventana < ventana + 1
+        control.ventana = float(ventana + 1)
+
+    # Con menos de la mitad de la ventana en vuelo no crece (no se midió que la red soporte más)
+    control.confirmados(1, en_vuelo=5)
+    assert control.ventana == 12
+
+
+def test_tope_de_la_ventana():
+    control = control_con_rtt(ventana_inicial=4, ventana_maxima=6)
+
+    control.confirmados(10)
+
+    assert control.ventana == 6
+
+
+def test_perdida_reduce_a_la_mitad_una_vez_por_rtt(reloj):
+    control = control_con_rtt(srtt=0.1, ventana_inicial=20)
+
+    control.perdida()
+    assert (control.ventana, control.umbral, control.reducciones) == (10, 10, 1)
+
+    # Otra pérdida dentro del mismo RTT -> mismo evento, no se vuelve a reducir
+    reloj.ahora += 0.05
+    control.perdida()
+    assert (control.ventana, control.reducciones) == (10, 1)
+
+    # Pasado un SRTT -> evento nuevo
+    reloj.ahora += 0.06
+    control.perdida()
+    assert (control.ventana, control.umbral, control.reducciones) == (5, 5, 2)
+
+    # Nunca baja del mínimo
+    for _ in range(10):
+        reloj.ahora += 1.0
+        control.perdida()
+    assert control.ventana == congestion.VENTANA_MINIMA
+
+
+def test_nack_sin_reducir(monkeypatch):
+    monkeypatch.setattr(congestion, "REDUCIR_CON_NACK", False)
+    control = control_con_rtt(ventana_inicial=20)
+
+    control.perdida(nack=True)
+    assert (control.ventana, control.reducciones) == (20, 0)
+
+    control.perdida()
+    assert (control.ventana, control.reducciones) == (10, 1)
+
+
+def test_timeout_vuelve_al_minimo(reloj):
+    control = control_con_rtt(srtt=0.1, ventana_inicial=16)
+
+    control.timeout()
+
+    assert (control.ventana, control.umbral, control.timeouts) == (congestion.VENTANA_MINIMA, 8, 1)
+    assert control.limite() == congestion.VENTANA_MINIMA
+
+    # Pérdidas dentro del RTO siguiente son parte del mismo evento
+    control.perdida()
+    assert control.reducciones == 0
+
+    # Se retoma con arranque lento hasta el umbral
+    control.confirmados(7)
+    assert control.ventana == 8
+    control.confirmados(1)
+    assert control.ventana == pytest.approx(8 + 1 / 8)
+
+
+def test_tasa():
+    # Sin RTT medido -> sin ritmo, salvo que haya tope
+    sin_rtt = ControlCongestion(EstimadorRTT())
+    assert sin_rtt.tasa is None
+    sin_rtt.tasa_maxima = 500
+    assert sin_rtt.tasa == 500
+
+    # ganancia * ventana / SRTT, con tope opcional
+    control = control_con_rtt(srtt=0.1, ventana_inicial=8)
+    assert control.tasa == pytest.approx(congestion.GANANCIA_RITMO * 8 / 0.1)
+    control.tasa_maxima = 50
+    assert control.tasa == 50
+
+
+def test_espera_del_token_bucket(reloj):
+    # 8 paquetes por 100 ms con ganancia 1.25 -> 100 paquetes/s, una ficha cada 10 ms
+    control = control_con_rtt(srtt=0.1, ventana_inicial=8)
+    assert control.tasa == pytest.approx(100)
+
+    # El balde empieza con RAFAGA_MINIMA fichas -> esa ráfaga sale sin esperar
+    for _ in range(congestion.RAFAGA_MINIMA):
+        assert control.espera() == 0
+        control.enviado()
+
+    assert control.espera() == pytest.approx(0.01)
+    reloj.ahora += 0.004
+    assert control.espera() == pytest.approx(0.006)
+    reloj.ahora += 0.007
+    assert control.espera() == 0
+    control.enviado()
+
+    # Después de un rato sin enviar el balde no junta más que su capacidad -> ráfaga corta
+    reloj.ahora += 10.0
+    for _ in range(congestion.RAFAGA_MINIMA):
+        assert control.espera() == 0
+        control.enviado()
+    assert control.espera() > 0
+
+    # El parámetro ahora tiene prioridad sobre el reloj
+    assert control.espera(reloj.ahora + 1.0) == 0
+
+
+def test_sin_rtt_no_hay_espera():
+    control = ControlCongestion(EstimadorRTT())
+
+    for _ in range(100):
+        assert control.espera() == 0
+        control.enviado()
+
+
+def test_un_control_por_destino():
+    servidor_a = ("10.0.0.1", 5000)
+    servidor_b = ("10.0.0.2", 5000)
+
+    control_a = congestion.obtener_control(servidor_a, rto_inicial=0.25)
+    assert congestion.obtener_control(servidor_a) is control_a
+    assert control_a.estimador is rtt.obtener_estimador(servidor_a)
+    assert control_a.estimador.rto == 0.25
+
+    control_b = congestion.obtener_control(servidor_b)
+    assert control_b is not control_a
+    assert control_b.estimador is not control_a.estimador
+
+    # Los topes y las pérdidas de un destino no afectan al otro
+    assert congestion.configurar(servidor_a, tasa_maxima=200, ventana_maxima=2) is control_a
+    control_a.perdida()
+
+    assert (control_a.tasa_maxima, control_a.ventana_maxima, control_a.umbral) == (200, 2, 1)
+    assert (control_b.tasa_maxima, control_b.ventana_maxima, control_b.ventana) == (None, congestion.VENTANA_MAXIMA, congestion.VENTANA_INICIAL)
+    assert control_b.reducciones == 0
+
+    assert congestion.controles() == {servidor_a: control_a, servidor_b: control_b}
+
+    # configurar() sin ventana_maxima conserva la ventana; tasa_maxima=None quita el tope
+    congestion.configurar(servidor_a)
+    assert (control_a.tasa_maxima, control_a.ventana_maxima) == (None, 2)
@@ -0,0 +1,124 @@
+"""
+Pruebas del módulo crc.py -> la vía rápida (crc_hqx), la tabla y el cálculo incremental dan EXACTAMENTE el mismo
+resultado que el algoritmo bit a bit original del proyecto
+"""
+
+import random
+
+import pytest
+
+import crc
+from crc import CRC16, crc16_ccitt, crc16_ccitt_tabla
+
+
+def crc16_ccitt_original(data):
+    """Algoritmo bit a bit original (server.py / client.py antes del módulo crc.py)"""
+
+    if type(data) == str:
+        data = data.encode("utf-8")
+
+    crc = 0xFFFF
+
+    for byte in data:
+        crc = crc ^ (byte << 8)
+
+        for i in range(8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ 0x1021
+            else:
+                crc = crc << 1
+
+            crc = crc & 0xFFFF
+
+    return crc
+
+
+# Largos al azar de 0 a 64 KB (repetibles) + los bordes
+_azar = random.Random(16)
+LARGOS = [0, 1, 2, 255, 256, 1471, 65535] + [_azar.randrange(0, 65536) for i in range(6)]
+
+
+def datos_al_azar(largo, semilla=0):
+    return random.Random(largo * 31 + semilla).randbytes(largo)
+
+
+@pytest.mark.parametrize("largo", LARGOS)
+def test_vias_iguales_al_original(largo):
+    datos = datos_al_azar(largo)
+    esperado = crc16_ccitt_original(datos)
+
+    assert crc16_ccitt(datos) == esperado
+    assert crc16_ccitt_tabla(datos) == esperado
+    assert CRC16(datos).value == esperado
+
+
+@pytest.mark.parametrize("largo", LARGOS)
+def test_incremental_por_partes(largo):
+    datos = datos_al_azar(largo, semilla=1)
+    esperado = crc16_ccitt_original(datos)
+    azar = random.Random(largo)
+
+    calculo = CRC16()
+    tabla = crc.CRC_INICIAL
+    posicion = 0
+
+    # Partes de tamaño al azar (incluye partes vacías)
+    while posicion < largo:
+        fin = min(largo, posicion + azar.randrange(0, 4096))
+        parte = datos[posicion:fin]
+        calculo.update(parte)
+        tabla = crc16_ccitt_tabla(parte, tabla)
+        posicion = fin
+
+    assert calculo.value == esperado
+    assert tabla == esperado
+    assert calculo.digest() == esperado.to_bytes(2, "big")
+    assert calculo.hexdigest() == format(esperado, "04X")
+
+
+def test_copia_independiente():
+    datos = datos_al_azar(5000, semilla=2)
+    calculo = CRC16(datos[:2000])
+    copia = calculo.copy()
+
+    calculo.update(datos[2000:])
+    copia.update(datos[2000:4000])
+
+    assert calculo.value == crc16_ccitt_original(datos)
+    assert copia.value == crc16_ccitt_original(datos[:4000])
+
+
+@pytest.mark.parametrize("largo", [0, 1, 1400, 40000])
+def test_memoryview_sin_copiar(largo):
+    buffer = bytearray(datos_al_azar(largo + 20, semilla=3))
+    vista = memoryview(buffer)[10:10 + largo]
+    esperado = crc16_ccitt_original(bytes(vista))
+
+    assert crc16_ccitt(vista) == esperado
+    assert crc16_ccitt_tabla(vista) == esperado
+    assert CRC16().update(vista[:largo // 2]).update(vista[largo // 2:]).value == esperado
+    assert crc16_ccitt(bytearray(vista)) == esperado
+
+
+@pytest.mark.parametrize("texto", ["", "Hola mundo", "ñandú | acentos: áéíóú", "€" * 3000, "123456789"])
+def test_str_en_utf8(texto):
+    esperado = crc16_ccitt_original(texto)
+
+    assert crc16_ccitt(texto) == esperado
+    assert crc16_ccitt_tabla(texto) == esperado
+    assert CRC16(texto).value == esperado
+    assert CRC16(texto[:5]).update(texto[5:]).value == esperado
+
+
+def test_valor_de_referencia():
+    # CRC-16/CCITT-FALSE de "123456789" -> valor publicado 0x29B1
+    assert crc16_ccitt_original("123456789") == 0x29B1
+    assert crc16_ccitt("123456789") == 0x29B1
+
+
+def test_sin_crc_hqx(monkeypatch):
+    # Intérprete sin binascii -> crc16_ccitt() usa la tabla y da lo mismo
+    monkeypatch.setattr(crc, "crc_hqx", None)
+    datos = datos_al_azar(3000, semilla=4)
+
+    assert crc16_ccitt(datos) == crc16_ccitt_original(datos)
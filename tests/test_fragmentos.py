@@ -0,0 +1,134 @@
+"""
+Pruebas de la compresión de mensajes fragmentados -> el mensaje se comprime completo antes de dividirlo (menos
+fragmentos) y el servidor lo reensambla y descomprime; un mensaje comprimido inválido se descarta. Un paquete suelto
+solo se comprime si el servidor lo puede descomprimir (protocolo.MAX_DESCOMPRIMIDO)
+"""
+
+import random
+import zlib
+
+import pytest
+
+import client
+import protocolo
+import server
+from metricas import Metricas
+from reensamblado import Reensamblador
+from sesiones import CacheRespuestas, TablaSesiones
+
+
+@pytest.fixture(autouse=True)
+def configuracion(monkeypatch):
+    monkeypatch.setattr(client, "FORMATO", protocolo.FORMATO_BINARIO)
+    monkeypatch.setattr(client, "COMPRIMIR_DESDE", 512)
+    monkeypatch.setattr(client, "NIVEL_COMPRESION", 1)
+    monkeypatch.setattr(client, "metricas", Metricas("prueba"))
+
+
+def enviados(datos):
+    """Los paquetes que el cliente enviaría, leídos como los lee el servidor -> lista de (flags, Fragmento)"""
+
+    enviar, comprimido = client.comprimir_mensaje(datos)
+    armar = (lambda secuencia, fragmento: client.armar_fragmento(secuencia, fragmento, comprimido=True)) if comprimido else client.armar_fragmento
+    paquetes = [protocolo.leer_paquete(armar(secuencia, fragmento)) for secuencia, fragmento in enumerate(client.fragmentar(enviar))]
+
+    return [(paquete.flags, protocolo.leer_fragmento(paquete.payload)) for paquete in paquetes]
+
+
+def reensamblar(fragmentos, directorio):
+    reensamblador = Reensamblador("prueba", str(directorio))
+
+    for flags, fragmento in fragmentos:
+        estado, resultado = reensamblador.agregar(fragmento, flags & protocolo.FLAG_COMPRIMIDO)
+
+    return estado, resultado
+
+
+def test_menos_fragmentos_en_memoria(tmp_path):
+    datos = b"linea de registro repetida\n" * 2000
+
+    fragmentos = enviados(datos)
+
+    # Comprimido completo -> muchos menos fragmentos que sin comprimir; solo el primero lleva FLAG_COMPRIMIDO
+    assert len(fragmentos) < -(-len(datos) // client.TAMANO_DATOS_FRAGMENTO) // 4
+    assert [bool(flags & protocolo.FLAG_COMPRIMIDO) for flags, fragmento in fragmentos] == [True] + [False] * (len(fragmentos) - 1)
+
+    assert reensamblar(fragmentos, tmp_path) == (Reensamblador.COMPLETO, datos)
+
+
+def test_mensaje_grande_a_archivo(tmp_path):
+    # Mayor que MAX_MENSAJE_EN_MEMORIA una vez descomprimido -> se escribe a archivo
+    datos = bytes(range(256)) * 2000
+
+    estado, ruta = reensamblar(enviados(datos), tmp_path)
+
+    assert estado == Reensamblador.COMPLETO
+    with open(ruta, "rb") as archivo:
+        assert archivo.read() == datos
+
+
+def test_incompresible_sin_flag(tmp_path):
+    # Datos aleatorios -> comprimidos no se achican y se envían tal cual
+    datos = random.Random(1).randbytes(5000)
+
+    fragmentos = enviados(datos)
+
+    assert not any(flags & protocolo.FLAG_COMPRIMIDO for flags, fragmento in fragmentos)
+    assert reensamblar(fragmentos, tmp_path) == (Reensamblador.COMPLETO, datos)
+
+
+def fragmento_unico(datos):
+    return protocolo.Fragmento(1, 0, 1, zlib.crc32(datos), datos)
+
+
+@pytest.mark.parametrize("datos", [
+    # Largo anunciado menor que el real -> no se descomprime más de lo anunciado
+    protocolo.LARGO_ORIGINAL.pack(10) + protocolo.comprimir(bytes(5000), 1),
+    # Largo anunciado mayor que el real
+    protocolo.LARGO_ORIGINAL.pack(6000) + protocolo.comprimir(bytes(5000), 1),
+    # Datos comprimidos inválidos
+    protocolo.LARGO_ORIGINAL.pack(100) + b"\xff" * 50,
+    # Sin lugar para el largo
+    b"\x00\x01",
+])
+def test_comprimido_invalido(datos, tmp_path):
+    reensamblador = Reensamblador("prueba", str(tmp_path))
+
+    assert reensamblador.agregar(fragmento_unico(datos), True) == (Reensamblador.CORRUPTO, None)
+    assert not reensamblador.parciales
+
+
+def test_paquete_suelto_hasta_el_limite(monkeypatch):
+    monkeypatch.setattr(server, "metricas", Metricas("prueba"))
+    monkeypatch.setattr(server, "respuestas", CacheRespuestas())
+    monkeypatch.setattr(server, "acks_diferidos", {})
+    sesiones = TablaSesiones(1)
+    direccion = ("127.0.0.1", 40000)
+
+    # Justo en el límite -> se comprime y el servidor lo descomprime entero
+    paquete = client.armar_paquete(0, bytes(protocolo.MAX_DESCOMPRIMIDO))
+    assert protocolo.leer_paquete(paquete).flags & protocolo.FLAG_COMPRIMIDO
+    assert protocolo.leer_respuesta(server.procesar_paquete(paquete, direccion, sesiones.obtener(direccion)))[:2] == ("ACK", 0)
+    assert server.metricas.contadores.get("compresion_invalida", 0) == 0
+
+    # Un byte más -> no se comprime (el servidor lo rechazaría sin responder): no entra en un paquete y hay que fragmentarlo
+    with pytest.raises(ValueError):
+        client.armar_paquete(1, bytes(protocolo.MAX_DESCOMPRIMIDO + 1))
+
+
+def test_archivo_sin_comprimir(monkeypatch, tmp_path):
+    # Un archivo se envía desde el mmap tal cual -> comprimirlo lo leería completo y guardaría otra copia en memoria
+    ruta = tmp_path / "registro.txt"
+    ruta.write_bytes(b"linea de registro repetida\n" * 2000)
+    paquetes = []
+
+    def ventana(sock, direccion, secuencia, fragmentos, tamano_ventana, armar):
+        paquetes.extend(protocolo.leer_paquete(armar(secuencia + i, fragmento)) for i, fragmento in enumerate(fragmentos))
+        return len(paquetes)
+
+    monkeypatch.setattr(client, "enviar_mensajes_ventana", ventana)
+
+    entregados, total = client.enviar_archivo(None, ("127.0.0.1", 40000), 0, str(ruta))
+
+    assert entregados == total == -(-ruta.stat().st_size // client.TAMANO_DATOS_FRAGMENTO)
+    assert not any(paquete.flags & protocolo.FLAG_COMPRIMIDO for paquete in paquetes)
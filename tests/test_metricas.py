@@ -0,0 +1,63 @@
+"""
+Pruebas de la consulta de métricas y del proxy del canal -> un error de socket no detiene el hilo de métricas y el
+proxy no acumula un socket por cada cliente que pasó alguna vez
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from canal import ProxyCanal
+from metricas import Metricas, consultar, servir_consultas
+
+
+def puerto_libre():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_error_de_socket_no_detiene_las_consultas():
+    metricas = Metricas("prueba")
+    metricas.sumar("paquetes", 3)
+    errores = []
+
+    def comandos(datos):
+        # El primer datagrama falla como fallaría sendto() -> el hilo tiene que seguir atendiendo
+        if not errores:
+            errores.append(datos)
+            raise OSError("error simulado")
+        return None
+
+    port = puerto_libre()
+    hilo = servir_consultas(metricas, "127.0.0.1", port, comandos)
+
+    with pytest.raises(socket.timeout):
+        consultar("127.0.0.1", port, timeout=0.2)
+    assert hilo.is_alive()
+    assert consultar("127.0.0.1", port)["contadores"]["paquetes"] == 3
+
+
+def test_proxy_cierra_salidas_viejas():
+    async def probar():
+        loop = asyncio.get_running_loop()
+        servidor, protocolo_servidor = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, local_addr=("127.0.0.1", 0))
+        proxy = ProxyCanal(servidor.get_extra_info("sockname"), None, None, ttl=10.0, max_salidas=2)
+
+        try:
+            # Tres clientes con lugar para dos -> se cierra el socket del usado hace más tiempo
+            for port in (1, 2, 3):
+                await proxy._reenviar_al_servidor(b"hola", ("127.0.0.1", port))
+
+            assert list(proxy.salidas) == [("127.0.0.1", 2), ("127.0.0.1", 3)]
+            assert proxy.cerradas == 1
+
+            # Sin datagramas durante más que el TTL -> se cierran todos
+            assert proxy.expirar(max(ultimo_uso for creacion, ultimo_uso in proxy.salidas.values()) + 11.0) == 2
+            assert not proxy.salidas
+            await asyncio.sleep(0)
+        finally:
+            servidor.close()
+
+    asyncio.run(probar())
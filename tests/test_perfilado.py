@@ -0,0 +1,87 @@
+"""
+Pruebas de los pedidos de perfilado al hilo principal -> una señal externa (kill -USR1) no se toma por un pedido en
+cola, y un pedido cuya espera ya venció no se ejecuta
+"""
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+import perfilado
+
+
+pytestmark = pytest.mark.skipif(perfilado.SENAL_PEDIDO is None, reason="sin señales POSIX")
+
+
+@pytest.fixture(autouse=True)
+def senales(monkeypatch):
+    # Manejadores y estado del perfilado propios de cada prueba
+    anteriores = {numero: signal.getsignal(numero) for numero in (perfilado.SENAL_PERFIL, perfilado.SENAL_MEMORIA, perfilado.SENAL_PEDIDO)}
+    monkeypatch.setattr(perfilado, "etapas", False)
+    monkeypatch.setattr(perfilado, "_pedidos", perfilado.deque())
+    assert perfilado.instalar_senales()
+
+    yield
+
+    if perfilado._perfil is not None:
+        perfilado._perfil.disable()
+        perfilado._perfil = None
+    for numero, manejador in anteriores.items():
+        signal.signal(numero, manejador)
+
+
+def en_hilo(comando):
+    # atender_comando() desde otro hilo (como el de métricas); el hilo principal queda libre para atender las señales
+    respuestas = []
+    hilo = threading.Thread(target=lambda: respuestas.append(perfilado.atender_comando(comando)))
+    hilo.start()
+    return hilo, respuestas
+
+
+def test_pedido_desde_otro_hilo():
+    hilo, respuestas = en_hilo(b"etapas-iniciar")
+
+    while hilo.is_alive():
+        time.sleep(0.01)
+
+    assert respuestas == [{"etapas": True}]
+    assert perfilado.etapas
+
+
+def test_senal_externa_con_pedido_en_cola():
+    listo = threading.Event()
+    resultado = {}
+    perfilado._pedidos.append(("etapas-iniciar", listo, resultado, {}))
+
+    # kill -USR1 desde afuera -> alterna cProfile y NO atiende el pedido
+    os.kill(os.getpid(), perfilado.SENAL_PERFIL)
+    time.sleep(0.01)
+
+    assert perfilado._perfil is not None
+    assert not listo.is_set() and len(perfilado._pedidos) == 1
+
+    # La señal de pedidos sí lo atiende
+    os.kill(os.getpid(), perfilado.SENAL_PEDIDO)
+    time.sleep(0.01)
+
+    assert listo.is_set() and resultado == {"etapas": True}
+
+
+def test_pedido_vencido_no_se_ejecuta(monkeypatch):
+    monkeypatch.setattr(perfilado, "TIMEOUT_PEDIDO", 0.05)
+
+    # El hilo principal no atiende la señal de pedidos hasta que se desbloquea -> la espera vence
+    signal.pthread_sigmask(signal.SIG_BLOCK, [perfilado.SENAL_PEDIDO])
+    try:
+        hilo, respuestas = en_hilo(b"etapas-iniciar")
+        hilo.join()
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, [perfilado.SENAL_PEDIDO])
+    time.sleep(0.01)
+
+    assert "error" in respuestas[0]
+    assert not perfilado.etapas
+    assert not perfilado._pedidos
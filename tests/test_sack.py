@@ -0,0 +1,160 @@
+"""
+Pruebas del ACK acumulado + SACK -> orden de los bits del mapa (bit i = base + 1 + i), vuelta del contador de
+secuencia, ACK demorados (RETARDO_ACK / ACK_CADA) y reenvío de SOLO los paquetes que faltan en el cliente
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+import client
+import protocolo
+import server
+from metricas import Metricas
+from sesiones import CacheRespuestas, TablaSesiones
+from ventana import ESPACIO_SECUENCIA, VentanaRecepcion
+
+
+CLIENTE = ("127.0.0.1", 40000)
+
+
+@pytest.fixture(autouse=True)
+def servidor_limpio(monkeypatch):
+    monkeypatch.setattr(server, "metricas", Metricas("prueba"))
+    monkeypatch.setattr(server, "respuestas", CacheRespuestas())
+    monkeypatch.setattr(server, "acks_diferidos", {})
+    monkeypatch.setattr(server, "entregar_mensaje", lambda sesion, direccion, flags, mensaje: None)
+
+
+def test_orden_de_los_bits():
+    ventana = VentanaRecepcion(16, base=0)
+
+    # Llegan 2, 3 y 9 (faltan 0 y 1) -> posiciones 1, 2 y 8: bits 1 y 2 del primer byte, bit 0 del segundo
+    for secuencia in (2, 3, 9):
+        assert ventana.recibir(secuencia, secuencia) == (VentanaRecepcion.NUEVO, [])
+
+    mapa = ventana.mapa_sack()
+
+    assert mapa == bytes([0b00000110, 0b00000001])
+    assert list(protocolo.recibidos_sack(mapa)) == [1, 2, 8]
+    assert [ventana.base + 1 + posicion for posicion in protocolo.recibidos_sack(mapa)] == [2, 3, 9]
+
+
+def test_vuelta_del_contador():
+    # La base está a 2 del final del espacio -> las secuencias guardadas siguen en 0, 1, ...
+    base = ESPACIO_SECUENCIA - 2
+    ventana = VentanaRecepcion(8, base=base)
+    ventana.recibir(ESPACIO_SECUENCIA - 1, "a")
+    ventana.recibir(1, "b")
+
+    tipo, secuencia, mapa = protocolo.leer_respuesta(protocolo.construir_sack(ventana.base, ventana.mapa_sack()))
+
+    assert (tipo, secuencia) == ("SACK", base)
+    assert [(secuencia + 1 + posicion) % ESPACIO_SECUENCIA for posicion in protocolo.recibidos_sack(mapa)] == [ESPACIO_SECUENCIA - 1, 1]
+
+
+def test_ack_demorados(monkeypatch):
+    monkeypatch.setattr(server, "RETARDO_ACK", 0.005)
+    monkeypatch.setattr(server, "ACK_CADA", 4)
+    sesiones = TablaSesiones(16)
+
+    def enviar(secuencia):
+        paquete = protocolo.construir_paquete(secuencia, b"m%d" % secuencia, protocolo.FLAG_SACK)
+        respuesta = server.procesar_paquete(paquete, CLIENTE, sesiones.obtener(CLIENTE))
+        return None if respuesta is None else protocolo.leer_respuesta(respuesta)
+
+    # Ventana provisoria de la sesión nueva -> ACK individuales hasta que la base avanza una ventana (la secuencia 15
+    # ya la cierra: desde ella se usa el ACK acumulado)
+    for secuencia in range(15):
+        assert enviar(secuencia)[:2] == ("ACK", secuencia)
+
+    # En orden -> se demoran hasta ACK_CADA paquetes: el cuarto confirma los cuatro con un solo SACK
+    assert [enviar(secuencia) for secuencia in range(15, 18)] == [None, None, None]
+    assert enviar(18)[:2] == ("SACK", 19)
+    assert not server.acks_diferidos
+    assert enviar(19) is None
+    assert enviar(20) is None
+
+    # Menos de ACK_CADA -> sale cuando vence RETARDO_ACK
+    assert list(server.acks_vencidos(time.monotonic())) == []
+    (respuesta, direccion), = server.acks_vencidos(time.monotonic() + 1.0)
+    assert direccion == CLIENTE and protocolo.leer_respuesta(respuesta)[:2] == ("SACK", 21)
+
+    # Hueco (falta la 21) -> respuesta inmediata con el mapa: llegó la 22 (bit 0)
+    assert enviar(22) == ("SACK", 21, bytes([0b00000001, 0]))
+
+
+@pytest.fixture
+def servidor_con_perdidas(monkeypatch):
+    """
+    Servidor con ventana 8 en un hilo que descarta el PRIMER envío de algunas secuencias
+        - Return -> (port, conjunto de secuencias a descartar, lista de secuencias recibidas en orden de llegada)
+    """
+
+    monkeypatch.setattr(server, "RETARDO_ACK", 0.001)
+
+    descartar = set()
+    recibidas = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.001)
+    sesiones = TablaSesiones(8)
+    terminar = threading.Event()
+
+    def atender():
+        while not terminar.is_set():
+            try:
+                datos, direccion = sock.recvfrom(2048)
+            except socket.timeout:
+                pass
+            else:
+                secuencia = protocolo.leer_paquete(datos).secuencia
+                recibidas.append(secuencia)
+
+                if secuencia in descartar:
+                    descartar.discard(secuencia)
+                else:
+                    respuesta = server.procesar_paquete(datos, direccion, sesiones.obtener(direccion))
+                    if respuesta is not None:
+                        sock.sendto(respuesta, direccion)
+
+            for respuesta, direccion in server.acks_vencidos(time.monotonic()):
+                sock.sendto(respuesta, direccion)
+
+    hilo = threading.Thread(target=atender, daemon=True)
+    hilo.start()
+
+    yield sock.getsockname()[1], descartar, recibidas
+
+    terminar.set()
+    hilo.join()
+    sock.close()
+
+
+@pytest.mark.parametrize("secuencia_inicial", [0, ESPACIO_SECUENCIA - 30])
+def test_reenvia_solo_lo_que_falta(servidor_con_perdidas, monkeypatch, secuencia_inicial):
+    port, descartar, recibidas = servidor_con_perdidas
+
+    # RTO inicial largo -> ningún paquete se reenvía por timeout antes de que lleguen los SACK
+    monkeypatch.setattr(client, "FORMATO", protocolo.FORMATO_BINARIO)
+    monkeypatch.setattr(client, "ACK_SELECTIVO", True)
+    monkeypatch.setattr(client, "CONTROL_CONGESTION", False)
+    monkeypatch.setattr(client, "MAX_TIEMPO_DE_ESPERA", 2.0)
+    monkeypatch.setattr(client, "metricas", Metricas("prueba"))
+
+    # Pérdidas después de la ventana provisoria del servidor (una ventana, 8 paquetes) -> se confirman con SACK
+    perdidas = {(secuencia_inicial + indice) % ESPACIO_SECUENCIA for indice in (25, 26, 60, 90)}
+    descartar.update(perdidas)
+    mensajes = [b"m%d" % indice for indice in range(120)]
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        assert client.enviar_mensajes_ventana(sock, ("127.0.0.1", port), secuencia_inicial, mensajes, 8) == len(mensajes)
+
+    # Cada secuencia llegó una vez, salvo las perdidas: exactamente un reenvío cada una
+    reenviadas = {secuencia for secuencia in recibidas if recibidas.count(secuencia) > 1}
+    assert reenviadas == perdidas
+    assert all(recibidas.count(secuencia) == 2 for secuencia in perdidas)
+    assert len(recibidas) == len(mensajes) + len(perdidas)
+    assert client.metricas.contadores.get("reenvios_rapidos", 0) == len(perdidas)
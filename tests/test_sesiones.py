@@ -0,0 +1,144 @@
+"""
+Pruebas de las sesiones del servidor -> un cliente cuya sesión se eliminó (por TTL o por capacidad) sigue con su
+numeración y sus mensajes se entregan; nunca se confirma como duplicado un paquete de una sesión recién creada
+"""
+
+import pytest
+
+import protocolo
+import server
+from metricas import Metricas
+from sesiones import CacheRespuestas, TablaSesiones
+from ventana import VentanaRecepcion
+
+
+CLIENTE = ("127.0.0.1", 40000)
+
+
+@pytest.fixture(autouse=True)
+def servidor_limpio(monkeypatch):
+    # Métricas, caché de respuestas y ACK demorados propios de cada prueba
+    monkeypatch.setattr(server, "metricas", Metricas("prueba"))
+    monkeypatch.setattr(server, "respuestas", CacheRespuestas())
+    monkeypatch.setattr(server, "acks_diferidos", {})
+
+
+def enviar(sesiones, secuencia, mensaje, ahora, flags=0):
+    # Un paquete binario del CLIENTE, procesado como lo hace el bucle del servidor
+    paquete = protocolo.construir_paquete(secuencia, mensaje, flags)
+    return server.procesar_paquete(paquete, CLIENTE, sesiones.obtener(CLIENTE, ahora))
+
+
+def entregados():
+    return server.metricas.contadores.get("entregados", 0)
+
+
+@pytest.mark.parametrize("tamano", [1, 4])
+def test_envio_despues_de_ttl(tamano):
+    sesiones = TablaSesiones(tamano, ttl=10.0)
+
+    assert protocolo.leer_respuesta(enviar(sesiones, 0, b"uno", 0.0))[:2] == ("ACK", 0)
+    assert entregados() == 1
+
+    # Cliente inactivo más que el TTL -> la sesión se elimina
+    assert sesiones.expirar(20.0) == 1
+
+    # El próximo mensaje (secuencia 1) llega a una sesión nueva -> se entrega, no se toma por duplicado
+    assert protocolo.leer_respuesta(enviar(sesiones, 1, b"dos", 20.0))[:2] == ("ACK", 1)
+    assert entregados() == 2
+    assert server.metricas.contadores.get("duplicados", 0) == 0
+
+    # Y la numeración sigue normalmente
+    enviar(sesiones, 2 % VentanaRecepcion(tamano).espacio, b"tres", 21.0)
+    assert entregados() == 3
+
+
+def test_envio_despues_de_desalojo_por_capacidad():
+    sesiones = TablaSesiones(1, max_sesiones=1)
+
+    enviar(sesiones, 0, b"uno", 0.0)
+
+    # Otro cliente ocupa el único lugar -> la sesión del CLIENTE se elimina (LRU)
+    sesiones.obtener(("127.0.0.1", 40001), 1.0)
+    assert CLIENTE not in sesiones.sesiones
+
+    enviar(sesiones, 1, b"dos", 2.0)
+    assert entregados() == 2
+
+
+def test_duplicado_en_la_misma_sesion():
+    sesiones = TablaSesiones(1)
+
+    enviar(sesiones, 0, b"uno", 0.0)
+    assert protocolo.leer_respuesta(enviar(sesiones, 0, b"uno", 0.5))[:2] == ("ACK", 0)
+
+    assert entregados() == 1
+    assert server.metricas.contadores["duplicados"] == 1
+
+
+def test_primer_paquete_desordenado():
+    # Cliente nuevo con ventana 4: la secuencia 1 llega antes que la 0 -> se entregan las dos
+    ventana = VentanaRecepcion(4)
+
+    assert ventana.recibir(1, "b") == (VentanaRecepcion.NUEVO, [(1, "b")])
+    assert not ventana.ya_recibido(0)
+    assert ventana.recibir(0, "a") == (VentanaRecepcion.NUEVO, [(0, "a")])
+
+    # Ahora la 0 sí es un duplicado
+    assert ventana.ya_recibido(0)
+    assert ventana.recibir(0, "a") == (VentanaRecepcion.DUPLICADO, [])
+
+    # Cuando la base avanza una ventana entera deja de ser provisoria
+    for secuencia in range(2, 6):
+        ventana.recibir(secuencia, secuencia)
+    assert ventana.inicio is None
+
+
+def test_ventana_provisoria_sin_ack_acumulado():
+    sesiones = TablaSesiones(4)
+
+    # Ventana provisoria -> ACK individual (un ACK acumulado confirmaría la secuencia 0, que no llegó)
+    tipo, secuencia, mapa = protocolo.leer_respuesta(enviar(sesiones, 1, b"b", 0.0, protocolo.FLAG_SACK | protocolo.FLAG_ACK_INMEDIATO))
+    assert (tipo, secuencia) == ("ACK", 1)
+
+    enviar(sesiones, 0, b"a", 0.1, protocolo.FLAG_SACK | protocolo.FLAG_ACK_INMEDIATO)
+    assert entregados() == 2
+
+
+def test_sesion_eliminada_borra_sus_respuestas():
+    sesiones = TablaSesiones(4, ttl=10.0, max_sesiones=2, al_eliminar=server.eliminar_sesion)
+    otro = ("127.0.0.1", 40001)
+
+    for secuencia in range(3):
+        enviar(sesiones, secuencia, b"m%d" % secuencia, 0.0)
+    server.procesar_paquete(protocolo.construir_paquete(0, b"otro"), otro, sesiones.obtener(otro, 1.0))
+    assert len(server.respuestas) == 4
+
+    # Por capacidad -> un tercer cliente desaloja al CLIENTE (el usado hace más tiempo) y sus respuestas
+    sesiones.obtener(("127.0.0.1", 40002), 2.0)
+    assert len(server.respuestas) == 1
+    assert CLIENTE not in server.respuestas.por_cliente
+
+    # Por TTL -> se borran las del otro cliente
+    sesiones.expirar(20.0)
+    assert len(server.respuestas) == 0
+    assert not server.respuestas.por_cliente
+
+
+def test_desalojo_de_la_cache_por_capacidad():
+    cache = CacheRespuestas(2)
+
+    cache.guardar(CLIENTE, 0, 0x1111, b"a")
+    cache.guardar(CLIENTE, 1, 0x2222, b"b")
+    assert cache.guardar(("127.0.0.1", 40001), 0, 0x3333, b"c")
+
+    assert cache.obtener(CLIENTE, 0, 0x1111) is None
+    assert cache.por_cliente[CLIENTE] == {1}
+    assert cache.descartar(CLIENTE) == 1
+    assert len(cache) == 1
+
+
+def test_sack_actual_es_un_centinela():
+    # Ninguna respuesta real (bytes) puede ser el mismo objeto que SACK_ACTUAL -> ni siquiera un ACK vacío
+    assert not isinstance(server.SACK_ACTUAL, (bytes, bytearray))
+    assert all(server.SACK_ACTUAL is not respuesta for respuesta in (b"", bytes(0), protocolo.construir_respuesta(protocolo.FORMATO_BINARIO, "ACK", 0)))
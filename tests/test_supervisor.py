@@ -0,0 +1,100 @@
+"""
+Pruebas del supervisor con trabajadores reales (fork + SO_REUSEPORT) -> un trabajador terminado con kill -9 se reinicia
+y lo que contó sigue en el total (la instantánea la renueva el hilo de renovar(), no el bucle que reinicia)
+"""
+
+import os
+import signal
+import socket
+import time
+
+import pytest
+
+import protocolo
+import server
+import supervisor
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="requiere SO_REUSEPORT")
+
+
+def puerto_libre():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def esperar(condicion, timeout=10.0):
+    limite = time.monotonic() + timeout
+    while not condicion():
+        assert time.monotonic() < limite, "tiempo de espera agotado"
+        time.sleep(0.05)
+
+
+def enviar(port, cantidad):
+    # Stop-and-wait (ventana 1) desde un socket nuevo -> un cliente nuevo para el servidor
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(0.2)
+
+        for numero in range(cantidad):
+            paquete = protocolo.construir_paquete(numero % 2, b"mensaje %d" % numero)
+
+            # Se reintenta hasta el ACK (un trabajador recién reiniciado puede no estar escuchando todavía)
+            for intento in range(50):
+                sock.sendto(paquete, ("127.0.0.1", port))
+                try:
+                    if protocolo.leer_respuesta(sock.recvfrom(2048)[0])[:2] == ("ACK", numero % 2):
+                        break
+                except socket.timeout:
+                    pass
+            else:
+                pytest.fail(f"sin ACK del mensaje {numero}")
+
+
+def entregados(actual):
+    total, trabajadores = actual.combinar()
+    return total.contadores.get("entregados", 0)
+
+
+@pytest.fixture
+def trabajadores(monkeypatch):
+    # Configuración que heredan los trabajadores (fork)
+    monkeypatch.setattr(server, "PORT", puerto_libre())
+    monkeypatch.setattr(server, "PORT_METRICAS", puerto_libre())
+    monkeypatch.setattr(server, "PROBABILIDAD_DE_ERROR", 0.0)
+    monkeypatch.setattr(server, "TAMANO_VENTANA", 1)
+    monkeypatch.setattr(server, "NIVEL_LOG", "WARNING")
+    monkeypatch.setattr(supervisor, "PORT_METRICAS_TRABAJADORES", puerto_libre())
+    monkeypatch.setattr(supervisor, "ESPERA_REINICIO", 0.0)
+    monkeypatch.setattr(supervisor, "INTERVALO_SUPERVISION", 0.05)
+
+    actual = supervisor.Supervisor(2)
+    actual.iniciar_todos()
+
+    yield actual
+
+    actual.detener()
+
+
+def test_reinicio_conserva_los_contadores(trabajadores):
+    esperar(lambda: not any(estado.get("sin_respuesta") for estado in trabajadores.combinar()[1]))
+    enviar(server.PORT, 10)
+
+    # El hilo de renovar() guarda la instantánea de cada trabajador (el bucle principal ya no consulta métricas)
+    trabajadores.renovar()
+    esperar(lambda: any(ultima is not None and ultima[1]["contadores"].get("entregados") == 10 for ultima in trabajadores.ultimas))
+
+    indice = next(i for i, ultima in enumerate(trabajadores.ultimas) if ultima is not None and ultima[1]["contadores"].get("entregados"))
+    muerto = trabajadores.procesos[indice]
+    os.kill(muerto.pid, signal.SIGKILL)
+    esperar(lambda: not muerto.is_alive())
+
+    trabajadores.vigilar()
+
+    assert trabajadores.reinicios == 1
+    assert trabajadores.procesos[indice].pid != muerto.pid
+    assert entregados(trabajadores) == 10
+
+    # Los mensajes nuevos se suman a los del trabajador terminado
+    enviar(server.PORT, 5)
+    esperar(lambda: entregados(trabajadores) == 15)
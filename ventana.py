@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+UNPILAR - Facultad de Producción y Tecnología - Tecnicatura Universitaria en Desarrollo de Software
+- Proyecto: Servidor UDP con verificación CRC y simulación de errores.
+- Autores: Villarroel Giuliana y Parra Josefina
+- Docente: Mariana Gil
+- Materia: Redes de Datos
+
+
+MÓDULO VENTANA (Repetición Selectiva / Selective Repeat):
+- Números de secuencia "anchos" (32 bits) con aritmética modular -> dan la vuelta sin romper las comparaciones
+- Ventana de recepción del servidor: acepta paquetes fuera de orden dentro de la ventana y los entrega EN ORDEN
+- Con tamaño de ventana 1 y espacio de secuencia 2 se comporta exactamente como el bit alternante (stop-and-wait)
+- Una ventana nueva (sesión recién creada) toma como base la secuencia del primer paquete -> un cliente cuya sesión
+  se eliminó (por TTL o por capacidad) sigue con su numeración sin que su próximo mensaje se tome por duplicado
+"""
+
+# ===================== CONFIGURACIÓN =====================
+ESPACIO_SECUENCIA = 2 ** 32 # Cantidad de números de secuencia distintos en modo ventana (entran en 32 bits)
+ESPACIO_SECUENCIA_STOP_AND_WAIT = 2 # Bit alternante (0 - 1) del modo original
+# ==========================================================
+
+
+def espacio_secuencia(tamano_ventana):
+    """
+    Devuelve el espacio de secuencia que corresponde a un tamaño de ventana
+        - Ventana 1 -> bit alternante (0 - 1), compatible con el protocolo original
+        - Ventana > 1 -> números de 32 bits (Repetición Selectiva necesita espacio >= 2 * ventana)
+
+    - Parámetro -> tamano_ventana (int): cantidad de paquetes en vuelo
+    - Return -> int: cantidad de números de secuencia distintos
+    """
+
+    if tamano_ventana <= 1:
+        return ESPACIO_SECUENCIA_STOP_AND_WAIT
+
+    if 2 * tamano_ventana > ESPACIO_SECUENCIA:
+        raise ValueError(f"Ventana demasiado grande: {tamano_ventana}")
+
+    return ESPACIO_SECUENCIA
+
+
+def distancia(desde, hasta, espacio):
+    """
+    Calcula cuántos pasos hay desde una secuencia hasta otra, teniendo en cuenta la vuelta del contador
+        - Resultado en el rango [-espacio/2, espacio/2) -> negativo si "hasta" es anterior a "desde"
+
+    - Parámetros:
+        - desde (int), hasta (int) -> números de secuencia
+        - espacio (int) -> tamaño del espacio de secuencia
+    - Return -> int: distancia con signo
+    """
+
+    mitad = espacio // 2
+    return (hasta - desde + mitad) % espacio - mitad
+
+
+class VentanaRecepcion:
+    """
+    Ventana de recepción del servidor (Repetición Selectiva)
+        - base -> la próxima secuencia que se debe entregar en orden (None -> la define el primer paquete recibido)
+        - buffer -> mensajes recibidos fuera de orden, esperando a los que faltan
+        - Cada secuencia aceptada o duplicada se confirma con ACK; las que quedan fuera de la ventana se ignoran
+        - inicio / previos -> ventana PROVISORIA mientras la base tomada del primer paquete no avanzó una ventana entera:
+            - Con ventana > 1 el primer paquete puede llegar desordenado (por ej. la secuencia 1 antes que la 0)
+            - Las secuencias de [inicio - tamaño, inicio) no se recibieron nunca en esta sesión -> se aceptan como
+              nuevas (una sola vez, anotadas en previos) y se entregan apenas llegan, en vez de tomarlas por duplicados
+            - Mientras sea provisoria no se puede confirmar con ACK acumulado (diría que llegaron las anteriores a la base)
+    """
+
+    # Resultados posibles de recibir()
+    NUEVO = "nuevo"
+    DUPLICADO = "duplicado"
+    FUERA_DE_VENTANA = "fuera de ventana"
+
+    def __init__(self, tamano=1, base=None):
+        self.tamano = tamano
+        self.espacio = espacio_secuencia(tamano)
+        self.base = base % self.espacio if base is not None else None
+        self.buffer = {}
+        self.inicio = None
+        self.previos = set()
+
+    def recibir(self, secuencia, mensaje):
+        """
+        Procesa un paquete con CRC correcto
+
+        - Parámetros:
+            - secuencia (int) -> número de secuencia del paquete
+            - mensaje -> contenido del paquete
+        - Return -> tuple(estado, entregados)
+            - estado -> NUEVO | DUPLICADO | FUERA_DE_VENTANA
+            - entregados -> lista de (secuencia, mensaje) que ahora se pueden entregar en orden
+        """
+
+        # Primer paquete de la sesión -> su secuencia es la base (el cliente pudo haber empezado en cualquier número)
+        if self.base is None:
+            self.base = self.inicio = secuencia % self.espacio
+
+        desplazamiento = distancia(self.base, secuencia, self.espacio)
+
+        # Dentro de la ventana [base, base + tamaño) -> mensaje nuevo (o ya guardado en el buffer)
+        if 0 <= desplazamiento < self.tamano:
+            if secuencia in self.buffer:
+                return self.DUPLICADO, []
+
+            self.buffer[secuencia] = mensaje
+            return self.NUEVO, self._entregar()
+
+        # Ventana anterior [base - tamaño, base) -> ya fue entregado, el ACK se perdió; se vuelve a confirmar
+        if -self.tamano <= desplazamiento < 0:
+            # ... salvo que sea anterior al primer paquete y todavía no haya llegado (ventana provisoria)
+            if self._previo(secuencia):
+                self.previos.add(secuencia)
+                return self.NUEVO, [(secuencia, mensaje)]
+
+            return self.DUPLICADO, []
+
+        # Cualquier otra secuencia no puede pertenecer a esta transmisión
+        return self.FUERA_DE_VENTANA, []
+
+    def ya_recibido(self, secuencia):
+        """
+        Indica si la secuencia ya se recibió con CRC correcto, sin modificar la ventana
+            - Es el mismo criterio de DUPLICADO de recibir(): la ventana anterior [base - tamaño, base) ya se entregó
+              completa y dentro de la ventana actual el buffer marca lo recibido fuera de orden
+              -> funciona como un mapa de bits deslizante de las últimas 2 * tamaño secuencias
+
+        - Parámetro -> secuencia (int)
+        - Return -> bool
+        """
+
+        if self.base is None:
+            return False
+
+        desplazamiento = distancia(self.base, secuencia, self.espacio)
+
+        if 0 <= desplazamiento < self.tamano:
+            return secuencia in self.buffer
+
+        return -self.tamano <= desplazamiento < 0 and not self._previo(secuencia)
+
+    def mapa_sack(self):
+        """
+        Mapa de bits de los mensajes guardados fuera de orden (para el ACK acumulado + SACK)
+            - El bit i (bit i % 8 del byte i // 8) indica que la secuencia base + 1 + i está en el buffer
+            - La base nunca está en el buffer (se habría entregado) -> el mapa empieza en base + 1
+
+        - Return -> bytes: (tamano - 1) bits redondeados a bytes enteros; b"" si la ventana es de 1
+        """
+
+        mapa = bytearray((self.tamano + 6) // 8)
+
+        for secuencia in self.buffer:
+            posicion = distancia(self.base, secuencia, self.espacio) - 1
+            mapa[posicion >> 3] |= 1 << (posicion & 7)
+
+        return bytes(mapa)
+
+    def _entregar(self):
+        """Saca del buffer los mensajes consecutivos desde la base y avanza la ventana"""
+
+        entregados = []
+
+        while self.base in self.buffer:
+            entregados.append((self.base, self.buffer.pop(self.base)))
+            self.base = (self.base + 1) % self.espacio
+
+        # La base avanzó una ventana entera desde el primer paquete -> lo anterior ya no puede estar en vuelo
+        if self.inicio is not None and distancia(self.inicio, self.base, self.espacio) >= self.tamano:
+            self.inicio = None
+            self.previos.clear()
+
+        return entregados
+
+    def _previo(self, secuencia):
+        """Indica si la secuencia es anterior al primer paquete de la sesión y todavía no llegó (ventana provisoria)"""
+
+        if self.inicio is None:
+            return False
+
+        return -self.tamano <= distancia(self.inicio, secuencia, self.espacio) < 0 and secuencia not in self.previos